@@ -2,11 +2,12 @@
 """Банковская система: депозиты, кредиты"""
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterable, Optional
+from utils.bank_engine import LoanSchedule, accrue_account, accrue_interest, pending_interest, settle_overdue
 from utils.embed_builder import EmbedBuilder, Colors
 
 
@@ -19,7 +20,21 @@ class Bank(commands.Cog):
         self.currency_emoji = "💎"
         self.deposit_rate = 0.03  # 3% годовых (в день: 3%/365)
         self.loan_rate = 0.10  # 10% процент на кредит
+        self.loan_term = timedelta(days=7)  # Срок кредита
+        self.overdue_penalty = 0.05  # Штраф на непогашенный остаток просроченного кредита
+        self.overdue_extension = timedelta(days=1)  # Через сколько повторить списание и штраф
         self._ensure_file()
+        bank = self._load_bank()
+        self.bot.datastore.publish(self.bank_file, bank)
+        
+        # Сроки кредитов в куче: обработка просрочки снимает только просроченные
+        self.loans = LoanSchedule()
+        self.loans.rebuild(bank)
+        
+        self.process_bank.start()
+    
+    def cog_unload(self):
+        self.process_bank.cancel()
     
     def _ensure_file(self):
         """Создание файла банка если его нет"""
@@ -32,10 +47,11 @@ class Bank(commands.Cog):
         with open(self.bank_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def _save_bank(self, data: dict):
-        """Сохранение банковских данных"""
+    def _save_bank(self, data: dict, changed: Optional[Iterable[str]] = None):
+        """Сохранение банковских данных (changed - ID изменённых пользователей, если известны)"""
         with open(self.bank_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.bank_file, data, changed)
     
     def _get_user_data(self, user_id: str) -> dict:
         """Получение банковских данных пользователя"""
@@ -48,7 +64,7 @@ class Bank(commands.Cog):
                 "loan_since": None,
                 "loan_deadline": None
             }
-            self._save_bank(bank)
+            self._save_bank(bank, [user_id])
         return bank[user_id]
     
     def _get_economy_balance(self, user_id: str) -> int:
@@ -66,11 +82,78 @@ class Bank(commands.Cog):
             economy_cog._update_balance(user_id, amount)
             economy_cog._add_transaction(user_id, "bank", amount, "Банковская транзакция")
     
-    def _calculate_deposit_interest(self, amount: int, days: float) -> int:
-        """Рассчитать проценты по депозиту"""
-        daily_rate = self.deposit_rate / 365
-        interest = int(amount * daily_rate * days)
-        return interest
+    @tasks.loop(hours=1)
+    async def process_bank(self):
+        """
+        Раз в час: проценты по всем депозитам и списание просроченных кредитов.
+        
+        Всё считается на одной загрузке bank.json и economy.json, каждый
+        файл сохраняется один раз, в логи уходит одна сводка.
+        """
+        now = datetime.now()
+        bank = self._load_bank()
+        interest = accrue_interest(bank, self.deposit_rate, now)
+        due = self.loans.pop_due(bank, now)
+        
+        if not due:
+            if interest["accounts"]:
+                self._save_bank(bank)
+            return
+        
+        economy_cog = self.bot.get_cog('Economy')
+        economy = economy_cog._load_economy() if economy_cog else None
+        summary = settle_overdue(bank, economy, due, self.overdue_penalty, self.overdue_extension, now)
+        for user_id, deadline in summary["extended"].items():
+            self.loans.push(user_id, deadline)
+        
+        self._save_bank(bank)
+        if summary["from_wallet"]:
+            economy_cog._save_economy(economy, summary["users"])
+        
+        await self._log_overdue(summary)
+    
+    @process_bank.before_loop
+    async def before_process_bank(self):
+        await self.bot.wait_until_ready()
+    
+    async def _log_overdue(self, summary: dict):
+        """Сводка обработки просроченных кредитов в логи серверов - каждому только по его участникам"""
+        logs_cog = self.bot.get_cog('Logs')
+        if not logs_cog:
+            return
+        
+        for guild in self.bot.guilds:
+            users = {
+                user_id: result for user_id, result in summary["users"].items()
+                if guild.get_member(int(user_id))
+            }
+            if not users:
+                continue
+            
+            lines = [
+                f"<@{user_id}>: списано {result['collected']:,}, штраф {result['penalty']:,}, долг {result['debt']:,} {self.currency_emoji}"
+                for user_id, result in list(users.items())[:10]
+            ]
+            if len(users) > 10:
+                lines.append(f"...и ещё {len(users) - 10}")
+            
+            results = users.values()
+            repaid = sum(1 for result in results if not result["debt"])
+            fields = [
+                ("Кредитов", f"{len(users):,} (погашено {repaid:,})", True),
+                ("Списано с кошельков", f"{sum(result['from_wallet'] for result in results):,} {self.currency_emoji}", True),
+                ("Списано с депозитов", f"{sum(result['from_deposit'] for result in results):,} {self.currency_emoji}", True),
+                ("Штрафы", f"{sum(result['penalty'] for result in results):,} {self.currency_emoji}", True),
+                ("Остаток долга", f"{sum(result['debt'] for result in results):,} {self.currency_emoji}", True),
+                ("Должники", "\n".join(lines), False)
+            ]
+            await logs_cog.log_event(
+                guild=guild,
+                title="🏦 Просроченные Кредиты",
+                description="Автоматическое списание просроченных кредитов",
+                color=Colors.ECONOMY,
+                fields=fields
+            )
     
     @app_commands.command(name="bank", description="🏦 Просмотр банковского счёта")
     async def bank_account(self, interaction: discord.Interaction):
@@ -79,12 +162,8 @@ class Bank(commands.Cog):
         bank_data = self._get_user_data(user_id)
         wallet_balance = self._get_economy_balance(user_id)
         
-        # Рассчитываем проценты по депозиту
-        deposit_interest = 0
-        if bank_data["deposit"] > 0 and bank_data["deposit_since"]:
-            deposit_since = datetime.fromisoformat(bank_data["deposit_since"])
-            days = (datetime.now() - deposit_since).total_seconds() / 86400
-            deposit_interest = self._calculate_deposit_interest(bank_data["deposit"], days)
+        # Проценты с последнего начисления (остальные уже на депозите)
+        deposit_interest = pending_interest(bank_data, self.deposit_rate, datetime.now())
         
         fields = [
             ("💰 Кошелёк", f"{wallet_balance:,} {self.currency_emoji}", True),
@@ -96,7 +175,10 @@ class Bank(commands.Cog):
             loan_deadline = datetime.fromisoformat(bank_data["loan_deadline"])
             days_left = (loan_deadline - datetime.now()).days
             fields.append(("💳 Кредит", f"{bank_data['loan']:,} {self.currency_emoji}", True))
-            fields.append(("⏰ Осталось дней", f"{days_left} дней", True))
+            if loan_deadline <= datetime.now():
+                fields.append(("⏰ Срок", "Просрочен - долг будет списан автоматически", True))
+            else:
+                fields.append(("⏰ Осталось дней", f"{days_left} дней", True))
         
         total = wallet_balance + bank_data["deposit"] + deposit_interest - bank_data["loan"]
         fields.append(("💎 Общий капитал", f"{total:,} {self.currency_emoji}", False))
@@ -139,12 +221,15 @@ class Bank(commands.Cog):
         # Снимаем с кошелька
         self._update_economy_balance(user_id, -amount)
         
-        # Добавляем на депозит
+        # Добавляем на депозит (сначала зачисляем набежавшие проценты по старой сумме)
         if bank_data[user_id]["deposit"] == 0:
             bank_data[user_id]["deposit_since"] = datetime.now().isoformat()
+            bank_data[user_id]["interest_carry"] = 0.0
+        else:
+            accrue_account(bank_data[user_id], self.deposit_rate, datetime.now())
         
         bank_data[user_id]["deposit"] += amount
-        self._save_bank(bank_data)
+        self._save_bank(bank_data, [user_id])
         
         em = EmbedBuilder.success(
             title="Депозит Оформлен!",
@@ -155,7 +240,7 @@ class Bank(commands.Cog):
                 ("📈 Общий депозит", f"{bank_data[user_id]['deposit']:,} {self.currency_emoji}", True)
             ]
         )
-        em.set_footer(text="Проценты начисляются ежедневно. Используйте /withdraw для снятия")
+        em.set_footer(text="Проценты начисляются каждый час и капитализируются. Используйте /withdraw для снятия")
         
         await interaction.response.send_message(embed=em)
     
@@ -170,10 +255,8 @@ class Bank(commands.Cog):
             await interaction.response.send_message("❌ У вас нет денег на депозите!", ephemeral=True)
             return
         
-        # Рассчитываем проценты
-        deposit_since = datetime.fromisoformat(bank_data["deposit_since"])
-        days = (datetime.now() - deposit_since).total_seconds() / 86400
-        interest = self._calculate_deposit_interest(bank_data["deposit"], days)
+        # Проценты с последнего начисления
+        interest = pending_interest(bank_data, self.deposit_rate, datetime.now())
         
         # Определяем сумму для снятия
         if amount.lower() == "all":
@@ -197,12 +280,12 @@ class Bank(commands.Cog):
         
         # Выполняем снятие
         bank = self._load_bank()
-        bank[user_id]["deposit"] = max(0, total_available - withdraw_amount)
+        interest = accrue_account(bank[user_id], self.deposit_rate, datetime.now())
+        bank[user_id]["deposit"] = max(0, bank[user_id]["deposit"] - withdraw_amount)
         if bank[user_id]["deposit"] == 0:
             bank[user_id]["deposit_since"] = None
-        else:
-            bank[user_id]["deposit_since"] = datetime.now().isoformat()
-        self._save_bank(bank)
+            bank[user_id]["interest_carry"] = 0.0
+        self._save_bank(bank, [user_id])
         
         # Добавляем в кошелёк
         self._update_economy_balance(user_id, withdraw_amount)
@@ -251,13 +334,14 @@ class Bank(commands.Cog):
         
         # Выдаём кредит
         loan_with_interest = int(amount * (1 + self.loan_rate))
-        deadline = datetime.now() + timedelta(days=7)
+        deadline = datetime.now() + self.loan_term
         
         bank = self._load_bank()
         bank[user_id]["loan"] = loan_with_interest
         bank[user_id]["loan_since"] = datetime.now().isoformat()
         bank[user_id]["loan_deadline"] = deadline.isoformat()
-        self._save_bank(bank)
+        self._save_bank(bank, [user_id])
+        self.loans.push(user_id, deadline)
         
         # Добавляем в кошелёк
         self._update_economy_balance(user_id, amount)
@@ -273,7 +357,7 @@ class Bank(commands.Cog):
                 ("⏰ Срок возврата", f"{deadline.strftime('%Y-%m-%d')}", True)
             ]
         )
-        em.set_footer(text="Погасите кредит командой /loan-repay до указанного срока!")
+        em.set_footer(text="Погасите кредит командой /loan-repay до указанного срока - иначе долг спишется автоматически со штрафом!")
         
         await interaction.response.send_message(embed=em)
     
@@ -320,7 +404,7 @@ class Bank(commands.Cog):
             bank[user_id]["loan_since"] = None
             bank[user_id]["loan_deadline"] = None
         
-        self._save_bank(bank)
+        self._save_bank(bank, [user_id])
         
         # Снимаем с кошелька
         self._update_economy_balance(user_id, -repay_amount)
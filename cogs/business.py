@@ -51,6 +51,7 @@ class Business(commands.Cog):
         }
         
         self._ensure_file()
+        self.bot.datastore.publish(self.business_file, self._load_businesses())
         self.collect_income.start()
     
     def _ensure_file(self):
@@ -68,6 +69,7 @@ class Business(commands.Cog):
         """Сохранение данных бизнесов"""
         with open(self.business_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.business_file, data)
     
     def _get_user_level(self, user_id: str) -> int:
         """Получить уровень пользователя"""
@@ -462,13 +464,8 @@ class Business(commands.Cog):
         income_per_day = income_per_hour * 24
         
         employees = biz_data.get("employees", [])
-        employee_names = []
-        for emp_id in employees[:5]:
-            try:
-                emp_user = await self.bot.fetch_user(int(emp_id))
-                employee_names.append(emp_user.display_name)
-            except:
-                pass
+        names = await self.bot.names.resolve_many(employees[:5], interaction.guild)
+        employee_names = [names[str(emp_id)] for emp_id in employees[:5] if str(emp_id) in names]
         
         fields = [
             ("Тип", biz_info["name"], True),
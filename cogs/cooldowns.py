@@ -0,0 +1,38 @@
+# cooldowns.py
+"""Обслуживание общего реестра кулдаунов"""
+from discord.ext import commands, tasks
+import asyncio
+
+
+class Cooldowns(commands.Cog):
+    """Удаление истёкших кулдаунов и сохранение реестра bot.cooldowns"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.sweep_cooldowns.start()
+    
+    def cog_unload(self):
+        self.sweep_cooldowns.cancel()
+        try:
+            self.bot.cooldowns.save()
+        except OSError as e:
+            print(f"Ошибка сохранения {self.bot.cooldowns.filename}: {e}")
+    
+    @tasks.loop(minutes=1)
+    async def sweep_cooldowns(self):
+        """Раз в минуту: продвинуть колесо таймеров и сохранить изменения"""
+        registry = self.bot.cooldowns
+        registry.advance()
+        if not registry.dirty:
+            return
+        
+        registry.dirty = False
+        try:
+            await asyncio.to_thread(registry.save, registry.to_dict())
+        except OSError as e:
+            registry.dirty = True
+            print(f"Ошибка сохранения {registry.filename}: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(Cooldowns(bot))
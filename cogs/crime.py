@@ -4,7 +4,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from datetime import datetime, timedelta
+from utils.cooldowns import format_remaining
 from utils.embed_builder import EmbedBuilder, Colors
 
 
@@ -14,8 +14,8 @@ class Crime(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.currency_emoji = "💎"
-        self.rob_cooldowns = {}  # user_id: timestamp
-        self.jail_time = {}  # user_id: release_time
+        self.rob_cooldown = 8 * 3600  # Секунды между ограблениями
+        # Кулдаун ограблений ("rob") и срок в тюрьме ("jail") - в bot.cooldowns
     
     def _get_economy_balance(self, user_id: str) -> int:
         economy_cog = self.bot.get_cog('Economy')
@@ -31,15 +31,9 @@ class Crime(commands.Cog):
     
     def _is_in_jail(self, user_id: str) -> tuple:
         """Проверить в тюрьме ли пользователь"""
-        if user_id in self.jail_time:
-            release_time = self.jail_time[user_id]
-            if datetime.now() < release_time:
-                time_left = release_time - datetime.now()
-                hours = int(time_left.total_seconds() // 3600)
-                minutes = int((time_left.total_seconds() % 3600) // 60)
-                return True, f"{hours}ч {minutes}м"
-            else:
-                del self.jail_time[user_id]
+        time_left = self.bot.cooldowns.remaining("jail", user_id)
+        if time_left:
+            return True, format_remaining(time_left)
         return False, ""
     
     @app_commands.command(name="rob", description="🔫 Ограбить пользователя")
@@ -65,18 +59,13 @@ class Crime(commands.Cog):
             return
         
         # Проверка кулдауна (8 часов)
-        if robber_id in self.rob_cooldowns:
-            last_rob = self.rob_cooldowns[robber_id]
-            time_passed = (datetime.now() - last_rob).total_seconds()
-            if time_passed < 28800:  # 8 часов
-                time_left = timedelta(seconds=28800 - time_passed)
-                hours = int(time_left.total_seconds() // 3600)
-                minutes = int((time_left.total_seconds() % 3600) // 60)
-                await interaction.response.send_message(
-                    f"⏰ Следующее ограбление через: {hours}ч {minutes}м",
-                    ephemeral=True
-                )
-                return
+        time_left = self.bot.cooldowns.remaining("rob", robber_id)
+        if time_left:
+            await interaction.response.send_message(
+                f"⏰ Следующее ограбление через: {format_remaining(time_left)}",
+                ephemeral=True
+            )
+            return
         
         # Проверка баланса жертвы
         target_balance = self._get_economy_balance(target_id)
@@ -136,7 +125,7 @@ class Crime(commands.Cog):
             )
         
         # Устанавливаем кулдаун
-        self.rob_cooldowns[robber_id] = datetime.now()
+        self.bot.cooldowns.set("rob", robber_id, self.rob_cooldown)
         
         await interaction.response.send_message(embed=em)
     
@@ -200,8 +189,7 @@ class Crime(commands.Cog):
         else:
             # Провал - тюрьма
             jail_hours = crime_info["jail_time"]
-            release_time = datetime.now() + timedelta(hours=jail_hours)
-            self.jail_time[user_id] = release_time
+            release_at = self.bot.cooldowns.set("jail", user_id, jail_hours * 3600)
             
             em = EmbedBuilder.error(
                 title=f"🚔 {crime_info['name']} - Провал!",
@@ -209,7 +197,7 @@ class Crime(commands.Cog):
                 user=interaction.user,
                 fields=[
                     ("Тюрьма", f"{jail_hours} часов", True),
-                    ("Освобождение", f"<t:{int(release_time.timestamp())}:R>", True)
+                    ("Освобождение", f"<t:{release_at}:R>", True)
                 ]
             )
             em.set_footer(text="Используйте /bail для досрочного выхода")
@@ -227,8 +215,7 @@ class Crime(commands.Cog):
             return
         
         # Залог = 500 за каждый час
-        release_time = self.jail_time[user_id]
-        hours_left = (release_time - datetime.now()).total_seconds() / 3600
+        hours_left = self.bot.cooldowns.remaining("jail", user_id) / 3600
         bail_amount = int(hours_left * 500)
         
         balance = self._get_economy_balance(user_id)
@@ -244,7 +231,7 @@ class Crime(commands.Cog):
         
         # Оплата залога
         self._update_economy_balance(user_id, -bail_amount)
-        del self.jail_time[user_id]
+        self.bot.cooldowns.clear("jail", user_id)
         
         em = EmbedBuilder.success(
             title="🔓 Вы Свободны!",
@@ -4,10 +4,16 @@ from discord import app_commands
 from discord.ext import commands
 import json
 import os
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime
 import random
-from typing import Optional, Literal
+from typing import Dict, Iterable, List, Optional, Literal
+from utils.achievements import AchievementEngine, Achievement, BALANCE_CHANGED, GAME_PLAYED, LEVEL_REACHED, REWARD_CLAIMED
 from utils.embed_builder import EmbedBuilder, Colors
+from utils.bulk_economy import add_to_users, scale_balances, reset_inactive, parse_balance_csv, apply_balance_rows, record_transaction
+from utils.cooldowns import format_remaining
+from utils.leaderboard_view import LeaderboardView
+from utils.shop_catalog import ShopCatalog
 
 class Economy(commands.Cog):
     def __init__(self, bot):
@@ -16,9 +22,29 @@ class Economy(commands.Cog):
         self.shop_file = 'shop.json'
         self.currency = "крионов"
         self.currency_emoji = "💎"
+        self.csv_max_size = 512 * 1024  # Максимальный размер файла для /eco-apply-csv
         
         # Создаём файлы если их нет
         self._ensure_files()
+        economy = self._load_economy()
+        self.bot.datastore.publish(self.economy_file, economy)
+        
+        # Кулдауны наград (секунды) в общем реестре bot.cooldowns
+        self.cooldown_seconds = {
+            "daily": 24 * 3600,
+            "work": 3600,
+            "weekly": 7 * 24 * 3600,
+            "monthly": 30 * 24 * 3600
+        }
+        # Перенос кулдаунов, записанных раньше в economy.json (last_daily, ...)
+        for kind, seconds in self.cooldown_seconds.items():
+            self.bot.cooldowns.import_timestamps(kind, economy, f"last_{kind}", seconds)
+        
+        # Товары магазина в памяти (изменения сразу пишутся в shop.json)
+        self.catalog = ShopCatalog(self.shop_file)
+        
+        # Достижения проверяются по событиям и сохраняются вместе с изменением
+        self.achievements = AchievementEngine()
     
     def _ensure_files(self):
         """Создание файлов экономики и магазина если их нет"""
@@ -38,46 +64,37 @@ class Economy(commands.Cog):
         with open(self.economy_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def _save_economy(self, data: dict):
-        """Сохранение данных экономики"""
+    def _save_economy(self, data: dict, changed: Optional[Iterable[str]] = None):
+        """Сохранение данных экономики (changed - ID изменённых пользователей, если известны)"""
         with open(self.economy_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.economy_file, data, changed)
     
-    def _load_shop(self) -> dict:
-        """Загрузка данных магазина"""
-        with open(self.shop_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def _save_shop(self, data: dict):
-        """Сохранение данных магазина"""
-        with open(self.shop_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+    def _new_user_data(self) -> dict:
+        """Данные нового пользователя"""
+        return {
+            "balance": 0,
+            "inventory": [],
+            "game_stats": {
+                "slots_played": 0,
+                "slots_won": 0,
+                "roulette_played": 0,
+                "roulette_won": 0,
+                "coinflip_played": 0,
+                "coinflip_won": 0,
+                "total_won": 0,
+                "total_lost": 0
+            },
+            "achievements": {},
+            "transactions": []
+        }
     
     def _get_user_data(self, user_id: str) -> dict:
         """Получение данных пользователя"""
         economy = self._load_economy()
         if user_id not in economy:
-            economy[user_id] = {
-                "balance": 0,
-                "last_daily": None,
-                "last_work": None,
-                "last_weekly": None,
-                "last_monthly": None,
-                "inventory": [],
-                "game_stats": {
-                    "slots_played": 0,
-                    "slots_won": 0,
-                    "roulette_played": 0,
-                    "roulette_won": 0,
-                    "coinflip_played": 0,
-                    "coinflip_won": 0,
-                    "total_won": 0,
-                    "total_lost": 0
-                },
-                "achievements": {},
-                "transactions": []
-            }
-            self._save_economy(economy)
+            economy[user_id] = self._new_user_data()
+            self._save_economy(economy, [user_id])
         return economy[user_id]
     
     def _update_balance(self, user_id: str, amount: int):
@@ -88,29 +105,16 @@ class Economy(commands.Cog):
             economy = self._load_economy()
         
         economy[user_id]["balance"] += amount
-        self._save_economy(economy)
+        if amount > 0:
+            self.achievements.evaluate(economy[user_id], BALANCE_CHANGED)
+        self._save_economy(economy, [user_id])
     
-    def _check_cooldown(self, last_time: Optional[str], hours: int) -> tuple[bool, Optional[str]]:
+    def _check_cooldown(self, kind: str, user_id: str) -> tuple[bool, Optional[str]]:
         """Проверка кулдауна. Возвращает (доступно, время до доступности)"""
-        if last_time is None:
+        time_left = self.bot.cooldowns.remaining(kind, user_id)
+        if time_left == 0:
             return True, None
-        
-        last_dt = datetime.fromisoformat(last_time)
-        now = datetime.now()
-        cooldown = timedelta(hours=hours)
-        time_passed = now - last_dt
-        
-        if time_passed >= cooldown:
-            return True, None
-        
-        time_left = cooldown - time_passed
-        hours_left = int(time_left.total_seconds() // 3600)
-        minutes_left = int((time_left.total_seconds() % 3600) // 60)
-        
-        if hours_left > 0:
-            return False, f"{hours_left}ч {minutes_left}м"
-        else:
-            return False, f"{minutes_left}м"
+        return False, format_remaining(time_left)
 
     def _get_booster_multiplier(self, member: discord.Member) -> float:
         """Получить множитель для бустера сервера"""
@@ -125,46 +129,78 @@ class Economy(commands.Cog):
             self._get_user_data(user_id)
             economy = self._load_economy()
         
-        transaction = {
-            "type": trans_type,
-            "amount": amount,
-            "timestamp": datetime.now().isoformat(),
-            "details": details
-        }
-        
-        if "transactions" not in economy[user_id]:
-            economy[user_id]["transactions"] = []
-        
-        economy[user_id]["transactions"].insert(0, transaction)
-        economy[user_id]["transactions"] = economy[user_id]["transactions"][:100]
-        self._save_economy(economy)
+        record_transaction(economy[user_id], trans_type, amount, details)
+        self._save_economy(economy, [user_id])
     
-    def _check_achievement(self, user_id: str, achievement_id: str) -> bool:
-        """Проверить и разблокировать достижение если еще не разблокировано"""
-        economy = self._load_economy()
-        if user_id not in economy:
-            return False
-        
-        if "achievements" not in economy[user_id]:
-            economy[user_id]["achievements"] = {}
-        
-        if achievement_id not in economy[user_id]["achievements"]:
-            economy[user_id]["achievements"][achievement_id] = {
-                "unlocked": True,
-                "date": datetime.now().isoformat()
-            }
-            self._save_economy(economy)
-            return True
-        return False
+    def _check_balances(self, economy: dict, changes: Dict[str, int]) -> Dict[str, List[Achievement]]:
+        """
+        Достижения за баланс после массовой операции (changes - {user_id: изменение})
+        
+        Returns:
+            {user_id: открытые достижения} - только пользователи с новыми достижениями
+        """
+        unlocked = {}
+        for user_id, delta in changes.items():
+            if delta > 0 and user_id in economy:
+                achievements = self.achievements.evaluate(economy[user_id], BALANCE_CHANGED)
+                if achievements:
+                    unlocked[user_id] = achievements
+        return unlocked
+    
+    def _reward_achievements(self, user: dict, kind: str) -> List[Achievement]:
+        """Достижения за полученную награду (daily, work, ...) и новый баланс"""
+        unlocked = self.achievements.evaluate(user, REWARD_CLAIMED, kind=kind)
+        unlocked += self.achievements.evaluate(user, BALANCE_CHANGED)
+        return unlocked
+    
+    def _game_achievements(self, user: dict, game: str, won: bool, jackpot: bool = False) -> List[Achievement]:
+        """Достижения за сыгранную игру (и за баланс, если она выиграна)"""
+        unlocked = self.achievements.evaluate(user, GAME_PLAYED, game=game, jackpot=jackpot)
+        if won:
+            unlocked += self.achievements.evaluate(user, BALANCE_CHANGED)
+        return unlocked
+    
+    def _add_achievement_fields(self, em: discord.Embed, unlocked: List[Achievement]):
+        """Поля с только что открытыми достижениями"""
+        for achievement in unlocked:
+            value = f"+{achievement.reward:,} {self.currency_emoji}" if achievement.reward else achievement.desc
+            em.add_field(name=f"🏆 Достижение: {achievement.emoji} {achievement.name}", value=value, inline=False)
+    
+    async def _log_achievements(self, guild: Optional[discord.Guild], user: discord.abc.User, unlocked: List[Achievement]):
+        """Логирование открытых достижений"""
+        logs_cog = self.bot.get_cog('Logs')
+        if not logs_cog or not guild:
+            return
+        for achievement in unlocked:
+            await logs_cog.log_achievement(
+                guild=guild,
+                user=user,
+                achievement_name=achievement.name,
+                reward=achievement.reward
+            )
     
-    def reward_level_up(self, user_id: str, level: int, multiplier: float = 1.0) -> int:
-        """Выдаёт награду за повышение уровня"""
+    def reward_level_up(self, user_id: str, level: int, multiplier: float = 1.0) -> tuple[int, List[Achievement]]:
+        """
+        Выдаёт награду за повышение уровня и открывает достижения за уровень
+        (одно сохранение economy.json)
+        
+        Returns:
+            (награда за уровень, открытые достижения)
+        """
         base_reward = level * 50  # 50 крионов за уровень
         bonus = 200 if level % 10 == 0 else 0  # Бонус каждые 10 уровней
         total = int((base_reward + bonus) * multiplier)
-        self._update_balance(user_id, total)
-        self._add_transaction(user_id, "level_up", total, f"Достижение {level} уровня")
-        return total
+        
+        economy = self._load_economy()
+        user = economy.get(user_id)
+        if user is None:
+            user = economy[user_id] = self._new_user_data()
+        user["balance"] += total
+        record_transaction(user, "level_up", total, f"Достижение {level} уровня")
+        unlocked = self.achievements.evaluate(user, LEVEL_REACHED, level=level)
+        unlocked += self.achievements.evaluate(user, BALANCE_CHANGED)
+        self._save_economy(economy, [user_id])
+        return total, unlocked
     
     # ==================== ПОЛЬЗОВАТЕЛЬСКИЕ КОМАНДЫ ====================
     
@@ -190,7 +226,7 @@ class Economy(commands.Cog):
         user_id = str(interaction.user.id)
         user_data = self._get_user_data(user_id)
         
-        can_claim, time_left = self._check_cooldown(user_data.get("last_daily"), 24)
+        can_claim, time_left = self._check_cooldown("daily", user_id)
         
         if not can_claim:
             em = EmbedBuilder.warning(
@@ -208,14 +244,10 @@ class Economy(commands.Cog):
         
         economy = self._load_economy()
         economy[user_id]["balance"] += reward
-        economy[user_id]["last_daily"] = datetime.now().isoformat()
-        self._save_economy(economy)
-        
-        # Добавляем транзакцию
-        self._add_transaction(user_id, "daily", reward, "Ежедневная награда")
-        
-        # Проверяем достижение
-        self._check_achievement(user_id, "first_daily")
+        record_transaction(economy[user_id], "daily", reward, "Ежедневная награда")
+        unlocked = self._reward_achievements(economy[user_id], "daily")
+        self._save_economy(economy, [user_id])
+        self.bot.cooldowns.set("daily", user_id, self.cooldown_seconds["daily"])
         
         fields = []
         if multiplier > 1.0:
@@ -228,9 +260,11 @@ class Economy(commands.Cog):
             user=interaction.user,
             fields=fields
         )
+        self._add_achievement_fields(em, unlocked)
         em.set_footer(text="Возвращайтесь завтра за новой наградой!")
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="work", description="💼 Поработать и заработать крионы")
     async def work(self, interaction: discord.Interaction):
@@ -238,7 +272,7 @@ class Economy(commands.Cog):
         user_id = str(interaction.user.id)
         user_data = self._get_user_data(user_id)
         
-        can_work, time_left = self._check_cooldown(user_data.get("last_work"), 1)
+        can_work, time_left = self._check_cooldown("work", user_id)
         
         if not can_work:
             em = EmbedBuilder.warning(
@@ -267,14 +301,10 @@ class Economy(commands.Cog):
         
         economy = self._load_economy()
         economy[user_id]["balance"] += reward
-        economy[user_id]["last_work"] = datetime.now().isoformat()
-        self._save_economy(economy)
-        
-        # Добавляем транзакцию
-        self._add_transaction(user_id, "work", reward, job)
-        
-        # Проверяем достижение
-        self._check_achievement(user_id, "first_work")
+        record_transaction(economy[user_id], "work", reward, job)
+        unlocked = self._reward_achievements(economy[user_id], "work")
+        self._save_economy(economy, [user_id])
+        self.bot.cooldowns.set("work", user_id, self.cooldown_seconds["work"])
         
         fields = []
         if multiplier > 1.0:
@@ -287,9 +317,11 @@ class Economy(commands.Cog):
             user=interaction.user,
             fields=fields
         )
+        self._add_achievement_fields(em, unlocked)
         em.set_footer(text="Возвращайтесь через час!")
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="weekly", description="📅 Получить еженедельную награду")
     async def weekly(self, interaction: discord.Interaction):
@@ -297,7 +329,7 @@ class Economy(commands.Cog):
         user_id = str(interaction.user.id)
         user_data = self._get_user_data(user_id)
         
-        can_claim, time_left = self._check_cooldown(user_data.get("last_weekly"), 24 * 7)
+        can_claim, time_left = self._check_cooldown("weekly", user_id)
         
         if not can_claim:
             em = discord.Embed(
@@ -313,11 +345,11 @@ class Economy(commands.Cog):
         reward = int(base_reward * multiplier)
         
         economy = self._load_economy()
-        economy[user_id][" balance"] += reward
-        economy[user_id]["last_weekly"] = datetime.now().isoformat()
-        self._save_economy(economy)
-        
-        self._add_transaction(user_id, "weekly", reward, "Еженедельная награда")
+        economy[user_id]["balance"] += reward
+        record_transaction(economy[user_id], "weekly", reward, "Еженедельная награда")
+        unlocked = self._reward_achievements(economy[user_id], "weekly")
+        self._save_economy(economy, [user_id])
+        self.bot.cooldowns.set("weekly", user_id, self.cooldown_seconds["weekly"])
         
         em = discord.Embed(
             title="📅 Еженедельная награда получена!",
@@ -333,9 +365,11 @@ class Economy(commands.Cog):
             )
         
         em.add_field(name="Новый баланс", value=f"{economy[user_id]['balance']:,} {self.currency_emoji}")
+        self._add_achievement_fields(em, unlocked)
         em.set_footer(text="Возвращайтесь через неделю!")
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="monthly", description="🗓️ Получить ежемесячную награду")
     async def monthly(self, interaction: discord.Interaction):
@@ -343,7 +377,7 @@ class Economy(commands.Cog):
         user_id = str(interaction.user.id)
         user_data = self._get_user_data(user_id)
         
-        can_claim, time_left = self._check_cooldown(user_data.get("last_monthly"), 24 * 30)
+        can_claim, time_left = self._check_cooldown("monthly", user_id)
         
         if not can_claim:
             em = discord.Embed(
@@ -361,10 +395,10 @@ class Economy(commands.Cog):
         
         economy = self._load_economy()
         economy[user_id]["balance"] += reward
-        economy[user_id]["last_monthly"] = datetime.now().isoformat()
-        self._save_economy(economy)
-        
-        self._add_transaction(user_id, "monthly", reward, "Ежемесячная награда")
+        record_transaction(economy[user_id], "monthly", reward, "Ежемесячная награда")
+        unlocked = self._reward_achievements(economy[user_id], "monthly")
+        self._save_economy(economy, [user_id])
+        self.bot.cooldowns.set("monthly", user_id, self.cooldown_seconds["monthly"])
         
         em = discord.Embed(
             title="🗓️ Ежемесячная награда получена!",
@@ -380,9 +414,11 @@ class Economy(commands.Cog):
             )
         
         em.add_field(name="Новый баланс", value=f"{economy[user_id]['balance']:,} {self.currency_emoji}")
+        self._add_achievement_fields(em, unlocked)
         em.set_footer(text="Возвращайтесь через месяц!")
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="transfer", description="💸 Передать крионы другому пользователю")
     @app_commands.describe(
@@ -427,7 +463,8 @@ class Economy(commands.Cog):
             economy = self._load_economy()
         
         economy[receiver_id]["balance"] += amount
-        self._save_economy(economy)
+        unlocked = self.achievements.evaluate(economy[receiver_id], BALANCE_CHANGED)
+        self._save_economy(economy, [sender_id, receiver_id])
         
         # Логируем транзакции
         self._add_transaction(sender_id, "transfer", -amount, f"Отправлено {user.display_name}")
@@ -455,42 +492,23 @@ class Economy(commands.Cog):
         )
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, user, unlocked)
     
     @app_commands.command(name="leaderboard", description="🏆 Топ самых богатых пользователей")
     async def leaderboard(self, interaction: discord.Interaction):
         """Рейтинг пользователей по балансу"""
-        economy = self._load_economy()
-        
-        if not economy:
+        if not self.bot.leaderboards.size("balance"):
             await interaction.response.send_message("❌ Пока никто не зарабатывал крионы!", ephemeral=True)
             return
         
-        # Сортируем по балансу
-        sorted_users = sorted(economy.items(), key=lambda x: x[1]["balance"], reverse=True)[:10]
-        
-        entries = []
-        for idx, (user_id, data) in enumerate(sorted_users, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                entries.append((user.display_name, f"{data['balance']:,} {self.currency_emoji}"))
-            except:
-                continue
-        
-        em = EmbedBuilder.leaderboard(
-            title="Топ богатых пользователей",
-            description="10 самых богатых участников сервера",
-            entries=entries,
-            user=interaction.user,
-            color=Colors.PREMIUM
-        )
-        
-        await interaction.response.send_message(embed=em)
+        # Только участники этого сервера
+        view = LeaderboardView(self.bot, "balance", interaction.user, interaction.guild, guild_only=True)
+        await interaction.response.send_message(embed=await view.render(), view=view)
     
     @app_commands.command(name="shop", description="🛒 Посмотреть магазин")
     async def shop(self, interaction: discord.Interaction):
         """Показать магазин товаров"""
-        shop_data = self._load_shop()
-        items = shop_data.get("items", [])
+        items = self.catalog.all()
         
         if not items:
             em = EmbedBuilder.info(
@@ -517,7 +535,7 @@ class Economy(commands.Cog):
                 inline=False
             )
         
-        em.set_footer(text=f"Всего товаров: {len(items)}")
+        em.set_footer(text=f"Всего товаров: {len(items)} | Ролей: {len(self.catalog.by_type('role'))}")
         
         await interaction.response.send_message(embed=em)
 
@@ -528,14 +546,7 @@ class Economy(commands.Cog):
         """Покупка товара из магазина"""
         user_id = str(interaction.user.id)
         user_data = self._get_user_data(user_id)
-        shop_data = self._load_shop()
-        
-        # Ищем товар
-        item = None
-        for shop_item in shop_data.get("items", []):
-            if shop_item["id"] == item_id:
-                item = shop_item
-                break
+        item = self.catalog.get(item_id)
         
         if not item:
             await interaction.response.send_message(f"❌ Товар с ID {item_id} не найден!", ephemeral=True)
@@ -580,7 +591,7 @@ class Economy(commands.Cog):
         if "inventory" not in economy[user_id]:
             economy[user_id]["inventory"] = []
         economy[user_id]["inventory"].append(item_id)
-        self._save_economy(economy)
+        self._save_economy(economy, [user_id])
         
         # Логирование покупки
         logs_cog = self.bot.get_cog('Logs')
@@ -620,25 +631,23 @@ class Economy(commands.Cog):
             await interaction.response.send_message(embed=em, ephemeral=True)
             return
         
-        shop_data = self._load_shop()
-        
         em = discord.Embed(
             title="🎒 Ваш инвентарь",
             description=f"У вас {len(inventory)} предметов",
             color=discord.Color.purple()
         )
         
-        for item_id in inventory:
-            # Ищем товар в магазине
-            for shop_item in shop_data.get("items", []):
-                if shop_item["id"] == item_id:
-                    item_type = "🎭 Роль" if shop_item["type"] == "role" else "📦 Предмет"
-                    em.add_field(
-                        name=f"{shop_item['name']} {item_type}",
-                        value=f"ID: {item_id} | Цена: {shop_item['price']:,} {self.currency_emoji}",
-                        inline=False
-                    )
-                    break
+        for item_id, count in Counter(inventory).items():
+            shop_item = self.catalog.get(item_id)
+            if not shop_item:
+                continue
+            item_type = "🎭 Роль" if shop_item["type"] == "role" else "📦 Предмет"
+            amount = f" x{count}" if count > 1 else ""
+            em.add_field(
+                name=f"{shop_item['name']}{amount} {item_type}",
+                value=f"ID: {item_id} | Цена: {shop_item['price']:,} {self.currency_emoji}",
+                inline=False
+            )
         
         await interaction.response.send_message(embed=em, ephemeral=True)
     
@@ -672,12 +681,12 @@ class Economy(commands.Cog):
         # Проверяем выигрыш
         winnings = 0
         multiplier_text = ""
+        jackpot = reels.count("7️⃣") == 3
         
         if reels[0] == reels[1] == reels[2]:
-            if reels[0] == "7️⃣":
+            if jackpot:
                 winnings = bet * 50
                 multiplier_text = "ДЖЕКПОТ x50!"
-                self._check_achievement(user_id, "jackpot")
             elif reels[0] == "💎":
                 winnings = bet * 10
                 multiplier_text = "x10"
@@ -710,16 +719,13 @@ class Economy(commands.Cog):
         if winnings > bet:
             economy[user_id]["game_stats"]["slots_won"] = economy[user_id]["game_stats"].get("slots_won", 0) + 1
             economy[user_id]["game_stats"]["total_won"] = economy[user_id]["game_stats"].get("total_won", 0) + (winnings - bet)
-            self._add_transaction(user_id, "game_win", winnings - bet, "Слоты (выигрыш)")
+            record_transaction(economy[user_id], "game_win", winnings - bet, "Слоты (выигрыш)")
         else:
             economy[user_id]["game_stats"]["total_lost"] = economy[user_id]["game_stats"].get("total_lost", 0) + bet
-            self._add_transaction(user_id, "game_loss", -bet, "Слоты (проигрыш)")
+            record_transaction(economy[user_id], "game_loss", -bet, "Слоты (проигрыш)")
         
-        self._save_economy(economy)
-        
-        # Достижение за первую игру
-        if economy[user_id]["game_stats"].get("slots_played", 0) == 1:
-            self._check_achievement(user_id, "first_game")
+        unlocked = self._game_achievements(economy[user_id], "slots", winnings > bet, jackpot=jackpot)
+        self._save_economy(economy, [user_id])
         
         # Результат
         result = " | ".join(reels)
@@ -747,8 +753,10 @@ class Economy(commands.Cog):
             em.add_field(name="Потеря", value=f"-{bet:,} {self.currency_emoji}", inline=True)
         
         em.add_field(name="Новый баланс", value=f"{economy[user_id]['balance']:,} {self.currency_emoji}", inline=False)
+        self._add_achievement_fields(em, unlocked)
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="roulette", description="🎲 Сыграть в рулетку")
     @app_commands.describe(
@@ -806,12 +814,13 @@ class Economy(commands.Cog):
         if winnings > bet:
             economy[user_id]["game_stats"]["roulette_won"] = economy[user_id]["game_stats"].get("roulette_won", 0) + 1
             economy[user_id]["game_stats"]["total_won"] = economy[user_id]["game_stats"].get("total_won", 0) + (winnings - bet)
-            self._add_transaction(user_id, "game_win", winnings - bet, "Рулетка (выигрыш)")
+            record_transaction(economy[user_id], "game_win", winnings - bet, "Рулетка (выигрыш)")
         else:
             economy[user_id]["game_stats"]["total_lost"] = economy[user_id]["game_stats"].get("total_lost", 0) + bet
-            self._add_transaction(user_id, "game_loss", -bet, "Рулетка (проигрыш)")
+            record_transaction(economy[user_id], "game_loss", -bet, "Рулетка (проигрыш)")
         
-        self._save_economy(economy)
+        unlocked = self._game_achievements(economy[user_id], "roulette", winnings > bet)
+        self._save_economy(economy, [user_id])
         
         # Результат
         if winnings > 0:
@@ -831,8 +840,10 @@ class Economy(commands.Cog):
             em.add_field(name="Потеря", value=f"-{bet:,} {self.currency_emoji}", inline=True)
         
         em.add_field(name="Новый баланс", value=f"{economy[user_id]['balance']:,} {self.currency_emoji}", inline=False)
+        self._add_achievement_fields(em, unlocked)
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     @app_commands.command(name="coinflip", description="🪙 Подбросить монетку")
     @app_commands.describe(
@@ -882,12 +893,13 @@ class Economy(commands.Cog):
         if winnings > bet:
             economy[user_id]["game_stats"]["coinflip_won"] = economy[user_id]["game_stats"].get("coinflip_won", 0) + 1
             economy[user_id]["game_stats"]["total_won"] = economy[user_id]["game_stats"].get("total_won", 0) + (winnings - bet)
-            self._add_transaction(user_id, "game_win", winnings - bet, "Монетка (выигрыш)")
+            record_transaction(economy[user_id], "game_win", winnings - bet, "Монетка (выигрыш)")
         else:
             economy[user_id]["game_stats"]["total_lost"] = economy[user_id]["game_stats"].get("total_lost", 0) + bet
-            self._add_transaction(user_id, "game_loss", -bet, "Монетка (проигрыш)")
+            record_transaction(economy[user_id], "game_loss", -bet, "Монетка (проигрыш)")
         
-        self._save_economy(economy)
+        unlocked = self._game_achievements(economy[user_id], "coinflip", winnings > bet)
+        self._save_economy(economy, [user_id])
         
         # Результат
         if winnings > 0:
@@ -907,8 +919,10 @@ class Economy(commands.Cog):
             em.add_field(name="Потеря", value=f"-{bet:,} {self.currency_emoji}", inline=True)
         
         em.add_field(name="Новый баланс", value=f"{economy[user_id]['balance']:,} {self.currency_emoji}", inline=False)
+        self._add_achievement_fields(em, unlocked)
         
         await interaction.response.send_message(embed=em)
+        await self._log_achievements(interaction.guild, interaction.user, unlocked)
     
     # ==================== ДОСТИЖЕНИЯ И ИСТОРИЯ ====================
     
@@ -923,23 +937,21 @@ class Economy(commands.Cog):
         unlocked_achievements = user_data.get("achievements", {})
         
         # Все достижения
-        all_achievements = {
-            "first_daily": {"name": "Первый день", "desc": "Получить первую ежедневную награду", "emoji": "🎁"},
-            "first_work": {"name": "Трудоголик", "desc": "Поработать первый раз", "emoji": "💼"},
-            "first_game": {"name": "Игрок", "desc": "Сыграть первую игру", "emoji": "🎰"},
-            "jackpot": {"name": "Джекпот!", "desc": "Сорвать джекпот в слотах", "emoji": "💰"},
-            "millionaire": {"name": "Миллионер", "desc": "Накопить 1,000,000 крионов", "emoji": "💎"},
-        }
+        all_achievements = self.achievements.all()
+        unlocked_count = sum(1 for ach in all_achievements if ach.id in unlocked_achievements)
         
         em = discord.Embed(
             title=f"🏆 Достижения {target.display_name}",
-            description=f"Разблокировано: {len(unlocked_achievements)}/{len(all_achievements)}",
+            description=f"Разблокировано: {unlocked_count}/{len(all_achievements)}",
             color=discord.Color.gold()
         )
         
-        for ach_id, ach_info in all_achievements.items():
-            if ach_id in unlocked_achievements:
-                date = unlocked_achievements[ach_id].get("date", "Неизвестно")
+        for ach in all_achievements:
+            desc = ach.desc
+            if ach.reward:
+                desc += f" (+{ach.reward:,} {self.currency_emoji})"
+            if ach.id in unlocked_achievements:
+                date = unlocked_achievements[ach.id].get("date", "Неизвестно")
                 if date != "Неизвестно":
                     try:
                         dt = datetime.fromisoformat(date)
@@ -949,21 +961,17 @@ class Economy(commands.Cog):
                 else:
                     date_str = date
                 em.add_field(
-                    name=f"✅ {ach_info['emoji']} {ach_info['name']}",
-                    value=f"{ach_info['desc']}\n*Получено: {date_str}*",
+                    name=f"✅ {ach.emoji} {ach.name}",
+                    value=f"{desc}\n*Получено: {date_str}*",
                     inline=False
                 )
             else:
                 em.add_field(
-                    name=f"🔒 {ach_info['emoji']} {ach_info['name']}",
-                    value=ach_info['desc'],
+                    name=f"🔒 {ach.emoji} {ach.name}",
+                    value=desc,
                     inline=False
                 )
         
-        # Проверяем достижение миллионера
-        if user_data.get("balance", 0) >= 1000000:
-            self._check_achievement(user_id, "millionaire")
-        
         await interaction.response.send_message(embed=em)
     
     @app_commands.command(name="history", description="📜 История транзакций")
@@ -1113,7 +1121,8 @@ class Economy(commands.Cog):
             economy = self._load_economy()
         
         economy[user_id]["balance"] = amount
-        self._save_economy(economy)
+        self.achievements.evaluate(economy[user_id], BALANCE_CHANGED)
+        self._save_economy(economy, [user_id])
         
         em = discord.Embed(
             title="✅ Баланс установлен",
@@ -1135,7 +1144,8 @@ class Economy(commands.Cog):
             economy = self._load_economy()
             if user_id in economy:
                 del economy[user_id]
-                self._save_economy(economy)
+                self._save_economy(economy, [user_id])
+                self.bot.cooldowns.clear_kinds(self.cooldown_seconds, user_id)
                 await interaction.response.send_message(
                     f"✅ Экономика пользователя {user.mention} сброшена!",
                     ephemeral=True
@@ -1155,6 +1165,204 @@ class Economy(commands.Cog):
             )
             await interaction.response.send_message(embed=em, view=view, ephemeral=True)
     
+    async def _log_bulk(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        summary: dict,
+        details: str,
+        unlocked: Optional[Dict[str, List[Achievement]]] = None
+    ):
+        """Одна запись в логах на всю массовую операцию и достижения участников сервера"""
+        logs_cog = self.bot.get_cog('Logs')
+        if logs_cog and interaction.guild:
+            await logs_cog.log_admin_action(
+                guild=interaction.guild,
+                admin=interaction.user,
+                action=action,
+                details=f"{details}\nПользователей: {summary['users']:,} | Итого: {summary['total']:+,} {self.currency_emoji}"
+            )
+            for user_id, achievements in (unlocked or {}).items():
+                member = interaction.guild.get_member(int(user_id))
+                if member:
+                    await self._log_achievements(interaction.guild, member, achievements)
+    
+    def _bulk_embed(
+        self,
+        interaction: discord.Interaction,
+        title: str,
+        description: str,
+        summary: dict,
+        unlocked: Optional[Dict[str, List[Achievement]]] = None
+    ) -> discord.Embed:
+        """Итог массовой операции"""
+        fields = [
+            ("Пользователей", f"{summary['users']:,}", True),
+            ("Изменение массы денег", f"{summary['total']:+,} {self.currency_emoji}", True)
+        ]
+        if unlocked:
+            counts = Counter(achievement.id for achievements in unlocked.values() for achievement in achievements)
+            lines = []
+            for achievement_id, count in counts.items():
+                achievement = self.achievements.get(achievement_id)
+                lines.append(f"{achievement.emoji} {achievement.name}: {count:,}")
+            fields.append(("🏆 Открыто достижений", "\n".join(lines), False))
+        return EmbedBuilder.admin(
+            title=title,
+            description=description,
+            admin=interaction.user,
+            fields=fields
+        )
+    
+    @app_commands.command(name="eco-add-role", description="👥 [ADMIN] Начислить крионы всем с ролью")
+    @app_commands.describe(
+        role="Роль",
+        amount="Количество крионов каждому"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def eco_add_role(self, interaction: discord.Interaction, role: discord.Role, amount: int):
+        """Начислить крионы всем участникам с ролью одним сохранением"""
+        if amount <= 0:
+            await interaction.response.send_message("❌ Сумма должна быть больше 0!", ephemeral=True)
+            return
+        
+        members = [member for member in role.members if not member.bot]
+        if not members:
+            await interaction.response.send_message(f"❌ У роли {role.mention} нет участников!", ephemeral=True)
+            return
+        
+        economy = self._load_economy()
+        summary = add_to_users(
+            economy,
+            (str(member.id) for member in members),
+            amount,
+            f"Начисление роли {role.name}",
+            self._new_user_data
+        )
+        unlocked = self._check_balances(economy, summary["changes"])
+        self._save_economy(economy, summary["changes"])
+        
+        await self._log_bulk(interaction, "Массовое начисление", summary, f"Роль: {role.mention}, по {amount:,} {self.currency_emoji}", unlocked)
+        
+        em = self._bulk_embed(
+            interaction,
+            "Крионы начислены",
+            f"**{amount:,}** {self.currency_emoji} начислено каждому с ролью {role.mention}",
+            summary,
+            unlocked
+        )
+        await interaction.response.send_message(embed=em)
+    
+    @app_commands.command(name="eco-scale", description="📐 [ADMIN] Умножить все балансы на коэффициент")
+    @app_commands.describe(factor="Коэффициент (например, 0.5 - урезать вдвое, 2 - удвоить)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def eco_scale(self, interaction: discord.Interaction, factor: app_commands.Range[float, 0.01, 10.0]):
+        """Пересчитать все балансы (деноминация, инфляция) - с подтверждением"""
+        if factor == 1:
+            await interaction.response.send_message("❌ Коэффициент 1 ничего не изменит!", ephemeral=True)
+            return
+        
+        async def apply(confirm_interaction: discord.Interaction) -> discord.Embed:
+            economy = self._load_economy()
+            summary = scale_balances(economy, factor, f"Пересчёт балансов x{factor:g}")
+            unlocked = self._check_balances(economy, summary["changes"])
+            self._save_economy(economy, summary["changes"])
+            await self._log_bulk(confirm_interaction, "Пересчёт балансов", summary, f"Коэффициент: x{factor:g}", unlocked)
+            return self._bulk_embed(
+                confirm_interaction,
+                "Балансы пересчитаны",
+                f"Все балансы умножены на **{factor:g}**",
+                summary,
+                unlocked
+            )
+        
+        em = discord.Embed(
+            title="⚠️ Подтверждение пересчёта",
+            description=f"Умножить баланс **каждого** пользователя на **{factor:g}**?",
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(embed=em, view=ConfirmBulkView(apply), ephemeral=True)
+    
+    @app_commands.command(name="eco-reset-inactive", description="🧹 [ADMIN] Сбросить неактивных пользователей")
+    @app_commands.describe(days="Сколько дней без транзакций считать неактивностью")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def eco_reset_inactive(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 3650]):
+        """Удалить данные экономики пользователей без активности за days дней - с подтверждением"""
+        preview = reset_inactive(dict(self._load_economy()), days)
+        if not preview["users"]:
+            await interaction.response.send_message(f"✅ Нет пользователей без активности за {days} дн.", ephemeral=True)
+            return
+        
+        async def apply(confirm_interaction: discord.Interaction) -> discord.Embed:
+            economy = self._load_economy()
+            summary = reset_inactive(economy, days)
+            self._save_economy(economy, summary["changes"])
+            for user_id in summary["changes"]:
+                self.bot.cooldowns.clear_kinds(self.cooldown_seconds, user_id)
+            await self._log_bulk(confirm_interaction, "Сброс неактивных", summary, f"Без транзакций: {days} дн.")
+            return self._bulk_embed(
+                confirm_interaction,
+                "Неактивные пользователи сброшены",
+                f"Удалены данные пользователей без транзакций за **{days}** дн.",
+                summary
+            )
+        
+        em = discord.Embed(
+            title="⚠️ Подтверждение сброса",
+            description=f"Сбросить экономику **{preview['users']:,}** пользователей без транзакций за {days} дн.?\n"
+                        f"Будет списано **{-preview['total']:,}** {self.currency_emoji}. Это действие необратимо!",
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(embed=em, view=ConfirmBulkView(apply), ephemeral=True)
+    
+    @app_commands.command(name="eco-apply-csv", description="📄 [ADMIN] Изменить балансы по CSV-файлу")
+    @app_commands.describe(file="CSV: user_id,сумма (+100/-50 - изменение, 500 - новый баланс)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def eco_apply_csv(self, interaction: discord.Interaction, file: discord.Attachment):
+        """Применить изменения балансов из CSV: все строки или ни одной"""
+        if file.size > self.csv_max_size:
+            await interaction.response.send_message(
+                f"❌ Файл больше {self.csv_max_size // 1024} КБ!",
+                ephemeral=True
+            )
+            return
+        
+        try:
+            text = (await file.read()).decode("utf-8-sig")
+        except (discord.HTTPException, UnicodeDecodeError):
+            await interaction.response.send_message("❌ Не удалось прочитать файл (нужен CSV в UTF-8)!", ephemeral=True)
+            return
+        
+        rows, errors = parse_balance_csv(text)
+        economy = self._load_economy()
+        if not errors:
+            summary, errors = apply_balance_rows(economy, rows, f"Изменение по файлу {file.filename}", self._new_user_data)
+        
+        if errors:
+            shown = "\n".join(errors[:10])
+            if len(errors) > 10:
+                shown += f"\n...и ещё {len(errors) - 10}"
+            em = EmbedBuilder.error(
+                title="Файл не применён",
+                description=shown,
+                user=interaction.user
+            )
+            await interaction.response.send_message(embed=em, ephemeral=True)
+            return
+        
+        unlocked = self._check_balances(economy, summary["changes"])
+        self._save_economy(economy, summary["changes"])
+        await self._log_bulk(interaction, "Изменение балансов по CSV", summary, f"Файл: {file.filename}, строк: {len(rows)}", unlocked)
+        
+        em = self._bulk_embed(
+            interaction,
+            "Балансы изменены",
+            f"Применён файл **{file.filename}** ({len(rows)} строк)",
+            summary,
+            unlocked
+        )
+        await interaction.response.send_message(embed=em)
+    
     @app_commands.command(name="shop-add", description="➕ [ADMIN] Добавить товар в магазин")
     @app_commands.describe(
         name="Название товара",
@@ -1182,22 +1390,17 @@ class Economy(commands.Cog):
             await interaction.response.send_message("❌ Для товара типа 'role' нужно указать роль!", ephemeral=True)
             return
         
-        shop_data = self._load_shop()
-        
-        new_item = {
-            "id": shop_data["next_id"],
-            "name": name,
-            "price": price,
-            "type": item_type,
-            "description": description or "Без описания"
-        }
-        
-        if item_type == "role" and role:
-            new_item["role_id"] = str(role.id)
+        if item_type == "role" and self.catalog.by_role(str(role.id)):
+            await interaction.response.send_message("❌ Эта роль уже продаётся в магазине!", ephemeral=True)
+            return
         
-        shop_data["items"].append(new_item)
-        shop_data["next_id"] += 1
-        self._save_shop(shop_data)
+        new_item = self.catalog.add(
+            name=name,
+            price=price,
+            item_type=item_type,
+            description=description,
+            role_id=str(role.id) if item_type == "role" and role else None
+        )
         
         em = discord.Embed(
             title="✅ Товар добавлен",
@@ -1217,22 +1420,12 @@ class Economy(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def shop_remove(self, interaction: discord.Interaction, item_id: int):
         """Удалить товар из магазина"""
-        shop_data = self._load_shop()
+        removed_item = self.catalog.remove(item_id)
         
-        # Ищем товар
-        item_found = False
-        for i, item in enumerate(shop_data["items"]):
-            if item["id"] == item_id:
-                removed_item = shop_data["items"].pop(i)
-                item_found = True
-                break
-        
-        if not item_found:
+        if not removed_item:
             await interaction.response.send_message(f"❌ Товар с ID {item_id} не найден!", ephemeral=True)
             return
         
-        self._save_shop(shop_data)
-        
         em = discord.Embed(
             title="✅ Товар удалён",
             description=f"**{removed_item['name']}** удалён из магазина!",
@@ -1256,14 +1449,7 @@ class Economy(commands.Cog):
         value: str
     ):
         """Изменить товар в магазине"""
-        shop_data = self._load_shop()
-        
-        # Ищем товар
-        item = None
-        for shop_item in shop_data["items"]:
-            if shop_item["id"] == item_id:
-                item = shop_item
-                break
+        item = self.catalog.get(item_id)
         
         if not item:
             await interaction.response.send_message(f"❌ Товар с ID {item_id} не найден!", ephemeral=True)
@@ -1276,14 +1462,12 @@ class Economy(commands.Cog):
                 if price <= 0:
                     await interaction.response.send_message("❌ Цена должна быть больше 0!", ephemeral=True)
                     return
-                item["price"] = price
             except ValueError:
                 await interaction.response.send_message("❌ Цена должна быть числом!", ephemeral=True)
                 return
+            self.catalog.update(item_id, field, price)
         else:
-            item[field] = value
-        
-        self._save_shop(shop_data)
+            self.catalog.update(item_id, field, value)
         
         em = discord.Embed(
             title="✅ Товар изменён",
@@ -1299,6 +1483,10 @@ class Economy(commands.Cog):
     @eco_remove.error
     @eco_set.error
     @eco_reset.error
+    @eco_add_role.error
+    @eco_scale.error
+    @eco_reset_inactive.error
+    @eco_apply_csv.error
     @shop_add.error
     @shop_remove.error
     @shop_edit.error
@@ -1319,8 +1507,8 @@ class ConfirmResetView(discord.ui.View):
     @discord.ui.button(label="Подтвердить сброс", style=discord.ButtonStyle.danger, emoji="⚠️")
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Сбрасываем экономику
-        with open(self.economy_cog.economy_file, 'w', encoding='utf-8') as f:
-            json.dump({}, f, ensure_ascii=False, indent=4)
+        self.economy_cog._save_economy({})
+        self.economy_cog.bot.cooldowns.clear_kinds(self.economy_cog.cooldown_seconds)
         
         em = discord.Embed(
             title="✅ Экономика сброшена",
@@ -1339,5 +1527,45 @@ class ConfirmResetView(discord.ui.View):
         await interaction.response.edit_message(embed=em, view=None)
 
 
+class ConfirmBulkView(discord.ui.View):
+    """View для подтверждения массовой операции над балансами"""
+    def __init__(self, apply):
+        super().__init__(timeout=30)
+        self.apply = apply  # async (interaction) -> embed с итогом
+        self.finished = False
+    
+    def _finish(self) -> bool:
+        """Закрыть view до выполнения операции; False - его уже закрыло другое нажатие"""
+        if self.finished:
+            return False
+        self.finished = True
+        for item in self.children:
+            item.disabled = True
+        self.stop()
+        return True
+    
+    @discord.ui.button(label="Подтвердить", style=discord.ButtonStyle.danger, emoji="⚠️")
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Флаг ставится до первого await: повторное нажатие во время apply
+        # не запустит операцию второй раз
+        if not self._finish():
+            await interaction.response.send_message("❌ Операция уже выполняется или отменена.", ephemeral=True)
+            return
+        em = await self.apply(interaction)
+        await interaction.response.edit_message(embed=em, view=None)
+    
+    @discord.ui.button(label="Отмена", style=discord.ButtonStyle.secondary, emoji="❌")
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not self._finish():
+            await interaction.response.send_message("❌ Операция уже выполняется или отменена.", ephemeral=True)
+            return
+        em = discord.Embed(
+            title="❌ Отменено",
+            description="Операция отменена.",
+            color=discord.Color.blue()
+        )
+        await interaction.response.edit_message(embed=em, view=None)
+
+
 async def setup(bot):
     await bot.add_cog(Economy(bot))
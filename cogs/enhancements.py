@@ -38,6 +38,7 @@ class Enhancements(commands.Cog):
     def _save_data(self, data):
         with open(self.enhancements_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.enhancements_file, data)
     
     def _get_user_level(self, user_id: str) -> int:
         levels_cog = self.bot.get_cog('Levels')
@@ -89,7 +90,7 @@ class Enhancements(commands.Cog):
             if user_id in levels_data:
                 levels_data[user_id]["level"] = 1
                 levels_data[user_id]["xp"] = 0
-                levels_cog._save_levels(levels_data)
+                levels_cog._save_levels(levels_data, [user_id])
         
         # Сохраняем престиж
         data["prestiges"][user_id] = new_prestige
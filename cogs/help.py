@@ -66,6 +66,10 @@ class HelpCog(commands.Cog):
                     ("eco-remove", "[ADMIN] Убрать крионы у пользователя"),
                     ("eco-set", "[ADMIN] Установить баланс пользователю"),
                     ("eco-reset", "[ADMIN] Сбросить экономику"),
+                    ("eco-add-role", "[ADMIN] Начислить крионы всем с ролью"),
+                    ("eco-scale", "[ADMIN] Умножить все балансы на коэффициент"),
+                    ("eco-reset-inactive", "[ADMIN] Сбросить неактивных пользователей"),
+                    ("eco-apply-csv", "[ADMIN] Изменить балансы по CSV-файлу"),
                     ("shop-add", "[ADMIN] Добавить товар в магазин"),
                     ("shop-remove", "[ADMIN] Удалить товар из магазина"),
                     ("shop-edit", "[ADMIN] Изменить товар в магазине"),
@@ -4,10 +4,12 @@ from discord import app_commands
 from discord.ext import commands
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 import random
-from typing import Optional
+from typing import Iterable, Optional
+from utils.cooldowns import format_remaining
 from utils.embed_builder import EmbedBuilder, Colors
+from utils.leaderboard_view import LeaderboardView
 
 class Levels(commands.Cog):
     """Система уровней и опыта с интеграцией в экономику"""
@@ -16,6 +18,8 @@ class Levels(commands.Cog):
         self.bot = bot
         self.levels_file = 'levels.json'
         self._ensure_file()
+        levels = self._load_levels()
+        self.bot.datastore.publish(self.levels_file, levels)
         
         # Настройки XP
         self.xp_per_message = (15, 25)  # Мин и макс XP за сообщение
@@ -24,7 +28,12 @@ class Levels(commands.Cog):
         self.reaction_limit_per_hour = 10  # Максимум реакций в час
         self.voice_xp = 10  # XP за 5 минут в войсе
         self.voice_interval = 300  # Секунды (5 минут)
+        self.voice_joined = set()  # Кто зашёл в войс при работающем боте (истёкший кулдаун не значит "не заходил")
         self.dailyxp_amount = (200, 400)  # Диапазон ежедневного бонуса
+        self.dailyxp_cooldown = 24 * 3600  # Секунды между ежедневными бонусами
+        
+        # Перенос кулдауна /dailyxp, записанного раньше в levels.json
+        self.bot.cooldowns.import_timestamps("dailyxp", levels, "last_dailyxp", self.dailyxp_cooldown)
         
         # Множитель для бустеров
         self.booster_multiplier = 1.2
@@ -40,10 +49,11 @@ class Levels(commands.Cog):
         with open(self.levels_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def _save_levels(self, data: dict):
-        """Сохранение данных уровней"""
+    def _save_levels(self, data: dict, changed: Optional[Iterable[str]] = None):
+        """Сохранение данных уровней (changed - ID изменённых пользователей, если известны)"""
         with open(self.levels_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.levels_file, data, changed)
     
     def _get_user_data(self, user_id: str) -> dict:
         """Получение данных пользователя"""
@@ -54,15 +64,12 @@ class Levels(commands.Cog):
                 "level": 1,
                 "total_xp": 0,
                 "messages_sent": 0,
-                "last_xp_gain": None,
-                "last_dailyxp": None,
                 "last_reaction_xp": None,
-                "voice_xp_last": None,
                 "level_up_notifications": True,
                 "reaction_count_hour": 0,
                 "reaction_hour_start": None
             }
-            self._save_levels(levels)
+            self._save_levels(levels, [user_id])
         return levels[user_id]
     
     def _xp_for_level(self, level: int) -> int:
@@ -75,31 +82,6 @@ class Levels(commands.Cog):
             return self.booster_multiplier
         return 1.0
     
-    def _check_cooldown(self, last_time: Optional[str], seconds: int) -> tuple[bool, Optional[str]]:
-        """Проверка кулдауна. Возвращает (доступно, время до доступности)"""
-        if last_time is None:
-            return True, None
-        
-        last_dt = datetime.fromisoformat(last_time)
-        now = datetime.now()
-        cooldown = timedelta(seconds=seconds)
-        time_passed = now - last_dt
-        
-        if time_passed >= cooldown:
-            return True, None
-        
-        time_left = cooldown - time_passed
-        hours_left = int(time_left.total_seconds() // 3600)
-        minutes_left = int((time_left.total_seconds() % 3600) // 60)
-        seconds_left = int(time_left.total_seconds() % 60)
-        
-        if hours_left > 0:
-            return False, f"{hours_left}ч {minutes_left}м"
-        elif minutes_left > 0:
-            return False, f"{minutes_left}м {seconds_left}с"
-        else:
-            return False, f"{seconds_left}с"
-    
     async def _add_xp(self, user_id: str, member: discord.Member, amount: int) -> Optional[int]:
         """
         Добавляет XP пользователю и проверяет повышение уровня.
@@ -129,7 +111,7 @@ class Levels(commands.Cog):
             new_level = user_data["level"]
             xp_needed = self._xp_for_level(user_data["level"])
         
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         return new_level
     
     async def _handle_levelup(self, member: discord.Member, new_level: int, channel: discord.TextChannel):
@@ -137,33 +119,15 @@ class Levels(commands.Cog):
         user_id = str(member.id)
         user_data = self._get_user_data(user_id)
         
-        # Получаем ког экономики для выдачи награды
+        # Получаем ког экономики для выдачи награды (и достижений за уровень)
         economy_cog = self.bot.get_cog('Economy')
         reward = 0
+        unlocked = []
         
         if economy_cog:
             booster_mult = 1.3 if member.premium_since else 1.0
-            reward = economy_cog.reward_level_up(user_id, new_level, booster_mult)
-        
-        # Проверяем достижения за milestone уровни
-        level_achievements = {
-            10: ("level_10", "Новичок", 500),
-            25: ("level_25", "Активист", 1000),
-            50: ("level_50", "Ветеран", 2500),
-            75: ("level_75", "Легенда", 5000),
-            100: ("level_100", "Бессмертный", 10000)
-        }
-        
-        achievement_reward = 0
-        achievement_name = None
-        
-        if new_level in level_achievements and economy_cog:
-            ach_id, ach_name, ach_reward = level_achievements[new_level]
-            if economy_cog._check_achievement(user_id, ach_id):
-                achievement_reward = ach_reward
-                achievement_name = ach_name
-                economy_cog._update_balance(user_id, ach_reward)
-                economy_cog._add_transaction(user_id, "achievement", ach_reward, f"Достижение: {ach_name}")
+            reward, unlocked = economy_cog.reward_level_up(user_id, new_level, booster_mult)
+        achievement_reward = sum(achievement.reward for achievement in unlocked)
         
         # Отправляем уведомление если включено
         if user_data.get("level_up_notifications", True):
@@ -172,8 +136,9 @@ class Levels(commands.Cog):
             if reward > 0:
                 fields.append(("💎 Награда", f"+{reward:,} крионов", True))
             
-            if achievement_reward > 0:
-                fields.append((f"🏆 Достижение: {achievement_name}", f"+{achievement_reward:,} крионов", True))
+            for achievement in unlocked:
+                value = f"+{achievement.reward:,} крионов" if achievement.reward else achievement.desc
+                fields.append((f"🏆 Достижение: {achievement.name}", value, True))
             
             xp_needed = self._xp_for_level(new_level)
             fields.append(("📊 Следующий уровень", f"{user_data['xp']}/{xp_needed} XP", False))
@@ -199,6 +164,8 @@ class Levels(commands.Cog):
                 new_level=new_level,
                 reward=reward + achievement_reward
             )
+            if economy_cog:
+                await economy_cog._log_achievements(channel.guild, member, unlocked)
     
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -208,22 +175,21 @@ class Levels(commands.Cog):
             return
         
         user_id = str(message.author.id)
-        user_data = self._get_user_data(user_id)
         
-        # Проверяем кулдаун
-        can_gain, _ = self._check_cooldown(user_data.get("last_xp_gain"), self.message_cooldown)
-        if not can_gain:
+        # Проверяем и сразу ставим кулдаун (без чтения файла уровней)
+        if self.bot.cooldowns.try_acquire("message_xp", user_id, self.message_cooldown):
             return
         
+        self._get_user_data(user_id)
+        
         # Начисляем XP
         xp_amount = random.randint(*self.xp_per_message)
         new_level = await self._add_xp(user_id, message.author, xp_amount)
         
-        # Обновляем время последнего получения XP и счетчик сообщений
+        # Обновляем счетчик сообщений
         levels_data = self._load_levels()
-        levels_data[user_id]["last_xp_gain"] = datetime.now().isoformat()
         levels_data[user_id]["messages_sent"] = levels_data[user_id].get("messages_sent", 0) + 1
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         
         # Если был levelup, обрабатываем его
         if new_level:
@@ -267,7 +233,7 @@ class Levels(commands.Cog):
         # Обновляем счетчик реакций
         levels_data = self._load_levels()
         levels_data[user_id]["reaction_count_hour"] = levels_data[user_id].get("reaction_count_hour", 0) + 1
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         
         # Если был levelup, обрабатываем его
         if new_level:
@@ -281,50 +247,45 @@ class Levels(commands.Cog):
             return
         
         user_id = str(member.id)
-        user_data = self._get_user_data(user_id)
+        self._get_user_data(user_id)
         
-        # Если пользователь зашел в канал
+        # Если пользователь зашел в канал - отсчёт до первого начисления
         if after.channel and not before.channel:
-            # Записываем время входа
-            levels_data = self._load_levels()
-            levels_data[user_id]["voice_xp_last"] = datetime.now().isoformat()
-            self._save_levels(levels_data)
+            self.voice_joined.add(user_id)
+            self.bot.cooldowns.set("voice_xp", user_id, self.voice_interval)
         
         # Если пользователь в канале и прошло 5 минут
         elif after.channel and before.channel:
-            last_voice_xp = user_data.get("voice_xp_last")
-            if last_voice_xp:
-                can_gain, _ = self._check_cooldown(last_voice_xp, self.voice_interval)
-                if can_gain:
-                    # Начисляем XP
-                    new_level = await self._add_xp(user_id, member, self.voice_xp)
-                    
-                    # Обновляем время
-                    levels_data = self._load_levels()
-                    levels_data[user_id]["voice_xp_last"] = datetime.now().isoformat()
-                    self._save_levels(levels_data)
+            # Вход не записан (был в войсе до перезапуска бота) - записываем и ждём интервал
+            if user_id not in self.voice_joined:
+                self.voice_joined.add(user_id)
+                self.bot.cooldowns.set("voice_xp", user_id, self.voice_interval)
+                return
+            
+            if not self.bot.cooldowns.try_acquire("voice_xp", user_id, self.voice_interval):
+                # Начисляем XP
+                new_level = await self._add_xp(user_id, member, self.voice_xp)
+                
+                # Если был levelup, обрабатываем его
+                if new_level and after.channel:
+                    # Находим текстовый канал для уведомления
+                    text_channel = None
+                    if after.channel.guild.system_channel:
+                        text_channel = after.channel.guild.system_channel
+                    else:
+                        # Ищем первый доступный текстовый канал
+                        for channel in after.channel.guild.text_channels:
+                            if channel.permissions_for(after.channel.guild.me).send_messages:
+                                text_channel = channel
+                                break
                     
-                    # Если был levelup, обрабатываем его
-                    if new_level and after.channel:
-                        # Находим текстовый канал для уведомления
-                        text_channel = None
-                        if after.channel.guild.system_channel:
-                            text_channel = after.channel.guild.system_channel
-                        else:
-                            # Ищем первый доступный текстовый канал
-                            for channel in after.channel.guild.text_channels:
-                                if channel.permissions_for(after.channel.guild.me).send_messages:
-                                    text_channel = channel
-                                    break
-                        
-                        if text_channel:
-                            await self._handle_levelup(member, new_level, text_channel)
+                    if text_channel:
+                        await self._handle_levelup(member, new_level, text_channel)
         
         # Если пользователь вышел из канала, очищаем таймер
         elif not after.channel and before.channel:
-            levels_data = self._load_levels()
-            levels_data[user_id]["voice_xp_last"] = None
-            self._save_levels(levels_data)
+            self.voice_joined.discard(user_id)
+            self.bot.cooldowns.clear("voice_xp", user_id)
     
     # ==================== КОМАНДЫ ====================
     
@@ -349,13 +310,7 @@ class Levels(commands.Cog):
         bar = "▓" * filled + "░" * (bar_length - filled)
         
         # Ранг на сервере
-        levels_data = self._load_levels()
-        sorted_users = sorted(
-            [(uid, data) for uid, data in levels_data.items()],
-            key=lambda x: (x[1]["level"], x[1]["total_xp"]),
-            reverse=True
-        )
-        rank = next((i + 1 for i, (uid, _) in enumerate(sorted_users) if uid == str(target.id)), 0)
+        rank = self.bot.leaderboards.rank("level", target.id) or 0
         
         em = discord.Embed(
             title=f"📊 Уровень {target.display_name}",
@@ -417,56 +372,26 @@ class Levels(commands.Cog):
     
     @app_commands.command(name="rank", description="🏆 Топ пользователей по уровню")
     async def rank(self, interaction: discord.Interaction):
-        """Показать топ-10 пользователей по уровню"""
-        levels_data = self._load_levels()
-        
-        if not levels_data:
+        """Показать рейтинг пользователей по уровню"""
+        if not self.bot.leaderboards.size("level"):
             await interaction.response.send_message("❌ Пока никто не набрал опыта!", ephemeral=True)
             return
         
-        # Сортируем по уровню и общему XP
-        sorted_users = sorted(
-            levels_data.items(),
-            key=lambda x: (x[1]["level"], x[1]["total_xp"]),
-            reverse=True
-        )[:10]
-        
-        em = discord.Embed(
-            title="🏆 Топ по уровню",
-            description="10 самых опытных участников сервера",
-            color=discord.Color.gold()
-        )
-        
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for idx, (user_id, data) in enumerate(sorted_users, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                medal = medals[idx - 1] if idx <= 3 else f"`{idx}.`"
-                em.add_field(
-                    name=f"{medal} {user.display_name}",
-                    value=f"Уровень {data['level']} | {data['total_xp']:,} XP",
-                    inline=False
-                )
-            except:
-                continue
-        
-        em.set_footer(text=f"Запрос от {interaction.user.display_name}", icon_url=interaction.user.display_avatar.url)
-        
-        await interaction.response.send_message(embed=em)
+        view = LeaderboardView(self.bot, "level", interaction.user, interaction.guild)
+        await interaction.response.send_message(embed=await view.render(), view=view)
     
     @app_commands.command(name="dailyxp", description="🎁 Получить ежедневный бонус опыта")
     async def dailyxp(self, interaction: discord.Interaction):
         """Ежедневный бонус XP"""
         user_id = str(interaction.user.id)
-        user_data = self._get_user_data(user_id)
+        self._get_user_data(user_id)
         
-        can_claim, time_left = self._check_cooldown(user_data.get("last_dailyxp"), 24 * 3600)
+        time_left = self.bot.cooldowns.remaining("dailyxp", user_id)
         
-        if not can_claim:
+        if time_left:
             em = discord.Embed(
                 title="⏰ Слишком рано!",
-                description=f"Вы уже получили ежедневный бонус XP!\nПопробуйте снова через: **{time_left}**",
+                description=f"Вы уже получили ежедневный бонус XP!\nПопробуйте снова через: **{format_remaining(time_left, precise=True)}**",
                 color=discord.Color.red()
             )
             await interaction.response.send_message(embed=em, ephemeral=True)
@@ -476,10 +401,7 @@ class Levels(commands.Cog):
         xp_amount = random.randint(*self.dailyxp_amount)
         new_level = await self._add_xp(user_id, interaction.user, xp_amount)
         
-        # Обновляем время
-        levels_data = self._load_levels()
-        levels_data[user_id]["last_dailyxp"] = datetime.now().isoformat()
-        self._save_levels(levels_data)
+        self.bot.cooldowns.set("dailyxp", user_id, self.dailyxp_cooldown)
         
         # Применяем множитель бустера для отображения
         multiplier = self._get_booster_multiplier(interaction.user)
@@ -525,7 +447,7 @@ class Levels(commands.Cog):
         
         current = levels_data[user_id].get("level_up_notifications", True)
         levels_data[user_id]["level_up_notifications"] = not current
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         
         status = "включены" if not current else "выключены"
         emoji = "🔔" if not current else "🔕"
@@ -574,7 +496,7 @@ class Levels(commands.Cog):
         
         levels_data[user_id]["xp"] = xp
         levels_data[user_id]["total_xp"] = xp
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         
         await interaction.response.send_message(
             f"✅ Установлено {xp} XP для {user.display_name}",
@@ -617,7 +539,7 @@ class Levels(commands.Cog):
         
         levels_data[user_id]["level"] = level
         levels_data[user_id]["xp"] = 0
-        self._save_levels(levels_data)
+        self._save_levels(levels_data, [user_id])
         
         await interaction.response.send_message(
             f"✅ Установлен {level} уровень для {user.display_name}",
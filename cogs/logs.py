@@ -2,12 +2,18 @@
 """Система логирования событий на сервере"""
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
+import itertools
 import json
 import os
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 from utils.embed_builder import EmbedBuilder, Colors
+from utils.log_archive import LogArchive
+from utils.log_dispatcher import LogDispatcher
+from utils.log_export import LogExporter
+from utils.log_index import LogIndex
 
 
 class Logs(commands.Cog):
@@ -17,8 +23,27 @@ class Logs(commands.Cog):
         self.bot = bot
         self.config_file = 'logs_config.json'
         self.logs_data_file = 'logs_data.json'
+        self._config_cache = None  # Конфиг читается при каждом событии - держим в памяти
+        self._logs_cache = None  # Логи загружаются один раз и дальше живут в памяти
+        self._indexes = {}  # guild_id: LogIndex
         self._ensure_config()
         self._ensure_logs_data()
+        
+        # Хранение по уровням: горячее кольцо в памяти (logs_data.json),
+        # тёплые сегменты на диске, холодные - сжатые gzip
+        self.hot_size = 1000  # Событий в горячем кольце гильдии
+        self.segment_size = 500  # Событий в одном дисковом сегменте
+        self.cold_after_days = 7  # Через сколько дней сегмент сжимается
+        self.default_retention = {"max_events": 100000, "max_age_days": 90}
+        self.archive = LogArchive('logs_archive')
+        
+        # Доставка в каналы логов идёт в фоне, пачками
+        self.dispatcher = LogDispatcher(flush_interval=2.0)
+        self.compact_logs.start()
+    
+    async def cog_unload(self):
+        self.compact_logs.cancel()
+        await self.dispatcher.close()
     
     def _ensure_config(self):
         """Создание файла конфигурации если его нет"""
@@ -33,22 +58,32 @@ class Logs(commands.Cog):
                 json.dump({}, f, ensure_ascii=False, indent=4)
     
     def _load_logs_data(self) -> dict:
-        """Загрузка данных логов"""
-        with open(self.logs_data_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        """Загрузка данных логов (кешируется в памяти)"""
+        if self._logs_cache is None:
+            with open(self.logs_data_file, 'r', encoding='utf-8') as f:
+                self._logs_cache = json.load(f)
+        return self._logs_cache
     
     def _save_logs_data(self, data: dict):
         """Сохранение данных логов"""
         with open(self.logs_data_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self._logs_cache = data
+    
+    def _get_index(self, guild_id) -> LogIndex:
+        """Индекс логов гильдии (строится один раз, дальше обновляется инкрементально)"""
+        guild_str = str(guild_id)
+        index = self._indexes.get(guild_str)
+        if index is None:
+            logs = self._load_logs_data()
+            index = LogIndex(logs.setdefault(guild_str, []))
+            self._indexes[guild_str] = index
+        return index
     
     def _store_log(self, guild_id: int, event_type: str, data: dict):
         """Сохранить лог в файл"""
         logs = self._load_logs_data()
-        guild_str = str(guild_id)
-        
-        if guild_str not in logs:
-            logs[guild_str] = []
+        index = self._get_index(guild_id)
         
         log_entry = {
             "timestamp": datetime.now().isoformat(),
@@ -56,23 +91,153 @@ class Logs(commands.Cog):
             "data": data
         }
         
-        logs[guild_str].append(log_entry)
+        index.append(log_entry)
         
-        # Ограничиваем размер (храним последние 1000 событий)
-        if len(logs[guild_str]) > 1000:
-            logs[guild_str] = logs[guild_str][-1000:]
+        # Горячее кольцо переполнено - старые события уходят на диск целым сегментом
+        if len(index) >= self.hot_size + self.segment_size:
+            self.archive.write_segment(guild_id, index.trim(self.hot_size))
         
         self._save_logs_data(logs)
     
+    def _archive_until(self, index: LogIndex, until_iso: Optional[str]) -> Optional[str]:
+        """
+        Верхняя граница чтения архива: начало горячего кольца, чтобы сегмент,
+        вытесненный во время чтения, не попал в результат дважды
+        """
+        if not len(index):
+            return until_iso
+        hot_start = index.entries[0]["timestamp"]
+        return min(until_iso, hot_start) if until_iso else hot_start
+    
+    def _has_logs(self, guild_id: str) -> bool:
+        """Есть ли у гильдии логи в памяти или в архиве"""
+        return bool(self._load_logs_data().get(guild_id)) or bool(self.archive.segments(guild_id))
+    
+    async def _latest_page(
+        self,
+        guild_id: str,
+        event_type: Optional[str],
+        since_iso: Optional[str],
+        until_iso: Optional[str],
+        cursor: Optional[int],
+        limit: int
+    ) -> Tuple[int, List[dict], Optional[int]]:
+        """
+        Последние записи: сначала горячее кольцо, когда оно кончилось - архив
+        
+        Курсор >= 0 - seq записи горячего кольца, отрицательный -(k + 1) -
+        продолжение в архиве после k показанных архивных записей.
+        
+        Returns:
+            (всего подходящих записей до курсора, записи страницы, курсор следующей страницы или None)
+        """
+        index = self._get_index(guild_id)
+        archive_until = self._archive_until(index, until_iso)
+        
+        if cursor is not None and cursor < 0:
+            skip = -cursor - 1
+            hot_total, page, next_cursor = 0, [], None
+        else:
+            skip = 0
+            hot_total, page, next_cursor = index.latest(
+                event_type=event_type,
+                since=since_iso,
+                until=until_iso,
+                before=cursor,
+                limit=limit
+            )
+        
+        archive_total, archive_page = await asyncio.to_thread(
+            self.archive.latest,
+            guild_id,
+            event_type=event_type,
+            since=since_iso,
+            until=archive_until,
+            offset=skip,
+            limit=limit - len(page)
+        )
+        
+        shown = skip + len(archive_page)
+        if next_cursor is None and shown < archive_total:
+            next_cursor = -(shown + 1)
+        return hot_total + archive_total - skip, page + archive_page, next_cursor
+    
+    def _get_retention(self, guild_id) -> dict:
+        """Политика хранения гильдии (лимит событий и срок в днях)"""
+        config = self._load_config()
+        retention = dict(self.default_retention)
+        retention.update(config.get(str(guild_id), {}).get('retention', {}))
+        return retention
+    
+    @tasks.loop(hours=1)
+    async def compact_logs(self):
+        """Фоновый компактор: сроки и лимиты хранения, сжатие старых сегментов"""
+        logs = self._load_logs_data()
+        now = datetime.now()
+        compress_after = (now - timedelta(days=self.cold_after_days)).isoformat()
+        changed = False
+        
+        for guild_id in set(logs) | set(self.archive.guilds()):
+            retention = self._get_retention(guild_id)
+            index = self._get_index(guild_id)
+            
+            # Горячие события тоже подчиняются сроку и лимиту
+            cutoff = (now - timedelta(days=retention["max_age_days"])).isoformat()
+            if index.drop_before(cutoff):
+                changed = True
+            if index.trim(retention["max_events"]):
+                changed = True
+            
+            try:
+                await asyncio.to_thread(
+                    self.archive.compact,
+                    guild_id,
+                    max_events=retention["max_events"],
+                    max_age_days=retention["max_age_days"],
+                    compress_after=compress_after,
+                    hot_count=len(index)
+                )
+            except OSError as e:
+                print(f"❌ Ошибка компактора логов для {guild_id}: {e}")
+        
+        if changed:
+            self._save_logs_data(logs)
+    
+    @compact_logs.before_loop
+    async def before_compact_logs(self):
+        await self.bot.wait_until_ready()
+    
+    @staticmethod
+    def _parse_time(value: Optional[str], end: bool = False) -> Optional[str]:
+        """
+        Разобрать дату из команды (ДД.ММ.ГГГГ [ЧЧ:ММ] или ISO) в ISO-строку.
+        Для верхней границы (end=True) дата без времени включает весь день.
+        """
+        if not value:
+            return None
+        value = value.strip()
+        for fmt in ("%d.%m.%Y %H:%M", "%d.%m.%Y", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                dt = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if end and "%H" not in fmt:
+                dt += timedelta(days=1)
+            return dt.isoformat()
+        return datetime.fromisoformat(value).isoformat()
+    
     def _load_config(self) -> dict:
-        """Загрузка конфигурации логов"""
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        """Загрузка конфигурации логов (кешируется в памяти)"""
+        if self._config_cache is None:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                self._config_cache = json.load(f)
+        return self._config_cache
     
     def _save_config(self, data: dict):
         """Сохранение конфигурации логов"""
         with open(self.config_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self._config_cache = data
     
     def _get_log_channel(self, guild_id: int) -> Optional[int]:
         """Получить ID канала логов для гильдии"""
@@ -112,7 +277,10 @@ class Logs(commands.Cog):
         user: discord.User = None
     ):
         """
-        Отправить событие в канал логов
+        Отправить событие в канал логов.
+        
+        Embed ставится в очередь LogDispatcher и отправляется в фоне,
+        команда не ждёт ответа Discord.
         
         Args:
             guild: Гильдия
@@ -153,12 +321,7 @@ class Logs(commands.Cog):
         
         em.set_footer(text=f"Сервер: {guild.name}", icon_url=guild.icon.url if guild.icon else None)
         
-        try:
-            await channel.send(embed=em)
-        except discord.Forbidden:
-            pass
-        except Exception:
-            pass
+        self.dispatcher.enqueue(channel, em)
     
     # Методы для логирования конкретных событий
     
@@ -433,24 +596,29 @@ class Logs(commands.Cog):
     @app_commands.command(name="logs-view", description="📋 [ADMIN] Просмотр логов")
     @app_commands.describe(
         event_type="Тип события (все/economy/games/levels)",
-        limit="Количество записей (макс 50)"
+        limit="Количество записей (макс 50)",
+        since="С даты (ДД.ММ.ГГГГ [ЧЧ:ММ])",
+        until="По дату (ДД.ММ.ГГГГ [ЧЧ:ММ])",
+        cursor="Курсор следующей страницы (из подвала предыдущей)"
     )
     @app_commands.checks.has_permissions(administrator=True)
     async def logs_view(
         self, 
         interaction: discord.Interaction,
         event_type: str = "all",
-        limit: int = 10
+        limit: int = 10,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[int] = None
     ):
         """Просмотр последних логов"""
         if limit < 1 or limit > 50:
             await interaction.response.send_message("❌ Limit должен быть от 1 до 50!", ephemeral=True)
             return
         
-        logs = self._load_logs_data()
         guild_id = str(interaction.guild.id)
         
-        if guild_id not in logs or not logs[guild_id]:
+        if not self._has_logs(guild_id):
             em = EmbedBuilder.info(
                 title="📋 Логи Пусты",
                 description="Нет сохранённых логов для этого сервера",
@@ -459,15 +627,24 @@ class Logs(commands.Cog):
             await interaction.response.send_message(embed=em, ephemeral=True)
             return
         
-        guild_logs = logs[guild_id]
+        try:
+            since_iso = self._parse_time(since)
+            until_iso = self._parse_time(until, end=True)
+        except ValueError:
+            await interaction.response.send_message("❌ Неверный формат даты! Используйте ДД.ММ.ГГГГ [ЧЧ:ММ]", ephemeral=True)
+            return
         
-        # Фильтрация
-        if event_type != "all":
-            guild_logs = [log for log in guild_logs if log.get("type") == event_type]
+        # Архив может читаться с диска - отвечаем после выборки
+        await interaction.response.defer(ephemeral=True, thinking=True)
         
-        # Последние N записей
-        guild_logs = guild_logs[-limit:]
-        guild_logs.reverse()
+        # Горячее кольцо - по индексу типов и часовых корзин, дальше архив с конца
+        query = dict(
+            event_type=None if event_type == "all" else event_type,
+            since_iso=since_iso,
+            until_iso=until_iso,
+            cursor=cursor
+        )
+        total, guild_logs, next_cursor = await self._latest_page(guild_id, limit=limit, **query)
         
         if not guild_logs:
             em = EmbedBuilder.info(
@@ -475,142 +652,283 @@ class Logs(commands.Cog):
                 description=f"Нет логов типа **{event_type}**",
                 user=interaction.user
             )
-            await interaction.response.send_message(embed=em, ephemeral=True)
+            await interaction.followup.send(embed=em, ephemeral=True)
             return
         
         # Форматирование
         description = ""
-        for i, log in enumerate(guild_logs[:10], 1):
+        shown = 0
+        for log in guild_logs:
             timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%d.%m %H:%M")
             log_type = log.get("type", "unknown")
             data = log.get("data", {})
             
             if log_type == "economy":
-                description += f"`{timestamp}` 💰 {data.get('user_name')}: {data.get('transaction_type')} ({data.get('amount'):,}💎)\n"
+                line = f"`{timestamp}` 💰 {data.get('user_name')}: {data.get('transaction_type')} ({data.get('amount'):,}💎)\n"
             else:
-                description += f"`{timestamp}` {log_type}: {str(data)[:50]}\n"
+                line = f"`{timestamp}` {log_type}: {str(data)[:50]}\n"
+            
+            # Лимит описания embed
+            if len(description) + len(line) > 4000:
+                break
+            description += line
+            shown += 1
         
         em = EmbedBuilder.info(
             title="📋 Логи Сервера",
             description=description or "Нет данных",
             user=interaction.user
         )
-        em.set_footer(text=f"Показано: {min(len(guild_logs), 10)} из {len(guild_logs)}")
-        
-        await interaction.response.send_message(embed=em, ephemeral=True)
+        footer = f"Показано: {shown} из {total}"
+        if shown < len(guild_logs):
+            # Не влезло в embed - продолжаем с первой непоказанной записи
+            _, _, next_cursor = await self._latest_page(guild_id, limit=shown, **query)
+        if next_cursor is not None:
+            footer += f" • Дальше: cursor={next_cursor}"
+        em.set_footer(text=footer)
+        
+        await interaction.followup.send(embed=em, ephemeral=True)
     
     @app_commands.command(name="logs-export", description="💾 [ADMIN] Экспортировать логи")
-    @app_commands.describe(format="Формат экспорта")
+    @app_commands.describe(
+        format="Формат экспорта",
+        compress="Сжать файлы gzip",
+        event_type="Тип события (economy/games/levels)",
+        since="С даты (ДД.ММ.ГГГГ [ЧЧ:ММ])",
+        until="По дату (ДД.ММ.ГГГГ [ЧЧ:ММ])"
+    )
     @app_commands.choices(format=[
         app_commands.Choice(name="TXT", value="txt"),
         app_commands.Choice(name="JSON", value="json"),
         app_commands.Choice(name="CSV", value="csv")
     ])
     @app_commands.checks.has_permissions(administrator=True)
-    async def logs_export(self, interaction: discord.Interaction, format: str):
+    async def logs_export(
+        self,
+        interaction: discord.Interaction,
+        format: str,
+        compress: bool = False,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ):
         """Экспортировать логи в файл"""
-        logs = self._load_logs_data()
         guild_id = str(interaction.guild.id)
         
-        if guild_id not in logs or not logs[guild_id]:
+        if not self._has_logs(guild_id):
             await interaction.response.send_message("❌ Нет логов для экспорта!", ephemeral=True)
             return
         
-        guild_logs = logs[guild_id]
-        filename = f"logs_{interaction.guild.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+        try:
+            since_iso = self._parse_time(since)
+            until_iso = self._parse_time(until, end=True)
+        except ValueError:
+            await interaction.response.send_message("❌ Неверный формат даты! Используйте ДД.ММ.ГГГГ [ЧЧ:ММ]", ephemeral=True)
+            return
         
-        import io
+        # Экспорт может занять время - отвечаем сразу, файлы пришлём следом
+        await interaction.response.defer(ephemeral=True, thinking=True)
         
-        if format == "txt":
-            content = f"Логи сервера {interaction.guild.name}\nЭкспортировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            for log in guild_logs:
-                timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-                content += f"[{timestamp}] {log.get('type')}: {log.get('data')}\n"
-            
-            file_data = io.BytesIO(content.encode('utf-8'))
-        
-        elif format == "json":
-            import json
-            content = json.dumps(guild_logs, ensure_ascii=False, indent=2)
-            file_data = io.BytesIO(content.encode('utf-8'))
-        
-        elif format == "csv":
-            content = "Timestamp,Type,User,Details\n"
-            for log in guild_logs:
-                timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-                log_type = log.get('type', '')
-                data = log.get('data', {})
-                user_name = data.get('user_name', '')
-                details = str(data).replace(",", ";")
-                content += f"{timestamp},{log_type},{user_name},{details}\n"
-            
-            file_data = io.BytesIO(content.encode('utf-8'))
+        # Снимок ссылок на записи: дальше лог может пополняться, пока пишем файлы
+        index = self._get_index(guild_id)
+        hot_entries = list(index.iter_entries(event_type, since_iso, until_iso))
         
-        file_data.seek(0)
-        file = discord.File(file_data, filename=filename)
+        # Архив читаем только до начала горячего кольца
+        archive_until = self._archive_until(index, until_iso)
+        entries = itertools.chain(
+            self.archive.iter_entries(guild_id, event_type, since_iso, archive_until),
+            hot_entries
+        )
         
-        em = EmbedBuilder.success(
-            title="💾 Логи Экспортированы",
-            description=f"Экспортировано **{len(guild_logs)}** записей",
-            user=interaction.user,
-            fields=[
-                ("Формат", format.upper(), True),
-                ("Записей", str(len(guild_logs)), True)
-            ]
+        exporter = LogExporter(
+            format,
+            base_name=f"logs_{interaction.guild.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            compress=compress,
+            part_limit=interaction.guild.filesize_limit,
+            title=f"Логи сервера {interaction.guild.name}\nЭкспортировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
         
-        await interaction.response.send_message(embed=em, file=file, ephemeral=True)
+        try:
+            # Запись файлов не должна блокировать event loop
+            count = await asyncio.to_thread(exporter.write_all, entries)
+            if not count:
+                await interaction.followup.send("❌ Нет логов по заданным фильтрам!", ephemeral=True)
+                return
+            files = exporter.files()
+            
+            em = EmbedBuilder.success(
+                title="💾 Логи Экспортированы",
+                description=f"Экспортировано **{count}** записей",
+                user=interaction.user,
+                fields=[
+                    ("Формат", format.upper() + (" + GZIP" if compress else ""), True),
+                    ("Записей", str(count), True),
+                    ("Файлов", str(len(files)), True)
+                ]
+            )
+            
+            # Discord принимает до 10 вложений в одном сообщении
+            await interaction.followup.send(embed=em, files=files[:10], ephemeral=True)
+            for i in range(10, len(files), 10):
+                await interaction.followup.send(files=files[i:i + 10], ephemeral=True)
+        finally:
+            exporter.close()
     
     @app_commands.command(name="logs-search", description="🔍 [ADMIN] Поиск в логах")
-    @app_commands.describe(query="Поисковый запрос")
+    @app_commands.describe(
+        query="Поисковый запрос",
+        event_type="Тип события (economy/games/levels)",
+        user="Только события этого пользователя",
+        since="С даты (ДД.ММ.ГГГГ [ЧЧ:ММ])",
+        until="По дату (ДД.ММ.ГГГГ [ЧЧ:ММ])",
+        page="Страница результатов"
+    )
     @app_commands.checks.has_permissions(administrator=True)
-    async def logs_search(self, interaction: discord.Interaction, query: str):
+    async def logs_search(
+        self,
+        interaction: discord.Interaction,
+        query: str,
+        event_type: Optional[str] = None,
+        user: Optional[discord.User] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        page: int = 1
+    ):
         """Поиск в логах"""
-        logs = self._load_logs_data()
         guild_id = str(interaction.guild.id)
         
-        if guild_id not in logs or not logs[guild_id]:
+        if not self._has_logs(guild_id):
             await interaction.response.send_message("❌ Нет логов для поиска!", ephemeral=True)
             return
         
-        guild_logs = logs[guild_id]
-        query_lower = query.lower()
+        try:
+            since_iso = self._parse_time(since)
+            until_iso = self._parse_time(until, end=True)
+        except ValueError:
+            await interaction.response.send_message("❌ Неверный формат даты! Используйте ДД.ММ.ГГГГ [ЧЧ:ММ]", ephemeral=True)
+            return
         
-        # Поиск
-        results = []
-        for log in guild_logs:
-            log_str = json.dumps(log, ensure_ascii=False).lower()
-            if query_lower in log_str:
-                results.append(log)
+        page = max(page, 1)
+        per_page = 10
+        offset = (page - 1) * per_page
+        user_id = str(user.id) if user else None
+        
+        # Поиск по архиву читает сегменты с диска - отвечаем после выборки
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
+        # Горячее кольцо - по индексу (результаты от новых к старым)
+        index = self._get_index(guild_id)
+        hot_total, results = index.search(
+            query,
+            event_type=event_type,
+            user_id=user_id,
+            since=since_iso,
+            until=until_iso,
+            offset=offset,
+            limit=per_page
+        )
         
-        if not results:
+        # Дальше архив: совпадения входят в общее число, страница дополняется ими
+        archive_total, archive_results = await asyncio.to_thread(
+            self.archive.latest,
+            guild_id,
+            event_type=event_type,
+            since=since_iso,
+            until=self._archive_until(index, until_iso),
+            offset=max(0, offset - hot_total),
+            limit=per_page - len(results),
+            query=query,
+            user_id=user_id
+        )
+        total = hot_total + archive_total
+        results += archive_results
+        
+        if not total:
             em = EmbedBuilder.info(
                 title="🔍 Поиск в Логах",
                 description=f"По запросу **{query}** ничего не найдено",
                 user=interaction.user
             )
-            await interaction.response.send_message(embed=em, ephemeral=True)
+            await interaction.followup.send(embed=em, ephemeral=True)
+            return
+        
+        pages = (total + per_page - 1) // per_page
+        if not results:
+            await interaction.followup.send(f"❌ Страница {page} не существует! Всего страниц: {pages}", ephemeral=True)
             return
         
-        # Показываем первые 10
-        description = f"Найдено: **{len(results)}** записей\n\n"
-        for i, log in enumerate(results[-10:], 1):
+        description = f"Найдено: **{total}** записей\n\n"
+        for log in results:
             timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%d.%m %H:%M")
             log_type = log.get("type", "unknown")
-            description += f"`{timestamp}` {log_type}\n"
+            data = log.get("data", {})
+            user_name = data.get("user_name")
+            description += f"`{timestamp}` {log_type}" + (f" • {user_name}" if user_name else "") + "\n"
         
         em = EmbedBuilder.info(
             title=f"🔍 Результаты Поиска: {query}",
             description=description,
             user=interaction.user
         )
-        em.set_footer(text=f"Показано последних 10 из {len(results)}")
+        em.set_footer(text=f"Страница {page}/{pages} • Сначала новые")
+        
+        await interaction.followup.send(embed=em, ephemeral=True)
+    
+    @app_commands.command(name="logs-retention", description="🗄️ [ADMIN] Настроить хранение логов")
+    @app_commands.describe(
+        max_events="Сколько событий хранить всего (от 1000)",
+        max_age_days="Сколько дней хранить события (от 1)"
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def logs_retention(
+        self,
+        interaction: discord.Interaction,
+        max_events: Optional[int] = None,
+        max_age_days: Optional[int] = None
+    ):
+        """Показать или изменить политику хранения логов"""
+        guild_id = str(interaction.guild.id)
+        
+        if max_events is not None and max_events < 1000:
+            await interaction.response.send_message("❌ Лимит событий должен быть не меньше 1000!", ephemeral=True)
+            return
+        if max_age_days is not None and max_age_days < 1:
+            await interaction.response.send_message("❌ Срок хранения должен быть не меньше 1 дня!", ephemeral=True)
+            return
+        
+        if max_events is not None or max_age_days is not None:
+            config = self._load_config()
+            retention = config.setdefault(guild_id, {}).setdefault('retention', {})
+            if max_events is not None:
+                retention['max_events'] = max_events
+            if max_age_days is not None:
+                retention['max_age_days'] = max_age_days
+            self._save_config(config)
+        
+        retention = self._get_retention(guild_id)
+        segments = self.archive.segments(guild_id)
+        warm = sum(segment.count for segment in segments if not segment.compressed)
+        cold = sum(segment.count for segment in segments if segment.compressed)
+        
+        em = EmbedBuilder.info(
+            title="🗄️ Хранение Логов",
+            description="Старые события переносятся из памяти на диск и сжимаются. Компактор применяет лимиты раз в час.",
+            user=interaction.user,
+            fields=[
+                ("Лимит событий", f"{retention['max_events']:,}", True),
+                ("Срок хранения", f"{retention['max_age_days']} дн.", True),
+                ("🔥 В памяти", f"{len(self._get_index(guild_id)):,}", True),
+                ("📁 На диске", f"{warm:,}", True),
+                ("🧊 Сжато", f"{cold:,}", True)
+            ]
+        )
         
         await interaction.response.send_message(embed=em, ephemeral=True)
     
     @logs_view.error
     @logs_export.error
     @logs_search.error
+    @logs_retention.error
     async def logs_extended_error(self, interaction: discord.Interaction, error):
         if isinstance(error, app_commands.errors.MissingPermissions):
             await interaction.response.send_message(
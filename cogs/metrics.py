@@ -0,0 +1,92 @@
+# metrics.py
+"""Временные ряды показателей экономики"""
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import json
+import os
+from utils.timeseries import TimeSeriesStore
+
+
+class Metrics(commands.Cog):
+    """Запись показателей экономики во временные ряды для графиков дашборда"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.timeseries_file = 'timeseries.json'
+        self.save_every = 5  # Сохранять файл раз в N замеров
+        self._samples = 0
+        self._active_users = set()  # Кто писал сообщения с прошлого замера
+        
+        self._load_timeseries()
+        self.sample_metrics.start()
+    
+    def cog_unload(self):
+        self.sample_metrics.cancel()
+        self._save_timeseries(self.bot.timeseries.to_dict())
+    
+    def _load_timeseries(self):
+        """Загрузка сохранённых рядов"""
+        if not os.path.exists(self.timeseries_file):
+            return
+        try:
+            with open(self.timeseries_file, 'r', encoding='utf-8') as f:
+                self.bot.timeseries = TimeSeriesStore.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Ошибка загрузки {self.timeseries_file}: {e}")
+    
+    def _save_timeseries(self, data: dict):
+        """Сохранение рядов (без отступов - в файле тысячи точек)"""
+        tmp_file = self.timeseries_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_file, self.timeseries_file)
+    
+    def _collect(self) -> dict:
+        """
+        Текущие значения метрик.
+        
+        Суммы берутся из счётчиков bot.stats, которые обновляются при каждом
+        сохранении данных, поэтому замер не проходит по пользователям.
+        """
+        overview = self.bot.stats.overview()
+        values = {
+            'money_supply': overview['total_balance'],
+            'bank_deposits': overview['total_bank_balance'],
+            'bank_loans': overview['total_loans'],
+            'games_played': overview['total_games_played'],
+            'active_users': len(self._active_users)
+        }
+        
+        companies = self.bot.datastore.get('stocks.json').get('companies', {})
+        for symbol, company in companies.items():
+            values[f'stock_{symbol}'] = company.get('price', 0)
+        
+        return values
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild:
+            return
+        self._active_users.add(message.author.id)
+    
+    @tasks.loop(minutes=1)
+    async def sample_metrics(self):
+        """Замер метрик каждую минуту"""
+        self.bot.timeseries.record(self._collect())
+        self._active_users = set()
+        
+        self._samples += 1
+        if self._samples % self.save_every == 0:
+            try:
+                await asyncio.to_thread(self._save_timeseries, self.bot.timeseries.to_dict())
+            except OSError as e:
+                print(f"Ошибка сохранения {self.timeseries_file}: {e}")
+    
+    @sample_metrics.before_loop
+    async def before_sample_metrics(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(Metrics(bot))
@@ -6,6 +6,7 @@ from discord.ext import commands
 import random
 from typing import Optional
 from utils.embed_builder import EmbedBuilder, Colors
+from utils.leaderboard_view import LeaderboardView
 
 
 class DuelView(discord.ui.View):
@@ -115,6 +116,7 @@ class PVP(commands.Cog):
         self.currency_emoji = "💎"
         self.pvp_stats_file = 'pvp_stats.json'
         self._ensure_stats_file()
+        self.bot.datastore.publish(self.pvp_stats_file, self._load_stats())
     
     def _ensure_stats_file(self):
         """Создать файл статистики если его нет"""
@@ -130,11 +132,12 @@ class PVP(commands.Cog):
         with open(self.pvp_stats_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     
-    def _save_stats(self, data):
-        """Сохранить статистику"""
+    def _save_stats(self, data, changed=None):
+        """Сохранить статистику (changed - ID изменённых пользователей, если известны)"""
         import json
         with open(self.pvp_stats_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.pvp_stats_file, data, changed)
     
     def _update_stats(self, user_id: str, win: bool):
         """Обновить статистику пользователя"""
@@ -147,7 +150,7 @@ class PVP(commands.Cog):
         else:
             stats[user_id]["losses"] += 1
         
-        self._save_stats(stats)
+        self._save_stats(stats, [user_id])
     
     def _get_economy_balance(self, user_id: str) -> int:
         economy_cog = self.bot.get_cog('Economy')
@@ -290,11 +293,14 @@ class PVP(commands.Cog):
         await interaction.response.send_message(embed=em)
     
     @app_commands.command(name="pvp-leaderboard", description="🏆 Топ PvP игроков")
-    async def pvp_leaderboard(self, interaction: discord.Interaction):
+    @app_commands.describe(sort_by="Сортировка рейтинга")
+    @app_commands.choices(sort_by=[
+        app_commands.Choice(name="По победам", value="pvp_wins"),
+        app_commands.Choice(name="По проценту побед", value="pvp_winrate")
+    ])
+    async def pvp_leaderboard(self, interaction: discord.Interaction, sort_by: str = "pvp_wins"):
         """Таблица лидеров PvP"""
-        stats = self._load_stats()
-        
-        if not stats:
+        if not self.bot.leaderboards.size("pvp_wins"):
             em = EmbedBuilder.info(
                 title="🏆 Топ PvP Игроков",
                 description="Пока нет данных о дуэлях!",
@@ -303,38 +309,8 @@ class PVP(commands.Cog):
             await interaction.response.send_message(embed=em)
             return
         
-        # Сортируем по победам
-        leaderboard = []
-        for user_id, user_stats in stats.items():
-            wins = user_stats["wins"]
-            losses = user_stats["losses"]
-            total = wins + losses
-            winrate = (wins / total * 100) if total > 0 else 0
-            leaderboard.append((user_id, wins, losses, winrate))
-        
-        leaderboard.sort(key=lambda x: x[1], reverse=True)
-        leaderboard = leaderboard[:10]  # Топ 10
-        
-        description = ""
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (user_id, wins, losses, winrate) in enumerate(leaderboard, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                medal = medals[i-1] if i <= 3 else f"`{i}.`"
-                description += f"{medal} **{user.display_name}** - {wins}W / {losses}L ({winrate:.1f}%)\n"
-            except:
-                continue
-        
-        em = discord.Embed(
-            title="🏆 Топ PvP Игроков",
-            description=description,
-            color=Colors.PREMIUM,
-            timestamp=discord.utils.utcnow()
-        )
-        em.set_footer(text="Обновляется в реальном времени")
-        
-        await interaction.response.send_message(embed=em)
+        view = LeaderboardView(self.bot, sort_by, interaction.user, interaction.guild)
+        await interaction.response.send_message(embed=await view.render(), view=view)
 
 
 async def setup(bot):
@@ -3,9 +3,12 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+import asyncio
 from typing import Optional
 from datetime import datetime
 from utils.embed_builder import EmbedBuilder, Colors
+from utils.leaderboard_view import LeaderboardView
+from utils.profile_service import build_profile
 
 
 class Stats(commands.Cog):
@@ -22,88 +25,25 @@ class Stats(commands.Cog):
         target = user or interaction.user
         user_id = str(target.id)
         
-        # Собираем данные из всех когов
-        stats_data = {}
-        
-        # Economy
-        economy_cog = self.bot.get_cog('Economy')
-        if economy_cog:
-            eco_data = economy_cog._get_user_data(user_id)
-            stats_data['balance'] = eco_data.get('balance', 0)
-            stats_data['total_earned'] = eco_data.get('total_earned', 0)
-            stats_data['games_played'] = eco_data.get('games_played', 0)
-        
-        # Levels
-        levels_cog = self.bot.get_cog('Levels')
-        if levels_cog:
-            level_data = levels_cog._get_user_data(user_id)
-            stats_data['level'] = level_data.get('level', 1)
-            stats_data['xp'] = level_data.get('xp', 0)
-            stats_data['messages'] = level_data.get('messages', 0)
-        
-        # Bank
-        try:
-            import json
-            with open('bank.json', 'r') as f:
-                bank_data = json.load(f)
-                if user_id in bank_data:
-                    stats_data['deposit'] = bank_data[user_id].get('deposit', 0)
-                    stats_data['loan'] = bank_data[user_id].get('loan', 0)
-        except:
-            stats_data['deposit'] = 0
-            stats_data['loan'] = 0
-        
-        # Business
-        try:
-            import json
-            with open('business.json', 'r') as f:
-                business_data = json.load(f)
-                stats_data['businesses'] = len(business_data.get(user_id, {}))
-        except:
-            stats_data['businesses'] = 0
-        
-        # Stocks
-        try:
-            import json
-            with open('stocks.json', 'r') as f:
-                stocks_data = json.load(f)
-                portfolios = stocks_data.get('portfolios', {})
-                if user_id in portfolios:
-                    total_stocks = sum(portfolios[user_id].values())
-                    stats_data['stocks'] = total_stocks
-                else:
-                    stats_data['stocks'] = 0
-        except:
-            stats_data['stocks'] = 0
-        
-        # PVP
-        try:
-            import json
-            with open('pvp_stats.json', 'r') as f:
-                pvp_data = json.load(f)
-                if user_id in pvp_data:
-                    stats_data['pvp_wins'] = pvp_data[user_id].get('wins', 0)
-                    stats_data['pvp_losses'] = pvp_data[user_id].get('losses', 0)
-                else:
-                    stats_data['pvp_wins'] = 0
-                    stats_data['pvp_losses'] = 0
-        except:
-            stats_data['pvp_wins'] = 0
-            stats_data['pvp_losses'] = 0
-        
-        # Prestige
-        try:
-            import json
-            with open('enhancements.json', 'r') as f:
-                enh_data = json.load(f)
-                stats_data['prestige'] = enh_data.get('prestiges', {}).get(user_id, 0)
-                stats_data['titles'] = len(enh_data.get('titles', {}).get(user_id, []))
-        except:
-            stats_data['prestige'] = 0
-            stats_data['titles'] = 0
-        
-        # Рассчитываем общий капитал
-        total_wealth = stats_data.get('balance', 0) + stats_data.get('deposit', 0) - stats_data.get('loan', 0)
+        # Профиль из всех файлов данных (кешируется на пользователя)
+        profile = self.bot.profiles.get(user_id) or build_profile(user_id, lambda name: {}, known_only=False)
+        
+        stats_data = {
+            'balance': profile['balance'],
+            'level': profile['level']['level'],
+            'xp': profile['level']['xp'],
+            'messages': profile['level']['messages'],
+            'deposit': profile['bank']['deposit'],
+            'loan': profile['bank']['loan'],
+            'businesses': len(profile['businesses']),
+            'stocks': profile['portfolio']['shares'],
+            'portfolio_value': profile['portfolio']['value'],
+            'pvp_wins': profile['pvp']['wins'],
+            'pvp_losses': profile['pvp']['losses'],
+            'prestige': profile['prestige'],
+            'titles': len(profile['titles'])
+        }
+        total_wealth = profile['wealth']
         
         # Создаём embed
         em = discord.Embed(
@@ -135,7 +75,7 @@ class Stats(commands.Cog):
         em.add_field(
             name="🏢 Бизнес",
             value=f"Бизнесов: **{stats_data.get('businesses', 0)}**/3\n"
-                  f"Акций: **{stats_data.get('stocks', 0)}**\n"
+                  f"Акций: **{stats_data.get('stocks', 0)}** ({stats_data.get('portfolio_value', 0):,}{self.currency_emoji})\n"
                   f"Сообщений: **{stats_data.get('messages', 0):,}**",
             inline=True
         )
@@ -176,7 +116,7 @@ class Stats(commands.Cog):
         
         if levels_cog:
             level_data = levels_cog._load_levels()
-            total_messages = sum(user.get('messages', 0) for user in level_data.values())
+            total_messages = sum(user.get('messages_sent', 0) for user in level_data.values())
         else:
             total_messages = 0
         
@@ -245,42 +185,63 @@ class Stats(commands.Cog):
     
     @app_commands.command(name="top-rich", description="💰 Топ богачей сервера")
     async def top_rich(self, interaction: discord.Interaction):
-        """Топ 10 самых богатых пользователей"""
+        """Рейтинг самых богатых пользователей"""
         economy_cog = self.bot.get_cog('Economy')
         if not economy_cog:
             await interaction.response.send_message("❌ Экономика недоступна!", ephemeral=True)
             return
         
-        eco_data = economy_cog._load_economy()
-        
-        # Сортируем по балансу
-        leaderboard = sorted(
-            eco_data.items(),
-            key=lambda x: x[1].get('balance', 0),
-            reverse=True
-        )[:10]
-        
-        description = ""
-        medals = ["🥇", "🥈", "🥉"]
-        
-        for i, (user_id, data) in enumerate(leaderboard, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                medal = medals[i-1] if i <= 3 else f"`{i}.`"
-                balance = data.get('balance', 0)
-                description += f"{medal} **{user.display_name}** - {balance:,}{self.currency_emoji}\n"
-            except:
-                continue
-        
-        em = discord.Embed(
-            title="💰 Топ Богачей",
-            description=description or "Нет данных",
-            color=Colors.PREMIUM,
-            timestamp=discord.utils.utcnow()
+        # Рейтинг по общему капиталу (кошелёк + депозит - кредит) среди участников сервера
+        view = LeaderboardView(self.bot, "wealth", interaction.user, interaction.guild, guild_only=True)
+        await interaction.response.send_message(embed=await view.render(), view=view)
+    
+    def _format_distribution(self, summary: dict) -> str:
+        """Строка поля embed со сводкой распределения"""
+        percentiles = summary['percentiles']
+        return (
+            f"Всего: **{EmbedBuilder.format_number(summary['total'])}** {self.currency_emoji}\n"
+            f"Медиана: **{EmbedBuilder.format_number(int(percentiles['50']))}**\n"
+            f"90% / 99%: **{EmbedBuilder.format_number(int(percentiles['90']))}** / "
+            f"**{EmbedBuilder.format_number(int(percentiles['99']))}**\n"
+            f"Джини: **{summary['gini']:.2f}** • Топ-1%: **{summary['top1_share']:.0%}**"
         )
-        em.set_footer(text="Рейтинг обновляется в реальном времени")
-        
-        await interaction.response.send_message(embed=em)
+    
+    @app_commands.command(name="economy-analytics", description="📈 Распределение богатства на сервере (Админ)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def economy_analytics(self, interaction: discord.Interaction):
+        """Перцентили, коэффициент Джини и доля топ-1% по балансам, депозитам и уровням"""
+        await interaction.response.defer()
+        
+        store = self.bot.datastore
+        analytics = await asyncio.to_thread(self.bot.analytics.get, store.version, store.get)
+        
+        balance = analytics['balance']
+        deposit = analytics['deposit']
+        loan = analytics['loan']
+        levels = analytics['levels']
+        
+        em = EmbedBuilder.admin(
+            title="Аналитика экономики",
+            description=f"Пользователей с балансом: **{balance['positive']:,}** из {balance['count']:,}",
+            admin=interaction.user,
+            fields=[
+                ("💰 Балансы", self._format_distribution(balance), False),
+                ("🏦 Депозиты", self._format_distribution(deposit), False),
+                ("💳 Кредиты", f"Выдано: **{EmbedBuilder.format_number(loan['total'])}** {self.currency_emoji}\n"
+                              f"Должников: **{loan['positive']}**", True),
+                ("⭐ Уровни", f"Медиана: **{levels['percentiles']['50']:.0f}**\n"
+                             f"90%: **{levels['percentiles']['90']:.0f}**", True)
+            ]
+        )
+        await interaction.followup.send(embed=em)
+    
+    @economy_analytics.error
+    async def economy_analytics_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.errors.MissingPermissions):
+            await interaction.response.send_message(
+                "❌ У вас нет прав администратора для использования этой команды!",
+                ephemeral=True
+            )
 
 
 async def setup(bot):
@@ -42,6 +42,7 @@ class Stocks(commands.Cog):
     def _save_stocks(self, data):
         with open(self.stocks_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.stocks_file, data)
     
     def _get_economy_balance(self, user_id: str) -> int:
         economy_cog = self.bot.get_cog('Economy')
@@ -31,6 +31,7 @@ class Tournaments(commands.Cog):
     def _save_tournaments(self, data):
         with open(self.tournaments_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
+        self.bot.datastore.publish(self.tournaments_file, data)
     
     def _get_economy_balance(self, user_id: str) -> int:
         economy_cog = self.bot.get_cog('Economy')
@@ -174,12 +175,11 @@ class Tournaments(commands.Cog):
         
         # Список участников
         participants_list = []
-        for i, uid in enumerate(tournament["participants"][:10], 1):
-            try:
-                user = await self.bot.fetch_user(int(uid))
-                participants_list.append(f"{i}. {user.display_name}")
-            except:
-                pass
+        shown = tournament["participants"][:10]
+        names = await self.bot.names.resolve_many(shown, interaction.guild)
+        for i, uid in enumerate(shown, 1):
+            if uid in names:
+                participants_list.append(f"{i}. {names[uid]}")
         
         if len(tournament["participants"]) > 10:
             participants_list.append(f"... и ещё {len(tournament['participants']) - 10}")
@@ -252,12 +252,10 @@ class Tournaments(commands.Cog):
         
         # Формируем результаты
         results_text = ""
-        for i, (user_id, prize, medal) in enumerate(winners, 1):
-            try:
-                user = await self.bot.fetch_user(int(user_id))
-                results_text += f"{medal} **{user.display_name}** - {prize:,}{self.currency_emoji}\n"
-            except:
-                pass
+        names = await self.bot.names.resolve_many([user_id for user_id, _, _ in winners], interaction.guild)
+        for user_id, prize, medal in winners:
+            if user_id in names:
+                results_text += f"{medal} **{names[user_id]}** - {prize:,}{self.currency_emoji}\n"
         
         # Сохраняем в историю
         tournament["finished_at"] = datetime.now().isoformat()
@@ -1,51 +1,212 @@
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, make_response, request, send_from_directory
 from flask_cors import CORS
+import gzip
+import hashlib
 import json
 import os
+import sys
+import threading
+import time
+import zlib
 from datetime import datetime
+from functools import wraps
 from pathlib import Path
 
 app = Flask(__name__, static_folder='.')
-CORS(app)
+CORS(app, expose_headers=['X-Total-Count', 'ETag'])
+
+# Ответы меньше этого размера не сжимаются
+GZIP_MIN_SIZE = 1024
+
+# Как часто проверять файлы на изменения и слать пинг в /api/stream (секунды)
+STREAM_POLL_INTERVAL = 1.0
+STREAM_HEARTBEAT = 15.0
 
 # Путь к корневой директории бота
 BOT_DIR = Path(__file__).parent.parent
 
+# Движок рейтингов и счётчики статистики общие с ботом (utils/)
+sys.path.insert(0, str(BOT_DIR))
+from utils.analytics import AnalyticsCache, SOURCES as ANALYTICS_SOURCES
+from utils.profile_service import ProfileService, SOURCES as PROFILE_SOURCES
+from utils.dashboard_data import build_stats, build_timeseries, capture_state, diff_state, stats_generation
+from utils.leaderboard import LeaderboardEngine
+from utils.stats_aggregator import StatsAggregator
+from utils.timeseries import TimeSeriesStore
+from utils.event_stream import EventBroadcaster, format_sse
+from utils.transaction_feed import recent_transactions
+from utils.user_query import UserQuery, iter_json_object, sort_order
+
+leaderboards = LeaderboardEngine()
+stats_totals = StatsAggregator()
+
+# Версии и данные файлов, уже переданных в leaderboards и stats_totals
+_synced_versions = {}
+_synced_data = {}
+_sync_lock = threading.Lock()
+_stats_cache = {}
+
+# События для /api/stream и поток, который их публикует
+events = EventBroadcaster()
+_watcher = {}
+_watcher_lock = threading.Lock()
+
+# Распределения богатства и уровней (пересчёт при изменении файлов)
+analytics = AnalyticsCache()
+
+# Разобранные временные ряды: (версия файла, TimeSeriesStore)
+_timeseries_cache = {}
+
+# Порядок пользователей по полю: (filename, field) -> (версия файла, [user_id])
+_order_cache = {}
+
+# Разобранные JSON файлы: filename -> ((mtime_ns, size), data)
+_file_cache = {}
+_file_locks = {}
+_locks_guard = threading.Lock()
+
+def _file_lock(filename):
+    """Блокировка на файл: параллельные запросы не разбирают один файл дважды"""
+    with _locks_guard:
+        lock = _file_locks.get(filename)
+        if lock is None:
+            lock = _file_locks[filename] = threading.Lock()
+        return lock
+
+def file_version(filename):
+    """Версия файла (mtime_ns, size) или None если файла нет"""
+    try:
+        st = os.stat(BOT_DIR / filename)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def load_json_file(filename):
-    """Загрузка JSON файла с обработкой ошибок"""
+    """
+    Загрузка JSON файла с обработкой ошибок.
+    
+    Разобранный объект кешируется по (mtime_ns, size) файла и общий для всех
+    запросов - изменять его нельзя.
+    """
     try:
-        filepath = BOT_DIR / filename
-        if filepath.exists():
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        version = file_version(filename)
+        if version is None:
+            return {}
+        
+        cached = _file_cache.get(filename)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        with _file_lock(filename):
+            # Пока ждали блокировку, файл мог разобрать другой запрос
+            cached = _file_cache.get(filename)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            
+            with open(BOT_DIR / filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            _file_cache[filename] = (version, data)
+            return data
     except Exception as e:
         print(f"Ошибка загрузки {filename}: {e}")
         return {}
 
-def get_user_count(data):
-    """Получить количество пользователей"""
-    return len(data) if isinstance(data, dict) else 0
-
-def calculate_total_balance(economy_data):
-    """Подсчитать общий баланс всех пользователей"""
-    total = 0
-    for user_data in economy_data.values():
-        total += user_data.get('balance', 0)
-    return total
-
-def get_top_users(data, key, limit=10):
-    """Получить топ пользователей по ключу"""
-    users = []
-    for user_id, user_data in data.items():
-        value = user_data.get(key, 0)
-        users.append({
-            'user_id': user_id,
-            'value': value,
-            'data': user_data
-        })
-    users.sort(key=lambda x: x['value'], reverse=True)
-    return users[:limit]
+# Профили пользователей (короткий кеш на каждого пользователя)
+profiles = ProfileService(file_version, load_json_file)
+
+def conditional(*filenames):
+    """
+    ETag по версиям файлов, из которых строится ответ, и строке запроса.
+    
+    Если клиент прислал If-None-Match с тем же тегом, отвечаем 304 сразу,
+    не вызывая обработчик и не читая данные.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            versions = tuple(file_version(name) for name in filenames)
+            etag = hashlib.sha1(repr((request.full_path, versions)).encode()).hexdigest()
+            if etag in request.if_none_match:
+                response = Response(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def _gzip_stream(chunks):
+    """Сжимать потоковый ответ по мере генерации"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 - формат gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@app.after_request
+def compress_response(response):
+    """Сжатие JSON ответов gzip, если клиент его поддерживает"""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+        or response.mimetype != 'application/json'
+    ):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.accept_encodings:
+        return response
+    
+    if response.is_streamed:
+        response.response = _gzip_stream(response.iter_encoded())
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < GZIP_MIN_SIZE:
+            return response
+        response.set_data(gzip.compress(data, 6))
+    
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def sorted_user_ids(filename, data, field, version):
+    """ID пользователей файла по убыванию поля (кешируется до изменения файла)"""
+    cached = _order_cache.get((filename, field))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    order = sort_order(data, field)
+    _order_cache[(filename, field)] = (version, order)
+    return order
+
+def query_users_file(filename):
+    """
+    Отдать пользовательский файл с учётом параметров запроса.
+    
+    Параметры: offset, limit, fields=balance,level, sort=balance (или
+    sort=-balance по убыванию), фильтры min_<поле>/max_<поле>. Без параметров
+    отдаётся весь файл. Ответ пишется потоком, общее число подходящих
+    пользователей - в заголовке X-Total-Count.
+    """
+    try:
+        query = UserQuery.from_args(request.args)
+    except ValueError:
+        return jsonify({'error': 'Некорректные параметры запроса'}), 400
+    
+    version = file_version(filename)
+    data = load_json_file(filename)
+    order = sorted_user_ids(filename, data, query.sort, version) if query.sort else None
+    total, page = query.run(data, order)
+    
+    return Response(
+        iter_json_object(page),
+        mimetype='application/json',
+        headers={'X-Total-Count': str(total)}
+    )
 
 @app.route('/')
 def index():
@@ -53,163 +214,225 @@ def index():
     return send_from_directory('.', 'index.html')
 
 @app.route('/api/economy')
+@conditional('economy.json')
 def get_economy():
     """Получить экономические данные"""
-    data = load_json_file('economy.json')
-    return jsonify(data)
+    return query_users_file('economy.json')
 
 @app.route('/api/levels')
+@conditional('levels.json')
 def get_levels():
     """Получить данные уровней"""
-    data = load_json_file('levels.json')
-    return jsonify(data)
+    return query_users_file('levels.json')
 
 @app.route('/api/pvp')
+@conditional('pvp_stats.json')
 def get_pvp():
     """Получить PvP статистику"""
-    data = load_json_file('pvp_stats.json')
-    return jsonify(data)
+    return query_users_file('pvp_stats.json')
 
 @app.route('/api/business')
+@conditional('business.json')
 def get_business():
     """Получить данные бизнесов"""
-    data = load_json_file('business.json')
-    return jsonify(data)
+    return query_users_file('business.json')
 
 @app.route('/api/stocks')
+@conditional('stocks.json')
 def get_stocks():
     """Получить данные биржи"""
     data = load_json_file('stocks.json')
     return jsonify(data)
 
 @app.route('/api/bank')
+@conditional('bank.json')
 def get_bank():
     """Получить банковские данные"""
-    data = load_json_file('bank.json')
-    return jsonify(data)
+    return query_users_file('bank.json')
 
 @app.route('/api/tournaments')
+@conditional('tournaments.json')
 def get_tournaments():
     """Получить данные турниров"""
     data = load_json_file('tournaments.json')
     return jsonify(data)
 
 @app.route('/api/enhancements')
+@conditional('enhancements.json')
 def get_enhancements():
     """Получить данные улучшений"""
     data = load_json_file('enhancements.json')
     return jsonify(data)
 
+def sync_sources():
+    """
+    Передать счётчикам и рейтингам изменившиеся файлы.
+    
+    Каждый файл синхронизируется отдельно и только при смене его версии:
+    правка economy.json не заставляет заново проходить levels.json и остальные.
+    """
+    with _sync_lock:
+        _sync_sources_locked()
+
+def _sync_sources_locked():
+    for filename in StatsAggregator.SOURCES:
+        version = file_version(filename)
+        if _synced_versions.get(filename, ()) == version:
+            continue
+        data = load_json_file(filename)
+        stats_totals.sync(filename, data)
+        leaderboards.sync(filename, data)
+        _synced_versions[filename] = version
+        _synced_data[filename] = data
+
+def compute_stats():
+    """
+    Агрегаты и топы (собираются заново только при смене поколения данных).
+    
+    Ответ строится под той же блокировкой и из тех же данных, что попали
+    в рейтинги: файл, изменившийся между синхронизацией и сборкой, не даёт
+    в топе пользователя, которого уже нет в данных.
+    """
+    with _sync_lock:
+        _sync_sources_locked()
+        generation = stats_generation(leaderboards, stats_totals)
+        cached = _stats_cache.get('value')
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        
+        stats = build_stats(lambda filename: _synced_data.get(filename, {}), leaderboards, stats_totals)
+        _stats_cache['value'] = (generation, stats)
+        return stats
+
 @app.route('/api/stats')
+@conditional(*StatsAggregator.SOURCES)
 def get_stats():
     """Получить агрегированную статистику"""
-    economy = load_json_file('economy.json')
-    levels = load_json_file('levels.json')
-    pvp = load_json_file('pvp_stats.json')
-    business = load_json_file('business.json')
-    bank = load_json_file('bank.json')
-    
-    # Общая статистика
-    total_users = max(
-        get_user_count(economy),
-        get_user_count(levels),
-        get_user_count(pvp)
-    )
-    
-    total_balance = calculate_total_balance(economy)
-    
-    # Подсчет общего банковского баланса
-    total_bank_balance = 0
-    total_loans = 0
-    for user_data in bank.values():
-        total_bank_balance += user_data.get('deposit', 0)  # Исправлено: deposit вместо balance
-        total_loans += user_data.get('loan', 0)
-    
-    # Подсчет бизнесов
-    total_businesses = 0
-    for user_businesses in business.values():
-        total_businesses += len(user_businesses)
-    
-    # Подсчет игровой статистики
-    total_games_played = 0
-    total_games_won = 0
-    for user_data in economy.values():
-        game_stats = user_data.get('game_stats', {})
-        total_games_played += (
-            game_stats.get('slots_played', 0) +
-            game_stats.get('roulette_played', 0) +
-            game_stats.get('coinflip_played', 0)
-        )
-        total_games_won += (
-            game_stats.get('slots_won', 0) +
-            game_stats.get('roulette_won', 0) +
-            game_stats.get('coinflip_won', 0)
-        )
-    
-    # Подсчет PvP статистики
-    total_duels = 0
-    for user_data in pvp.values():
-        total_duels += user_data.get('wins', 0) + user_data.get('losses', 0)
-    
-    # Топ пользователей
-    top_rich = get_top_users(economy, 'balance', 10)
-    top_levels = get_top_users(levels, 'level', 10)
-    
-    # Топ PvP
-    top_pvp = []
-    for user_id, user_data in pvp.items():
-        wins = user_data.get('wins', 0)
-        top_pvp.append({
-            'user_id': user_id,
-            'wins': wins,
-            'losses': user_data.get('losses', 0),
-            'rank': user_data.get('rank', 'Новичок')
-        })
-    top_pvp.sort(key=lambda x: x['wins'], reverse=True)
-    top_pvp = top_pvp[:10]
-    
-    stats = {
-        'overview': {
-            'total_users': total_users,
-            'total_balance': total_balance,
-            'total_bank_balance': total_bank_balance,
-            'total_loans': total_loans,
-            'total_businesses': total_businesses,
-            'total_games_played': total_games_played,
-            'total_games_won': total_games_won,
-            'total_duels': total_duels,
-            'timestamp': datetime.now().isoformat()
-        },
-        'leaderboards': {
-            'top_rich': top_rich,
-            'top_levels': top_levels,
-            'top_pvp': top_pvp
-        }
-    }
-    
-    return jsonify(stats)
+    stats = compute_stats()
+    return jsonify({
+        'overview': {**stats['overview'], 'timestamp': datetime.now().isoformat()},
+        'leaderboards': stats['leaderboards']
+    })
 
 @app.route('/api/transactions')
+@conditional('economy.json')
 def get_recent_transactions():
-    """Получить последние транзакции"""
-    economy = load_json_file('economy.json')
-    all_transactions = []
+    """
+    Получить последние транзакции.
     
-    for user_id, user_data in economy.items():
-        transactions = user_data.get('transactions', [])
-        for trans in transactions:
-            trans_copy = trans.copy()
-            trans_copy['user_id'] = user_id
-            all_transactions.append(trans_copy)
+    Параметры: limit (1-200, по умолчанию 50), before (поле cursor последней
+    полученной транзакции - следующая страница), type, user_id.
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    return jsonify(recent_transactions(
+        load_json_file('economy.json'),
+        limit=limit,
+        before=request.args.get('before') or None,
+        trans_type=request.args.get('type') or None,
+        user_id=request.args.get('user_id') or None
+    ))
+
+def load_timeseries():
+    """Временные ряды из timeseries.json (записывает ког metrics)"""
+    version = file_version('timeseries.json')
+    cached = _timeseries_cache.get('value')
+    if cached is None or cached[0] != version:
+        cached = _timeseries_cache['value'] = (version, TimeSeriesStore.from_dict(load_json_file('timeseries.json')))
+    return cached[1]
+
+@app.route('/api/timeseries')
+@conditional('timeseries.json')
+def get_timeseries():
+    """История метрики: metric, range (например, 24h, 7d, 1y)"""
+    try:
+        data = build_timeseries(load_timeseries(), request.args.get('metric'), request.args.get('range'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except KeyError:
+        return jsonify({'error': 'Неизвестная метрика'}), 404
+    return jsonify(data)
+
+@app.route('/api/analytics')
+@conditional(*ANALYTICS_SOURCES)
+def get_analytics():
+    """Перцентили, гистограммы, коэффициент Джини и доля топ-1% по балансам, депозитам, кредитам и уровням"""
+    return jsonify(analytics.get(file_version, load_json_file))
+
+@app.route('/api/users/<user_id>')
+@conditional(*PROFILE_SOURCES)
+def get_user_profile(user_id):
+    """Профиль пользователя: баланс, уровень, банк, бизнесы, акции, PvP, престиж, титулы"""
+    profile = profiles.get(user_id)
+    if profile is None:
+        return jsonify({'error': 'Пользователь не найден'}), 404
+    return jsonify(profile)
+
+def _capture_state():
+    return capture_state(compute_stats(), load_json_file('economy.json'))
+
+def _watch_changes():
+    """
+    Один поток на весь сервер: следит за версиями файлов и публикует
+    изменения, сколько бы клиентов ни было подключено к /api/stream.
+    """
+    versions = {name: file_version(name) for name in StatsAggregator.SOURCES}
+    state = _capture_state()
+    while True:
+        time.sleep(STREAM_POLL_INTERVAL)
+        try:
+            current = {name: file_version(name) for name in StatsAggregator.SOURCES}
+            if current == versions:
+                continue
+            changed_files = {name for name in current if current[name] != versions[name]}
+            new_state = _capture_state()
+            for event, data in diff_state(state, new_state, changed_files):
+                events.publish(event, data)
+            state, versions = new_state, current
+        except Exception as e:
+            print(f"Ошибка отслеживания изменений: {e}")
+
+def start_watcher():
+    """Запустить поток отслеживания изменений (один раз)"""
+    with _watcher_lock:
+        if 'thread' not in _watcher:
+            thread = threading.Thread(target=_watch_changes, name='dashboard-watcher', daemon=True)
+            thread.start()
+            _watcher['thread'] = thread
+
+@app.route('/api/stream')
+def stream_events():
+    """
+    Server-Sent Events с изменениями: overview (изменившиеся поля сводки),
+    leaderboards (изменившиеся топы), transactions (новые транзакции),
+    charts (какие файлы для графиков изменились) и reset (пропущенные
+    события потеряны - нужна полная перезагрузка).
+    """
+    start_watcher()
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
     
-    # Сортировка по времени
-    all_transactions.sort(
-        key=lambda x: x.get('timestamp', ''),
-        reverse=True
-    )
+    def generate():
+        after = events.last_id
+        yield 'retry: 3000\n\n'
+        if last_event_id is not None:
+            if events.can_resume(last_event_id):
+                after = last_event_id
+            else:
+                yield format_sse(after, 'reset', {})
+        
+        while True:
+            batch = events.wait(after, STREAM_HEARTBEAT)
+            if not batch:
+                yield ': ping\n\n'
+                continue
+            for event_id, event, data in batch:
+                yield format_sse(event_id, event, data)
+                after = event_id
     
-    # Возвращаем последние 50 транзакций
-    return jsonify(all_transactions[:50])
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 if __name__ == '__main__':
     print('🚀 Dashboard API запущен на http://localhost:5001')
@@ -220,4 +443,8 @@ if __name__ == '__main__':
     print('   - http://localhost:5001/api/business')
     print('   - http://localhost:5001/api/stats')
     print('   - http://localhost:5001/api/transactions')
+    print('   - http://localhost:5001/api/stream')
+    print('   - http://localhost:5001/api/timeseries')
+    print('   - http://localhost:5001/api/analytics')
+    print('   - http://localhost:5001/api/users/<id>')
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -4,6 +4,10 @@ const API_BASE = 'http://localhost:5001/api';
 // Charts
 let wealthChart = null;
 let levelsChart = null;
+let historyChart = null;
+
+// Conditional requests: url -> { etag, data }
+const responseCache = new Map();
 
 // Filter state
 let allTransactions = [];
@@ -77,11 +81,30 @@ document.addEventListener('DOMContentLoaded', () => {
             'tournament': '🏆',
             'level_up': '⭐',
             'crime': '🔫',
-            'pvp': '⚔️'
+            'pvp': '⚔️',
+            'admin': '⚙️'
         };
         return icons[type] || '💰';
     }
 
+    // Fetch JSON with If-None-Match; changed is false when the server answered 304
+    async function fetchJSON(url) {
+        const cached = responseCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch(url, { headers });
+
+        if (response.status === 304 && cached) {
+            return { data: cached.data, changed: false };
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            responseCache.set(url, { etag, data });
+        }
+        return { data, changed: true };
+    }
+
     // Update last update time
     function updateLastUpdateTime() {
         const now = new Date();
@@ -92,22 +115,17 @@ document.addEventListener('DOMContentLoaded', () => {
     // Fetch and update stats
     async function updateStats() {
         try {
-            const response = await fetch(`${API_BASE}/stats`);
-            const data = await response.json();
+            const { data, changed } = await fetchJSON(`${API_BASE}/stats`);
+            if (!changed) {
+                updateLastUpdateTime();
+                return;
+            }
 
             // Update overview stats
-            const overview = data.overview;
-            document.getElementById('totalUsers').textContent = formatNumber(overview.total_users);
-            document.getElementById('totalBalance').textContent = formatNumber(overview.total_balance);
-            document.getElementById('totalBank').textContent = formatNumber(overview.total_bank_balance);
-            document.getElementById('totalBusinesses').textContent = formatNumber(overview.total_businesses);
-            document.getElementById('totalGames').textContent = formatNumber(overview.total_games_played);
-            document.getElementById('totalDuels').textContent = formatNumber(overview.total_duels);
+            renderOverview(data.overview);
 
             // Update leaderboards
-            updateLeaderboard('topRich', data.leaderboards.top_rich, 'balance');
-            updateLeaderboard('topLevels', data.leaderboards.top_levels, 'level');
-            updatePvPLeaderboard(data.leaderboards.top_pvp);
+            renderLeaderboards(data.leaderboards);
 
             updateLastUpdateTime();
         } catch (error) {
@@ -115,6 +133,37 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Overview cards; accepts a full overview or only the changed fields
+    const overviewElements = {
+        total_users: 'totalUsers',
+        total_balance: 'totalBalance',
+        total_bank_balance: 'totalBank',
+        total_businesses: 'totalBusinesses',
+        total_games_played: 'totalGames',
+        total_duels: 'totalDuels'
+    };
+
+    function renderOverview(overview) {
+        for (const [key, elementId] of Object.entries(overviewElements)) {
+            if (key in overview) {
+                document.getElementById(elementId).textContent = formatNumber(overview[key]);
+            }
+        }
+    }
+
+    // Leaderboards; accepts all three lists or only the changed ones
+    function renderLeaderboards(leaderboards) {
+        if ('top_rich' in leaderboards) {
+            updateLeaderboard('topRich', leaderboards.top_rich, 'balance');
+        }
+        if ('top_levels' in leaderboards) {
+            updateLeaderboard('topLevels', leaderboards.top_levels, 'level');
+        }
+        if ('top_pvp' in leaderboards) {
+            updatePvPLeaderboard(leaderboards.top_pvp);
+        }
+    }
+
     // Update leaderboard
     function updateLeaderboard(elementId, data, valueKey) {
         const container = document.getElementById(elementId);
@@ -238,8 +287,14 @@ document.addEventListener('DOMContentLoaded', () => {
     // Update transactions
     async function updateTransactions() {
         try {
-            const response = await fetch(`${API_BASE}/transactions`);
-            const data = await response.json();
+            // Type filter is applied server-side, search filters the received page
+            const params = new URLSearchParams({ limit: 50 });
+            const typeFilter = document.getElementById('transactionTypeFilter').value;
+            if (typeFilter !== 'all') {
+                params.set('type', typeFilter);
+            }
+
+            const { data } = await fetchJSON(`${API_BASE}/transactions?${params}`);
 
             // Store all transactions
             allTransactions = data || [];
@@ -306,19 +361,27 @@ document.addEventListener('DOMContentLoaded', () => {
     // Update charts
     async function updateCharts() {
         try {
-            const [economyRes, levelsRes] = await Promise.all([
-                fetch(`${API_BASE}/economy`),
-                fetch(`${API_BASE}/levels`)
+            const [economy, levels, history] = await Promise.all([
+                // Charts only need one field per user
+                fetchJSON(`${API_BASE}/economy?fields=balance`),
+                fetchJSON(`${API_BASE}/levels?fields=level`),
+                fetchJSON(`${API_BASE}/timeseries?metric=money_supply&range=7d`)
             ]);
 
-            const economy = await economyRes.json();
-            const levels = await levelsRes.json();
-
             // Wealth distribution chart
-            updateWealthChart(economy);
+            if (economy.changed) {
+                updateWealthChart(economy.data);
+            }
 
             // Levels distribution chart
-            updateLevelsChart(levels);
+            if (levels.changed) {
+                updateLevelsChart(levels.data);
+            }
+
+            // Money supply history (absent until the bot has recorded samples)
+            if (history.changed && history.data.points) {
+                updateHistoryChart(history.data.points);
+            }
         } catch (error) {
             console.error('Error updating charts:', error);
         }
@@ -454,6 +517,64 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
+    function updateHistoryChart(points) {
+        const ctx = document.getElementById('historyChart');
+
+        if (historyChart) {
+            historyChart.destroy();
+        }
+
+        historyChart = new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: points.map(([timestamp]) => new Date(timestamp * 1000).toLocaleString('ru-RU', {
+                    day: '2-digit',
+                    month: '2-digit',
+                    hour: '2-digit',
+                    minute: '2-digit'
+                })),
+                datasets: [{
+                    label: 'Денежная масса',
+                    data: points.map(([, value]) => value),
+                    borderColor: 'rgba(52, 152, 219, 1)',
+                    backgroundColor: 'rgba(52, 152, 219, 0.2)',
+                    fill: true,
+                    pointRadius: 0,
+                    tension: 0.3
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: true,
+                scales: {
+                    y: {
+                        ticks: {
+                            color: '#b0b8c4',
+                            callback: value => formatNumber(value)
+                        },
+                        grid: {
+                            color: 'rgba(52, 152, 219, 0.1)'
+                        }
+                    },
+                    x: {
+                        ticks: {
+                            color: '#b0b8c4',
+                            maxTicksLimit: 8
+                        },
+                        grid: {
+                            display: false
+                        }
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                }
+            }
+        });
+    }
+
     // Refresh all data
     async function refreshAll() {
         const btn = document.getElementById('refreshBtn');
@@ -472,15 +593,85 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Transaction filter events
     document.getElementById('transactionSearch').addEventListener('input', applyTransactionFilters);
-    document.getElementById('transactionTypeFilter').addEventListener('change', applyTransactionFilters);
+    document.getElementById('transactionTypeFilter').addEventListener('change', updateTransactions);
 
     // Event listeners
     document.getElementById('refreshBtn').addEventListener('click', refreshAll);
 
+    // Live updates: apply deltas pushed by /api/stream
+    function prependTransactions(transactions) {
+        const typeFilter = document.getElementById('transactionTypeFilter').value;
+        const matching = typeFilter === 'all'
+            ? transactions
+            : transactions.filter(trans => trans.type === typeFilter);
+
+        if (matching.length > 0) {
+            allTransactions = matching.concat(allTransactions).slice(0, 50);
+            applyTransactionFilters();
+        }
+    }
+
+    let pollTimer = null;
+
+    function startPolling() {
+        if (pollTimer === null) {
+            // Auto-refresh every 30 seconds
+            pollTimer = setInterval(refreshAll, 30000);
+        }
+    }
+
+    function stopPolling() {
+        if (pollTimer !== null) {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+    }
+
+    function connectStream() {
+        const source = new EventSource(`${API_BASE}/stream`);
+
+        source.addEventListener('open', () => {
+            // Catch up on anything missed while disconnected (cheap thanks to 304s)
+            stopPolling();
+            refreshAll();
+        });
+
+        source.addEventListener('error', () => {
+            // EventSource reconnects by itself; poll until it does
+            startPolling();
+        });
+
+        source.addEventListener('overview', (e) => {
+            renderOverview(JSON.parse(e.data));
+            updateLastUpdateTime();
+        });
+
+        source.addEventListener('leaderboards', (e) => {
+            renderLeaderboards(JSON.parse(e.data));
+            updateLastUpdateTime();
+        });
+
+        source.addEventListener('transactions', (e) => {
+            prependTransactions(JSON.parse(e.data));
+            updateLastUpdateTime();
+        });
+
+        source.addEventListener('charts', () => {
+            updateCharts();
+        });
+
+        source.addEventListener('reset', () => {
+            refreshAll();
+        });
+    }
+
     // Initial load
     refreshAll();
 
-    // Auto-refresh every 30 seconds
-    setInterval(refreshAll, 30000);
+    if (window.EventSource) {
+        connectStream();
+    } else {
+        startPolling();
+    }
 
 }); // End of DOMContentLoaded
@@ -2,6 +2,16 @@ import discord
 from discord.ext import commands
 import os
 from dotenv import load_dotenv  # <— добавили
+from utils.analytics import AnalyticsCache
+from utils.cooldowns import CooldownRegistry
+from utils.data_store import DataStore
+from utils.guild_members import GuildMembers
+from utils.leaderboard import LeaderboardEngine
+from utils.name_resolver import NameResolver
+from utils.profile_service import ProfileService
+from utils.render_cache import RenderCache
+from utils.stats_aggregator import StatsAggregator
+from utils.timeseries import TimeSeriesStore
 
 class MyBot(commands.Bot):
     def __init__(self):
@@ -10,6 +20,29 @@ class MyBot(commands.Bot):
         intents.members = True
         intents.message_content = True
         super().__init__(command_prefix='!', intents=intents, help_command=None)
+        # Снимки файлов данных: коги публикуют их при каждом сохранении
+        self.datastore = DataStore()
+        # Общие рейтинги и счётчики статистики обновляются из datastore
+        self.leaderboards = LeaderboardEngine()
+        self.stats = StatsAggregator()
+        self.datastore.subscribe(self.leaderboards.sync)
+        self.datastore.subscribe(self.stats.sync)
+        # Временные ряды метрик (заполняет ког metrics)
+        self.timeseries = TimeSeriesStore()
+        # Распределения богатства и уровней (NumPy, пересчёт при новых снимках)
+        self.analytics = AnalyticsCache()
+        # Сводные профили пользователей (/stats, /api/users/<id>)
+        self.profiles = ProfileService(self.datastore.version, self.datastore.get)
+        # Кулдауны всех команд (длинные сохраняются в cooldowns.json)
+        self.cooldowns = CooldownRegistry()
+        # Составы гильдий для рейтингов по серверу
+        self.guild_members = GuildMembers(self.leaderboards)
+        # Имена пользователей для рейтингов (кеш + пакетные запросы)
+        self.names = NameResolver(self)
+        # Готовые embed'ы рейтингов: общие для всех, пока данные не изменились
+        self.render_cache = RenderCache(ttl=30.0)
+        # Встроенный веб-API дашборда (WEB_API=true в .env)
+        self.web_api = None
 
     async def setup_hook(self):
         # Автозагрузка когов из ./cogs (если папка есть)
@@ -21,6 +54,36 @@ class MyBot(commands.Bot):
                         print(f'✅ Загружен ког: {filename[:-3]}')
                     except Exception as e:
                         print(f'❌ Ошибка загрузки {filename}: {e}')
+        
+        # Веб-API дашборда в процессе бота вместо отдельного dashboard_api.py
+        if os.getenv('WEB_API', 'false').lower() == 'true':
+            from utils.web_api import WebAPI
+            host = os.getenv('WEB_API_HOST', '0.0.0.0')
+            try:
+                port = int(os.getenv('WEB_API_PORT', '5001'))
+            except ValueError:
+                print('⚠️ WEB_API_PORT должен быть числом, используется 5001')
+                port = 5001
+            self.web_api = WebAPI(self, host, port)
+            try:
+                await self.web_api.start()
+            except OSError as e:
+                print(f'❌ Не удалось запустить веб-API: {e}')
+                self.web_api = None
+    
+    async def close(self):
+        if self.web_api is not None:
+            await self.web_api.stop()
+        await super().close()
+    
+    async def on_member_join(self, member):
+        self.guild_members.add(member)
+    
+    async def on_member_remove(self, member):
+        self.guild_members.remove(member)
+    
+    async def on_guild_remove(self, guild):
+        self.guild_members.forget(guild.id)
 
 
 bot = MyBot()
@@ -0,0 +1,112 @@
+# achievements.py
+"""Декларативные достижения, проверяемые по событиям экономики и уровней"""
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from utils.bulk_economy import record_transaction
+
+# Типы событий
+BALANCE_CHANGED = "balance_changed"  # Баланс пользователя вырос
+GAME_PLAYED = "game_played"  # game: slots/roulette/coinflip, jackpot: bool
+LEVEL_REACHED = "level_reached"  # level: новый уровень
+REWARD_CLAIMED = "reward_claimed"  # kind: daily/work/weekly/monthly
+
+TRANSACTION_TYPE = "achievement"
+
+
+class Achievement(NamedTuple):
+    """Правило достижения: открывается, когда на событие event выполнено condition"""
+    id: str
+    name: str
+    desc: str
+    emoji: str
+    event: str
+    condition: Callable[[dict, dict], bool]  # (данные пользователя, данные события)
+    reward: int = 0
+
+
+def _reached_level(level: int) -> Callable[[dict, dict], bool]:
+    # >=, а не ==: за одно начисление XP можно перескочить несколько уровней
+    return lambda user, event: event.get("level", 0) >= level
+
+
+ACHIEVEMENTS = (
+    Achievement("first_daily", "Первый день", "Получить первую ежедневную награду", "🎁",
+                REWARD_CLAIMED, lambda user, event: event.get("kind") == "daily"),
+    Achievement("first_work", "Трудоголик", "Поработать первый раз", "💼",
+                REWARD_CLAIMED, lambda user, event: event.get("kind") == "work"),
+    Achievement("first_game", "Игрок", "Сыграть первую игру", "🎰",
+                GAME_PLAYED, lambda user, event: True),
+    Achievement("jackpot", "Джекпот!", "Сорвать джекпот в слотах", "💰",
+                GAME_PLAYED, lambda user, event: event.get("jackpot", False)),
+    Achievement("millionaire", "Миллионер", "Накопить 1,000,000 крионов", "💎",
+                BALANCE_CHANGED, lambda user, event: user.get("balance", 0) >= 1000000),
+    Achievement("level_10", "Новичок", "Достичь 10 уровня", "🌱",
+                LEVEL_REACHED, _reached_level(10), 500),
+    Achievement("level_25", "Активист", "Достичь 25 уровня", "⚡",
+                LEVEL_REACHED, _reached_level(25), 1000),
+    Achievement("level_50", "Ветеран", "Достичь 50 уровня", "🛡️",
+                LEVEL_REACHED, _reached_level(50), 2500),
+    Achievement("level_75", "Легенда", "Достичь 75 уровня", "👑",
+                LEVEL_REACHED, _reached_level(75), 5000),
+    Achievement("level_100", "Бессмертный", "Достичь 100 уровня", "🔥",
+                LEVEL_REACHED, _reached_level(100), 10000),
+)
+
+
+class AchievementEngine:
+    """
+    Проверка достижений по событиям.
+    
+    Правила проиндексированы по типу события, поэтому событие проверяет
+    только свои правила, а уже открытые пропускаются. Достижения и награды
+    записываются в переданный словарь пользователя - их сохраняет тот же
+    вызов сохранения, что и само изменение, которое породило событие.
+    """
+    
+    def __init__(self, rules: Iterable[Achievement] = ACHIEVEMENTS):
+        self.rules: Dict[str, Achievement] = {}
+        self._by_event: Dict[str, List[Achievement]] = {}
+        for rule in rules:
+            self.rules[rule.id] = rule
+            self._by_event.setdefault(rule.event, []).append(rule)
+    
+    def all(self) -> List[Achievement]:
+        """Все достижения в порядке объявления"""
+        return list(self.rules.values())
+    
+    def get(self, achievement_id: str) -> Optional[Achievement]:
+        return self.rules.get(achievement_id)
+    
+    def evaluate(self, user: dict, event: str, **payload) -> List[Achievement]:
+        """
+        Открыть достижения пользователя, выполненные событием event
+        
+        Args:
+            user: Данные пользователя из economy.json (изменяются на месте)
+            payload: Данные события (game, jackpot, level, kind...)
+        
+        Returns:
+            Только что открытые достижения
+        """
+        rules = self._by_event.get(event)
+        if not rules:
+            return []
+        
+        unlocked = user.setdefault("achievements", {})
+        timestamp = None
+        new = []
+        for rule in rules:
+            if rule.id in unlocked or not rule.condition(user, payload):
+                continue
+            timestamp = timestamp or datetime.now().isoformat()
+            unlocked[rule.id] = {"unlocked": True, "date": timestamp}
+            if rule.reward:
+                user["balance"] = user.get("balance", 0) + rule.reward
+                record_transaction(user, TRANSACTION_TYPE, rule.reward, f"Достижение: {rule.name}", timestamp)
+            new.append(rule)
+        
+        # Награды за достижения сами меняют баланс
+        if event != BALANCE_CHANGED and any(rule.reward for rule in new):
+            new += self.evaluate(user, BALANCE_CHANGED)
+        return new
@@ -0,0 +1,122 @@
+# analytics.py
+"""Распределение богатства и уровней: перцентили, гистограммы, коэффициент Джини"""
+import math
+from typing import Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# Файлы, из которых считается аналитика
+SOURCES = ('economy.json', 'bank.json', 'levels.json')
+
+
+def _column(data: dict, field: str, dtype=np.float64) -> np.ndarray:
+    """Значения поля всех пользователей одним массивом"""
+    return np.fromiter(
+        (user.get(field, 0) or 0 for user in data.values() if isinstance(user, dict)),
+        dtype=dtype
+    )
+
+
+def gini(values: np.ndarray) -> float:
+    """
+    Коэффициент Джини (0 - все равны, 1 - всё у одного).
+    Отрицательные значения считаются нулём.
+    """
+    values = np.sort(np.clip(values, 0, None))
+    total = values.sum()
+    if values.size == 0 or total == 0:
+        return 0.0
+    n = values.size
+    ranks = np.arange(1, n + 1)
+    return float(2 * np.dot(ranks, values) / (n * total) - (n + 1) / n)
+
+
+def top_share(values: np.ndarray, fraction: float = 0.01) -> float:
+    """Доля суммы у верхних fraction пользователей (минимум один пользователь)"""
+    total = values.sum()
+    if values.size == 0 or total <= 0:
+        return 0.0
+    k = max(1, math.ceil(values.size * fraction))
+    top = np.partition(values, values.size - k)[values.size - k:]
+    return float(top.sum() / total)
+
+
+def histogram(values: np.ndarray) -> dict:
+    """Гистограмма по степеням десяти: [0, 1), [1, 10), [10, 100), ..."""
+    if values.size == 0:
+        return {'edges': [], 'counts': []}
+    top = max(float(values.max()), 1.0)
+    edges = np.concatenate(([0.0], 10.0 ** np.arange(0, math.floor(math.log10(top)) + 2)))
+    counts, _ = np.histogram(np.clip(values, 0, None), bins=edges)
+    return {'edges': edges.astype(np.int64).tolist(), 'counts': counts.tolist()}
+
+
+def describe(values: np.ndarray) -> dict:
+    """Сводка распределения суммы денег"""
+    if values.size == 0:
+        return {
+            'count': 0, 'positive': 0, 'total': 0, 'mean': 0.0,
+            'percentiles': {str(p): 0.0 for p in PERCENTILES},
+            'gini': 0.0, 'top1_share': 0.0,
+            'histogram': histogram(values)
+        }
+    return {
+        'count': int(values.size),
+        'positive': int(np.count_nonzero(values > 0)),
+        'total': int(values.sum()),
+        'mean': float(values.mean()),
+        'percentiles': dict(zip(map(str, PERCENTILES), np.percentile(values, PERCENTILES).tolist())),
+        'gini': gini(values),
+        'top1_share': top_share(values),
+        'histogram': histogram(values)
+    }
+
+
+def compute_analytics(economy: dict, bank: dict, levels: dict) -> dict:
+    """
+    Аналитика экономики и уровней.
+    
+    Значения собираются в массивы NumPy одним проходом по каждому файлу,
+    дальше всё считается векторно.
+    """
+    level_values = _column(levels, 'level', np.int64)
+    if level_values.size:
+        counts = np.bincount(np.clip(level_values, 0, None))
+        nonzero = np.flatnonzero(counts)
+        level_distribution = dict(zip(map(str, nonzero.tolist()), counts[nonzero].tolist()))
+        level_percentiles = dict(zip(map(str, PERCENTILES), np.percentile(level_values, PERCENTILES).tolist()))
+    else:
+        level_distribution = {}
+        level_percentiles = {str(p): 0.0 for p in PERCENTILES}
+    
+    return {
+        'balance': describe(_column(economy, 'balance')),
+        'deposit': describe(_column(bank, 'deposit')),
+        'loan': describe(_column(bank, 'loan')),
+        'levels': {
+            'count': int(level_values.size),
+            'percentiles': level_percentiles,
+            'distribution': level_distribution
+        }
+    }
+
+
+class AnalyticsCache:
+    """Результат compute_analytics, пересчитываемый только при смене версий файлов"""
+    
+    def __init__(self):
+        self._cached: Optional[Tuple[Hashable, dict]] = None
+    
+    def get(self, version: Callable[[str], Hashable], load: Callable[[str], dict]) -> dict:
+        """
+        Args:
+            version: Функция версии файла по имени (mtime файла, номер снимка DataStore)
+            load: Функция получения данных файла по имени
+        """
+        generation = tuple(version(name) for name in SOURCES)
+        if self._cached is None or self._cached[0] != generation:
+            result = compute_analytics(*(load(name) for name in SOURCES))
+            self._cached = (generation, result)
+        return self._cached[1]
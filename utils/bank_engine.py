@@ -0,0 +1,225 @@
+# bank_engine.py
+"""Пакетное начисление процентов по депозитам и обработка просроченных кредитов"""
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.bulk_economy import record_transaction
+
+SECONDS_PER_DAY = 86400
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """ISO-время из bank.json в секунды Unix-времени (None, если поле пустое или битое)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _accrued(account: dict, rate: float, now: datetime) -> float:
+    """Проценты с последнего начисления вместе с перенесённой дробной частью"""
+    since = _timestamp(account.get("deposit_since"))
+    if not account.get("deposit") or since is None:
+        return 0.0
+    days = max(0.0, (now.timestamp() - since) / SECONDS_PER_DAY)
+    return account["deposit"] * rate / 365 * days + account.get("interest_carry", 0.0)
+
+
+def pending_interest(account: dict, rate: float, now: datetime) -> int:
+    """Проценты, набежавшие по депозиту с последнего начисления"""
+    return int(_accrued(account, rate, now))
+
+
+def accrue_account(account: dict, rate: float, now: datetime) -> int:
+    """
+    Зачислить набежавшие проценты на депозит одного счёта; вернуть сумму.
+    
+    Как и accrue_interest: целая часть зачисляется, дробная остаётся в interest_carry.
+    """
+    if not account.get("deposit") or _timestamp(account.get("deposit_since")) is None:
+        if account.get("deposit", 0) > 0:
+            account["deposit_since"] = now.isoformat()
+        return 0
+    accrued = _accrued(account, rate, now)
+    interest = math.floor(accrued)
+    account["deposit"] += interest
+    account["deposit_since"] = now.isoformat()
+    account["interest_carry"] = round(accrued - interest, 6)
+    return interest
+
+
+def accrue_interest(bank: dict, rate: float, now: datetime) -> dict:
+    """
+    Начислить проценты по всем депозитам одним векторным проходом.
+    
+    Целая часть процентов зачисляется на депозит, дробная переносится в
+    interest_carry до следующего начисления - частые запуски не теряют
+    копейки на округлении.
+    
+    Args:
+        rate: Годовая ставка (0.03 - 3%)
+    
+    Returns:
+        {'accounts': счетов с депозитом, 'interest': зачислено всего}
+    """
+    user_ids = []
+    since = []
+    for user_id, account in bank.items():
+        started = _timestamp(account.get("deposit_since"))
+        if account.get("deposit", 0) > 0 and started is not None:
+            user_ids.append(user_id)
+            since.append(started)
+    if not user_ids:
+        return {"accounts": 0, "interest": 0}
+    
+    deposits = np.fromiter((bank[user_id]["deposit"] for user_id in user_ids), dtype=np.float64, count=len(user_ids))
+    carry = np.fromiter(
+        (bank[user_id].get("interest_carry", 0.0) for user_id in user_ids),
+        dtype=np.float64,
+        count=len(user_ids)
+    )
+    days = np.clip((now.timestamp() - np.array(since)) / SECONDS_PER_DAY, 0, None)
+    accrued = deposits * (rate / 365) * days + carry
+    whole = np.floor(accrued)
+    carry = accrued - whole
+    
+    timestamp = now.isoformat()
+    for user_id, interest, rest in zip(user_ids, whole.astype(np.int64).tolist(), carry.tolist()):
+        account = bank[user_id]
+        account["deposit"] += interest
+        account["deposit_since"] = timestamp
+        account["interest_carry"] = round(rest, 6)
+    return {"accounts": len(user_ids), "interest": int(whole.sum())}
+
+
+class LoanSchedule:
+    """
+    Сроки кредитов в двоичной куче (min-heap).
+    
+    Ближайший срок всегда на вершине, поэтому проверка просрочки снимает
+    с кучи только действительно просроченные кредиты и не проходит по всем
+    счетам. Погашенные и перенесённые кредиты из кучи не удаляются: при
+    снятии запись сверяется со счётом и отбрасывается, если устарела.
+    """
+    
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def rebuild(self, bank: dict):
+        """Собрать кучу по всем активным кредитам"""
+        self._heap = []
+        for user_id, account in bank.items():
+            deadline = _timestamp(account.get("loan_deadline"))
+            if account.get("loan", 0) > 0 and deadline is not None:
+                self._heap.append((deadline, user_id))
+        heapq.heapify(self._heap)
+    
+    def push(self, user_id: str, deadline: datetime):
+        """Добавить срок кредита"""
+        heapq.heappush(self._heap, (deadline.timestamp(), user_id))
+    
+    def next_deadline(self) -> Optional[float]:
+        """Ближайший срок (секунды Unix-времени)"""
+        return self._heap[0][0] if self._heap else None
+    
+    def pop_due(self, bank: dict, now: datetime) -> List[str]:
+        """Снять с кучи кредиты со сроком не позже now; вернуть действующие из них"""
+        now_ts = now.timestamp()
+        due = []
+        seen = set()
+        while self._heap and self._heap[0][0] <= now_ts:
+            deadline, user_id = heapq.heappop(self._heap)
+            account = bank.get(user_id)
+            if user_id in seen or not account or account.get("loan", 0) <= 0:
+                continue
+            # Срок перенесли (новый кредит, штраф) - запись устарела
+            current = _timestamp(account.get("loan_deadline"))
+            if current is None or current > now_ts:
+                continue
+            seen.add(user_id)
+            due.append(user_id)
+        return due
+
+
+def settle_overdue(
+    bank: dict,
+    economy: Optional[dict],
+    user_ids: Iterable[str],
+    penalty_rate: float,
+    extension: timedelta,
+    now: datetime
+) -> dict:
+    """
+    Погасить просроченные кредиты автоматически.
+    
+    Долг списывается сначала с кошелька (economy.json), затем с депозита.
+    На остаток начисляется штраф penalty_rate и срок переносится на extension.
+    Все изменения вносятся в переданные словари - сохранить их нужно один раз.
+    
+    Args:
+        economy: Данные экономики (None - списывать только с депозита)
+    
+    Returns:
+        Итог: сколько кредитов обработано и погашено, списано с кошелька и
+        депозита, начислено штрафов, остаток долга; в users - по каждому
+        пользователю, в extended - {user_id: новый срок}
+    """
+    summary = {
+        "loans": 0, "repaid": 0, "from_wallet": 0, "from_deposit": 0,
+        "penalties": 0, "outstanding": 0, "users": {}, "extended": {}
+    }
+    timestamp = now.isoformat()
+    for user_id in user_ids:
+        account = bank[user_id]
+        debt = account["loan"]
+        
+        wallet = economy.get(user_id) if economy is not None else None
+        from_wallet = min(debt, max(0, wallet.get("balance", 0))) if wallet else 0
+        if from_wallet:
+            wallet["balance"] -= from_wallet
+            record_transaction(wallet, "bank", -from_wallet, "Автосписание просроченного кредита", timestamp)
+            debt -= from_wallet
+        
+        from_deposit = min(debt, account.get("deposit", 0))
+        if from_deposit:
+            account["deposit"] -= from_deposit
+            debt -= from_deposit
+            if account["deposit"] == 0:
+                account["deposit_since"] = None
+                account["interest_carry"] = 0.0
+        
+        penalty = 0
+        if debt > 0:
+            penalty = math.ceil(debt * penalty_rate)
+            debt += penalty
+            deadline = now + extension
+            account["loan_deadline"] = deadline.isoformat()
+            summary["extended"][user_id] = deadline
+        else:
+            account["loan_since"] = None
+            account["loan_deadline"] = None
+            summary["repaid"] += 1
+        account["loan"] = debt
+        
+        summary["loans"] += 1
+        summary["from_wallet"] += from_wallet
+        summary["from_deposit"] += from_deposit
+        summary["penalties"] += penalty
+        summary["outstanding"] += debt
+        summary["users"][user_id] = {
+            "collected": from_wallet + from_deposit,
+            "from_wallet": from_wallet,
+            "from_deposit": from_deposit,
+            "penalty": penalty,
+            "debt": debt
+        }
+    return summary
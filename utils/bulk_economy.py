@@ -0,0 +1,184 @@
+# bulk_economy.py
+"""Массовые операции с балансами: один проход по economy.json и одно сохранение"""
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TRANSACTION_TYPE = "admin"
+HISTORY_LIMIT = 100  # Как в Economy._add_transaction
+
+
+def record_transaction(
+    user: dict,
+    trans_type: str,
+    amount: int,
+    details: str = "",
+    timestamp: Optional[str] = None
+):
+    """Транзакция в историю пользователя (последние HISTORY_LIMIT)"""
+    transactions = user.setdefault("transactions", [])
+    transactions.insert(0, {
+        "type": trans_type,
+        "amount": amount,
+        "timestamp": timestamp or datetime.now().isoformat(),
+        "details": details
+    })
+    del transactions[HISTORY_LIMIT:]
+
+
+def _summary(changes: Dict[str, int]) -> dict:
+    """Итог операции: сколько пользователей затронуто и на сколько изменилась масса денег"""
+    return {
+        "users": len(changes),
+        "total": sum(changes.values()),
+        "changes": changes
+    }
+
+
+def add_to_users(
+    economy: dict,
+    user_ids: Iterable[str],
+    amount: int,
+    details: str,
+    new_user: Callable[[], dict]
+) -> dict:
+    """
+    Начислить amount каждому из user_ids (например, всем с ролью);
+    отсутствующие в экономике пользователи создаются через new_user()
+    """
+    timestamp = datetime.now().isoformat()
+    changes = {}
+    for user_id in set(user_ids):
+        user = economy.get(user_id)
+        if user is None:
+            user = economy[user_id] = new_user()
+        user["balance"] = user.get("balance", 0) + amount
+        record_transaction(user, TRANSACTION_TYPE, amount, details, timestamp)
+        changes[user_id] = amount
+    return _summary(changes)
+
+
+def scale_balances(economy: dict, factor: float, details: str) -> dict:
+    """Умножить все балансы на factor (с округлением вниз)"""
+    timestamp = datetime.now().isoformat()
+    changes = {}
+    for user_id, user in economy.items():
+        balance = user.get("balance", 0)
+        delta = int(balance * factor) - balance
+        if delta == 0:
+            continue
+        user["balance"] = balance + delta
+        record_transaction(user, TRANSACTION_TYPE, delta, details, timestamp)
+        changes[user_id] = delta
+    return _summary(changes)
+
+
+def last_activity(user: dict) -> Optional[datetime]:
+    """Время последней транзакции пользователя (история хранится от новых к старым)"""
+    transactions = user.get("transactions")
+    if not transactions:
+        return None
+    try:
+        return datetime.fromisoformat(transactions[0]["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def reset_inactive(economy: dict, days: int, now: Optional[datetime] = None) -> dict:
+    """
+    Удалить данные пользователей без транзакций за последние days дней
+    (и тех, у кого истории нет совсем)
+    
+    Returns:
+        Итог, в changes - списанный баланс каждого удалённого пользователя
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+    changes = {}
+    for user_id, user in list(economy.items()):
+        active_at = last_activity(user)
+        if active_at is not None and active_at >= cutoff:
+            continue
+        changes[user_id] = -user.get("balance", 0)
+        del economy[user_id]
+    return _summary(changes)
+
+
+def parse_balance_csv(text: str) -> Tuple[List[Tuple[str, str, int]], List[str]]:
+    """
+    Разбор CSV вида `user_id,сумма` (заголовок необязателен).
+    
+    Сумма со знаком (+500, -200) - изменение баланса, без знака - новый баланс.
+    
+    Returns:
+        ([(user_id, 'add' | 'set', сумма), ...], [ошибки по строкам])
+    """
+    rows = []
+    errors = []
+    for line_number, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        user_id = row[0].strip()
+        if line_number == 1 and not user_id.isdigit():
+            continue  # Заголовок
+        if len(row) < 2 or not user_id.isdigit():
+            errors.append(f"Строка {line_number}: ожидается user_id,сумма")
+            continue
+        
+        value = row[1].strip()
+        mode = "add" if value.startswith(("+", "-")) else "set"
+        try:
+            amount = int(value)
+        except ValueError:
+            errors.append(f"Строка {line_number}: сумма «{value}» не число")
+            continue
+        if mode == "set" and amount < 0:
+            errors.append(f"Строка {line_number}: баланс не может быть отрицательным")
+            continue
+        rows.append((user_id, mode, amount))
+    return rows, errors
+
+
+def apply_balance_rows(
+    economy: dict,
+    rows: List[Tuple[str, str, int]],
+    details: str,
+    new_user: Callable[[], dict]
+) -> Tuple[dict, List[str]]:
+    """
+    Применить строки parse_balance_csv.
+    
+    Сначала все строки проверяются на копиях балансов: если хоть одна
+    уводит баланс в минус, не меняется ничего.
+    
+    Returns:
+        (итог, ошибки)
+    """
+    balances: Dict[str, int] = {}
+    for user_id, mode, amount in rows:
+        current = balances.get(user_id)
+        if current is None:
+            current = economy.get(user_id, {}).get("balance", 0)
+        balances[user_id] = amount if mode == "set" else current + amount
+    
+    errors = [
+        f"<@{user_id}>: итоговый баланс {balance:,} < 0"
+        for user_id, balance in balances.items()
+        if balance < 0
+    ]
+    if errors:
+        return _summary({}), errors
+    
+    timestamp = datetime.now().isoformat()
+    changes = {}
+    for user_id, balance in balances.items():
+        delta = balance - economy.get(user_id, {}).get("balance", 0)
+        if delta == 0:
+            continue
+        user = economy.get(user_id)
+        if user is None:
+            user = economy[user_id] = new_user()
+        user["balance"] = balance
+        record_transaction(user, TRANSACTION_TYPE, delta, details, timestamp)
+        changes[user_id] = delta
+    return _summary(changes), []
@@ -0,0 +1,267 @@
+# cooldowns.py
+"""Общий реестр кулдаунов с иерархическим колесом таймеров"""
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[str, str]  # (вид кулдауна, user_id)
+
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS  # Слотов на уровне
+WHEEL_LEVELS = 4  # Шаг уровней: 1с, 64с, ~68м, ~73ч - горизонт ~194 дня
+WHEEL_SPAN = WHEEL_SIZE ** WHEEL_LEVELS
+
+# Короче этого кулдауны не сохраняются в файл (XP за сообщения и т.п.)
+PERSIST_MIN_SECONDS = 60
+
+
+def format_remaining(seconds: int, precise: bool = False) -> str:
+    """
+    Оставшееся время: '5ч 12м', '12м'; с precise - '12м 30с', '30с'
+    """
+    hours, rest = divmod(max(0, int(seconds)), 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours > 0:
+        return f"{hours}ч {minutes}м"
+    if precise and minutes > 0:
+        return f"{minutes}м {secs}с"
+    if precise:
+        return f"{secs}с"
+    return f"{minutes}м"
+
+
+class _TimerWheel:
+    """
+    Иерархическое колесо таймеров с шагом в секунду.
+    
+    Таймер попадает на уровень, шаг которого соответствует сроку до
+    срабатывания: ближайшие 64 секунды - нулевой уровень, дальше - уровни
+    по 64 минуты, ~3 суток и ~194 дня. Когда стрелка уровня доходит до
+    слота, его таймеры раскладываются заново по более точным уровням,
+    поэтому вставка и срабатывание стоят O(1), а пустые участки времени
+    пропускаются целыми слотами верхних уровней.
+    """
+    
+    def __init__(self, now: int, on_expire: Callable[[Key, int], None]):
+        self.current = now
+        self.on_expire = on_expire
+        self.slots: List[List[List[Tuple[int, Key]]]] = [
+            [[] for _ in range(WHEEL_SIZE)] for _ in range(WHEEL_LEVELS)
+        ]
+        self.counts = [0] * WHEEL_LEVELS  # Таймеров на каждом уровне
+        self.size = 0
+    
+    def add(self, expires: int, key: Key):
+        """Поставить таймер на момент expires"""
+        self.size += 1
+        self._place(expires, key)
+    
+    def _place(self, expires: int, key: Key):
+        # Дальше горизонта - на верхний уровень, при перераскладке слот уточнится
+        target = min(expires, self.current + WHEEL_SPAN - 1)
+        delta = max(target - self.current, 1)
+        level = 0
+        while delta >= WHEEL_SIZE ** (level + 1):
+            level += 1
+        index = (target >> (WHEEL_BITS * level)) & (WHEEL_SIZE - 1)
+        self.slots[level][index].append((expires, key))
+        self.counts[level] += 1
+    
+    def _take(self, level: int, index: int) -> List[Tuple[int, Key]]:
+        """Забрать все таймеры слота"""
+        entries = self.slots[level][index]
+        if entries:
+            self.slots[level][index] = []
+            self.counts[level] -= len(entries)
+        return entries
+    
+    def advance(self, now: int):
+        """Продвинуть стрелку до now, вызывая on_expire для сработавших таймеров"""
+        if now - self.current >= WHEEL_SPAN:
+            # Колесо стояло дольше горизонта - проще разложить всё заново
+            pending = [
+                entry
+                for level in range(WHEEL_LEVELS)
+                for index in range(WHEEL_SIZE)
+                for entry in self._take(level, index)
+            ]
+            self.current = now
+            self.size = 0
+            for expires, key in pending:
+                if expires <= now:
+                    self.on_expire(key, expires)
+                else:
+                    self.add(expires, key)
+            return
+        
+        while self.current < now:
+            if self.size == 0:
+                self.current = now
+                return
+            
+            # Пока нижние уровни пусты, до перераскладки следующего уровня ничего не происходит
+            level = 0
+            while level < WHEEL_LEVELS - 1 and self.counts[level] == 0:
+                level += 1
+            if level > 0:
+                step = WHEEL_SIZE ** level
+                skip_to = (self.current // step + 1) * step - 1
+                if skip_to >= now:
+                    self.current = now
+                    return
+                self.current = skip_to
+            
+            self.current += 1
+            tick = self.current
+            
+            # Перераскладка уровней, у которых стрелка перешла на новый слот
+            for level in range(WHEEL_LEVELS - 1, 0, -1):
+                if tick % (WHEEL_SIZE ** level) == 0:
+                    index = (tick >> (WHEEL_BITS * level)) & (WHEEL_SIZE - 1)
+                    for expires, key in self._take(level, index):
+                        self._place(expires, key)
+            
+            for expires, key in self._take(0, tick & (WHEEL_SIZE - 1)):
+                if expires <= tick:
+                    self.size -= 1
+                    self.on_expire(key, expires)
+                else:
+                    self._place(expires, key)
+
+
+class CooldownRegistry:
+    """
+    Кулдауны всех команд (daily, work, rob, тюрьма, XP за сообщения...).
+    
+    Для каждой пары (вид, пользователь) хранится момент окончания в
+    секундах Unix-времени: проверка и установка - одно обращение к словарю.
+    Истёкшие записи удаляет колесо таймеров, так что словарь не растёт.
+    Кулдауны длиннее минуты сохраняются в компактный JSON и переживают
+    перезапуск бота.
+    """
+    
+    def __init__(self, filename: str = 'cooldowns.json', clock: Callable[[], float] = time.time):
+        self.filename = filename
+        self.clock = clock
+        self._expires: Dict[Key, int] = {}
+        self._wheel = _TimerWheel(self._now(), self._on_expire)
+        self.dirty = False  # Есть несохранённые изменения
+        self._load()
+    
+    def _now(self, now: Optional[float] = None) -> int:
+        return int(now if now is not None else self.clock())
+    
+    def _on_expire(self, key: Key, expires: int):
+        # Запись могли продлить или сбросить - удаляем только ту, что истекла
+        if self._expires.get(key) == expires:
+            del self._expires[key]
+    
+    def advance(self, now: Optional[float] = None):
+        """Удалить истёкшие кулдауны"""
+        self._wheel.advance(self._now(now))
+    
+    def remaining(self, kind: str, user_id: str, now: Optional[float] = None) -> int:
+        """Секунд до конца кулдауна (0 - кулдауна нет)"""
+        expires = self._expires.get((kind, user_id))
+        if expires is None:
+            return 0
+        return max(0, expires - self._now(now))
+    
+    def set(self, kind: str, user_id: str, seconds: float, now: Optional[float] = None) -> int:
+        """Поставить кулдаун на seconds секунд; вернуть момент окончания"""
+        now = self._now(now)
+        self.advance(now)
+        expires = now + int(seconds)
+        key = (kind, user_id)
+        if expires <= now:
+            self.clear(kind, user_id)
+            return now
+        self._expires[key] = expires
+        self._wheel.add(expires, key)
+        if seconds >= PERSIST_MIN_SECONDS:
+            self.dirty = True
+        return expires
+    
+    def try_acquire(self, kind: str, user_id: str, seconds: float, now: Optional[float] = None) -> int:
+        """
+        Проверить и сразу поставить кулдаун
+        
+        Returns:
+            0, если кулдауна не было и он поставлен, иначе секунд до его конца
+        """
+        left = self.remaining(kind, user_id, now)
+        if left == 0:
+            self.set(kind, user_id, seconds, now)
+        return left
+    
+    def clear(self, kind: str, user_id: str) -> int:
+        """Снять кулдаун; вернуть сколько секунд от него оставалось"""
+        left = self.remaining(kind, user_id)
+        if self._expires.pop((kind, user_id), None) is not None:
+            self.dirty = True
+        return left
+    
+    def clear_kinds(self, kinds: Iterable[str], user_id: Optional[str] = None):
+        """Снять кулдауны видов kinds у пользователя (без user_id - у всех)"""
+        kinds = set(kinds)
+        if user_id is not None:
+            for kind in kinds:
+                self.clear(kind, user_id)
+            return
+        for key in [key for key in self._expires if key[0] in kinds]:
+            del self._expires[key]
+            self.dirty = True
+    
+    def import_timestamps(self, kind: str, data: dict, field: str, seconds: int):
+        """
+        Перенести старые кулдауны из файлов данных (ISO-время последнего
+        использования в поле field) - только ещё не истёкшие и не записанные
+        """
+        now = self._now()
+        for user_id, user in data.items():
+            last_time = user.get(field) if isinstance(user, dict) else None
+            if not last_time or (kind, user_id) in self._expires:
+                continue
+            try:
+                expires = int(datetime.fromisoformat(last_time).timestamp()) + seconds
+            except (TypeError, ValueError):
+                continue
+            if expires > now:
+                self.set(kind, user_id, expires - now, now)
+    
+    def to_dict(self) -> dict:
+        """{вид: {user_id: момент окончания}} без коротких и истёкших кулдаунов"""
+        now = self._now()
+        data: Dict[str, Dict[str, int]] = {}
+        for (kind, user_id), expires in self._expires.items():
+            if expires - now >= PERSIST_MIN_SECONDS:
+                data.setdefault(kind, {})[user_id] = expires
+        return data
+    
+    def _load(self):
+        """Загрузка сохранённых кулдаунов"""
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка загрузки {self.filename}: {e}")
+            return
+        
+        now = self._now()
+        for kind, users in data.items():
+            for user_id, expires in users.items():
+                if expires > now:
+                    self._expires[(kind, user_id)] = expires
+                    self._wheel.add(expires, (kind, user_id))
+    
+    def save(self, data: Optional[dict] = None):
+        """Сохранение в файл (без отступов)"""
+        data = self.to_dict() if data is None else data
+        tmp_file = self.filename + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_file, self.filename)
@@ -0,0 +1,143 @@
+# dashboard_data.py
+"""Ответы API дашборда: общие для Flask-сервера и встроенного веб-API бота"""
+from typing import Callable, List, Set, Tuple
+
+from utils.leaderboard import LeaderboardEngine
+from utils.stats_aggregator import StatsAggregator
+from utils.timeseries import TimeSeriesStore, parse_range
+from utils.transaction_feed import recent_transactions
+
+Loader = Callable[[str], dict]
+
+# Файлы, из которых собираются графики дашборда
+CHART_SOURCES = ('economy.json', 'levels.json')
+
+
+def get_top_users(leaderboards: LeaderboardEngine, data: dict, metric: str, limit: int = 10) -> List[dict]:
+    """Получить топ пользователей по метрике рейтинга"""
+    users = []
+    for user_id, score in leaderboards.top(metric, limit):
+        users.append({
+            'user_id': user_id,
+            'value': score[0],
+            'data': data.get(user_id, {})
+        })
+    return users
+
+
+def stats_generation(leaderboards: LeaderboardEngine, totals: StatsAggregator) -> tuple:
+    """Меняется, когда меняется ответ build_stats"""
+    return (
+        totals.generation,
+        leaderboards.generation('balance'),
+        leaderboards.generation('level'),
+        leaderboards.generation('pvp_wins')
+    )
+
+
+def build_stats(load: Loader, leaderboards: LeaderboardEngine, totals: StatsAggregator) -> dict:
+    """
+    Ответ /api/stats (без timestamp) из уже синхронизированных счётчиков и рейтингов
+    
+    Args:
+        load: Функция получения данных файла по имени
+        leaderboards: Рейтинги
+        totals: Счётчики общей статистики
+    """
+    pvp = load('pvp_stats.json')
+    
+    # Топ PvP
+    top_pvp = []
+    for user_id, _ in leaderboards.top('pvp_wins', 10):
+        user_data = pvp.get(user_id, {})
+        top_pvp.append({
+            'user_id': user_id,
+            'wins': user_data.get('wins', 0),
+            'losses': user_data.get('losses', 0),
+            'rank': user_data.get('rank', 'Новичок')
+        })
+    
+    return {
+        'overview': totals.overview(),
+        'leaderboards': {
+            'top_rich': get_top_users(leaderboards, load('economy.json'), 'balance', 10),
+            'top_levels': get_top_users(leaderboards, load('levels.json'), 'level', 10),
+            'top_pvp': top_pvp
+        }
+    }
+
+
+def capture_state(stats: dict, economy: dict) -> dict:
+    """Снимок того, что показывает дашборд - для вычисления изменений"""
+    transactions = recent_transactions(economy, limit=50)
+    return {
+        'stats': stats,
+        'transactions': transactions,
+        'last_timestamp': transactions[0].get('timestamp', '') if transactions else ''
+    }
+
+
+def diff_state(old: dict, new: dict, changed_files: Set[str]) -> List[Tuple[str, object]]:
+    """
+    События для /api/stream: чем новый снимок отличается от старого
+    
+    Returns:
+        [(тип события, данные), ...]: overview (изменившиеся поля сводки),
+        leaderboards (изменившиеся топы), transactions (новые транзакции),
+        charts (изменившиеся файлы графиков)
+    """
+    events = []
+    
+    old_overview = old['stats']['overview']
+    overview = {
+        key: value for key, value in new['stats']['overview'].items()
+        if old_overview.get(key) != value
+    }
+    if overview:
+        events.append(('overview', overview))
+    
+    old_boards = old['stats']['leaderboards']
+    boards = {
+        key: value for key, value in new['stats']['leaderboards'].items()
+        if old_boards.get(key) != value
+    }
+    if boards:
+        events.append(('leaderboards', boards))
+    
+    new_transactions = [
+        trans for trans in new['transactions']
+        if trans.get('timestamp', '') > old['last_timestamp']
+    ]
+    if new_transactions:
+        events.append(('transactions', new_transactions))
+    
+    charts = [name for name in CHART_SOURCES if name in changed_files]
+    if charts:
+        events.append(('charts', charts))
+    
+    return events
+
+
+def build_timeseries(store: TimeSeriesStore, metric: str, range_value: str = None) -> dict:
+    """
+    Ответ /api/timeseries
+    
+    Без metric - список доступных метрик.
+    
+    Raises:
+        ValueError: Некорректный range
+        KeyError: Неизвестная метрика
+    """
+    if not metric:
+        return {'metrics': store.metrics}
+    if metric not in store.metrics:
+        raise KeyError(metric)
+    
+    seconds = parse_range(range_value or '24h')
+    step, points = store.query(metric, seconds)
+    return {
+        'metric': metric,
+        'range': seconds,
+        'step': step,
+        'points': [[timestamp, value] for timestamp, value in points]
+    }
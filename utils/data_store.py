@@ -0,0 +1,61 @@
+# data_store.py
+"""Последние снимки JSON файлов данных в памяти бота"""
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+Listener = Callable[[str, dict, Optional[Set[str]]], None]
+
+
+class DataStore:
+    """
+    Снимки файлов данных (economy.json, levels.json, ...) после каждого сохранения.
+    
+    Ког, сохранив файл, передаёт его содержимое в `publish`: снимок
+    запоминается, номер версии файла растёт, подписчики (рейтинги, счётчики
+    статистики, веб-API) получают свежие данные без повторного чтения диска.
+    Если ког знает, чьи записи он изменил, он передаёт их ID - подписчики
+    пересчитывают только этих пользователей. Снимки общие - изменять их нельзя.
+    """
+    
+    def __init__(self):
+        self._data: Dict[str, dict] = {}
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Listener] = []
+    
+    def subscribe(self, listener: Listener):
+        """Вызывать listener(имя файла, данные, изменённые ID или None) при каждом publish"""
+        self._listeners.append(listener)
+    
+    def publish(self, name: str, data: dict, changed: Optional[Iterable[str]] = None):
+        """
+        Новый снимок файла после сохранения
+        
+        Args:
+            changed: ID пользователей, чьи записи изменились с прошлого снимка
+                (None - неизвестно, подписчики сравнивают весь файл)
+        """
+        changed = set(changed) if changed is not None else None
+        self._data[name] = data
+        self._versions[name] = self.version(name) + 1
+        for listener in self._listeners:
+            try:
+                listener(name, data, changed)
+            except Exception as e:
+                print(f"Ошибка обработчика данных {name}: {e}")
+    
+    def get(self, name: str) -> dict:
+        """Снимок файла (при первом обращении читается с диска)"""
+        data = self._data.get(name)
+        if data is None:
+            try:
+                with open(name, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ошибка загрузки {name}: {e}")
+                return {}
+            self._data[name] = data
+        return data
+    
+    def version(self, name: str) -> int:
+        """Номер версии снимка (растёт при каждом publish)"""
+        return self._versions.get(name, 0)
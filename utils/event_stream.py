@@ -0,0 +1,56 @@
+# event_stream.py
+"""Рассылка событий подписчикам Server-Sent Events"""
+import json
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+
+def format_sse(event_id: int, event: str, data) -> str:
+    """Одно событие в формате text/event-stream"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventBroadcaster:
+    """
+    Общая очередь событий для всех SSE подключений.
+    
+    Событие публикуется один раз и хранится в кольцевом буфере, а каждое
+    подключение только ждёт новых номеров. Поэтому работа сервера зависит
+    от частоты изменений, а не от числа зрителей. По Last-Event-ID
+    переподключившийся клиент получает пропущенное из буфера.
+    """
+    
+    def __init__(self, history: int = 256):
+        self._events: deque = deque(maxlen=history)  # (id, тип, данные)
+        self._last_id = 0
+        self._condition = threading.Condition()
+    
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+    
+    def can_resume(self, after_id: int) -> bool:
+        """Есть ли в буфере все события после after_id"""
+        with self._condition:
+            if after_id > self._last_id:
+                return False  # Номер из прошлого запуска сервера
+            return not self._events or self._events[0][0] <= after_id + 1
+    
+    def publish(self, event: str, data):
+        """Добавить событие и разбудить ожидающие подключения"""
+        with self._condition:
+            self._last_id += 1
+            self._events.append((self._last_id, event, data))
+            self._condition.notify_all()
+    
+    def wait(self, after_id: int, timeout: Optional[float] = None) -> List[Tuple[int, str, object]]:
+        """
+        События с номером больше after_id (ждёт до timeout, если их ещё нет)
+        
+        Returns:
+            Список (id, тип, данные); пустой, если за timeout ничего не пришло
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._last_id > after_id, timeout)
+            return [item for item in self._events if item[0] > after_id]
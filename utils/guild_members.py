@@ -0,0 +1,60 @@
+# guild_members.py
+"""Множества ID участников гильдий для рейтингов по серверу"""
+from typing import Dict, Set
+import discord
+
+
+class GuildMembers:
+    """
+    Кеш множеств user_id (str) участников каждой гильдии.
+    
+    Множество строится один раз из кеша участников discord.py и дальше
+    правится точечно при входе/выходе участника. Вместе с этим сбрасывается
+    кеш рейтингов гильдии в LeaderboardEngine. Пока участники гильдии не
+    догружены, множество не запоминается и кеш рейтингов сбрасывается при
+    каждом запросе - неполный рейтинг не переживает окончания загрузки.
+    """
+    
+    def __init__(self, leaderboards):
+        self.leaderboards = leaderboards
+        self._members: Dict[int, Set[str]] = {}
+        self._versions: Dict[int, int] = {}  # Растёт при каждом изменении состава
+    
+    def get(self, guild: discord.Guild) -> Set[str]:
+        """ID участников гильдии"""
+        members = self._members.get(guild.id)
+        if members is None:
+            members = {str(member.id) for member in guild.members}
+            # Пока список участников не догружен, не запоминаем неполное множество
+            if guild.chunked:
+                self._members[guild.id] = members
+            # Рейтинги, посчитанные по прошлому (неполному) множеству, устарели
+            self._changed(guild.id)
+        return members
+    
+    def version(self, guild_id: int) -> int:
+        """Номер версии состава гильдии"""
+        return self._versions.get(guild_id, 0)
+    
+    def add(self, member: discord.Member):
+        """Участник зашёл на сервер"""
+        members = self._members.get(member.guild.id)
+        if members is not None:
+            members.add(str(member.id))
+        self._changed(member.guild.id)
+    
+    def remove(self, member: discord.Member):
+        """Участник покинул сервер"""
+        members = self._members.get(member.guild.id)
+        if members is not None:
+            members.discard(str(member.id))
+        self._changed(member.guild.id)
+    
+    def forget(self, guild_id: int):
+        """Бот покинул гильдию"""
+        self._members.pop(guild_id, None)
+        self._changed(guild_id)
+    
+    def _changed(self, guild_id: int):
+        self._versions[guild_id] = self.version(guild_id) + 1
+        self.leaderboards.invalidate_scope(guild_id)
@@ -0,0 +1,275 @@
+# leaderboard.py
+"""Инкрементально поддерживаемые рейтинги пользователей"""
+from bisect import bisect_left, insort
+from typing import Callable, Collection, Dict, Hashable, List, Optional, Set, Tuple
+
+# Оценка пользователя: кортеж чисел, больше - лучше (None - не участвует в рейтинге)
+Score = Tuple
+ScoreFunc = Callable[[str, Dict[str, dict]], Optional[Score]]
+
+
+def _balance(user_id: str, sources: Dict[str, dict]) -> Optional[Score]:
+    user = sources.get("economy.json", {}).get(user_id)
+    if user is None:
+        return None
+    return (user.get("balance", 0),)
+
+
+def _wealth(user_id: str, sources: Dict[str, dict]) -> Optional[Score]:
+    """Общий капитал: кошелёк + депозит - кредит"""
+    user = sources.get("economy.json", {}).get(user_id)
+    account = sources.get("bank.json", {}).get(user_id)
+    if user is None and account is None:
+        return None
+    wealth = (user or {}).get("balance", 0)
+    if account:
+        wealth += account.get("deposit", 0) - account.get("loan", 0)
+    return (wealth,)
+
+
+def _level(user_id: str, sources: Dict[str, dict]) -> Optional[Score]:
+    user = sources.get("levels.json", {}).get(user_id)
+    if user is None:
+        return None
+    return (user.get("level", 0), user.get("total_xp", 0))
+
+
+def _pvp_wins(user_id: str, sources: Dict[str, dict]) -> Optional[Score]:
+    user = sources.get("pvp_stats.json", {}).get(user_id)
+    if user is None:
+        return None
+    return (user.get("wins", 0), -user.get("losses", 0))
+
+
+def _pvp_winrate(user_id: str, sources: Dict[str, dict]) -> Optional[Score]:
+    """Процент побед среди тех, кто провёл хотя бы MIN_DUELS дуэлей"""
+    user = sources.get("pvp_stats.json", {}).get(user_id)
+    if user is None:
+        return None
+    wins, losses = user.get("wins", 0), user.get("losses", 0)
+    if wins + losses < LeaderboardEngine.MIN_DUELS:
+        return None
+    return (round(wins / (wins + losses) * 100, 2), wins, -losses)
+
+
+class _Ranking:
+    """Упорядоченный индекс одной метрики"""
+    
+    def __init__(self, sources: Tuple[str, ...], score: ScoreFunc):
+        self.sources = sources
+        self.score = score
+        self.scores: Dict[str, Score] = {}  # user_id: оценка
+        self.order: List[tuple] = []  # (отрицательная оценка, user_id) по возрастанию
+        self.generation = 0
+    
+    @staticmethod
+    def key(user_id: str, score: Score) -> tuple:
+        return tuple(-value for value in score), user_id
+
+
+class _ScopedOrder:
+    """Отфильтрованный префикс глобального рейтинга для одной области (гильдии)"""
+    
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.user_ids: List[str] = []  # Участники области в порядке рейтинга
+        self.positions: List[int] = []  # Их позиции в глобальном порядке
+        self.scanned = 0  # Сколько элементов глобального порядка уже просмотрено
+        self.size: Optional[int] = None
+
+
+class LeaderboardEngine:
+    """
+    Рейтинги по метрикам (баланс, капитал, уровень, PvP).
+    
+    Каждая метрика хранит оценки пользователей и отсортированный список
+    ключей. При сохранении данных свежий снимок файла приходит в `sync`
+    (у бота - через bot.datastore) вместе с ID изменённых пользователей:
+    движок пересчитывает оценки только им и переставляет в индексе только
+    изменившихся, поэтому чтение топа - это срез первых K элементов. Без
+    списка ID сравниваются оценки всех пользователей файла.
+    
+    Счётчик `generation(metric)` растёт при каждом изменении порядка -
+    по нему можно кешировать готовые embed'ы.
+    
+    Рейтинг внутри гильдии (`top_scoped`) идёт по глобальному порядку и
+    отбирает участников по множеству ID. Найденный префикс кешируется на
+    область и метрику до смены поколения или `invalidate_scope`.
+    """
+    
+    MIN_DUELS = 5  # Минимум дуэлей для рейтинга по проценту побед
+    
+    def __init__(self):
+        self._sources: Dict[str, dict] = {}  # Последние снимки файлов
+        self._rankings: Dict[str, _Ranking] = {}
+        self._scoped: Dict[Tuple[Hashable, str], _ScopedOrder] = {}  # (область, метрика)
+        
+        self.register("balance", ("economy.json",), _balance)
+        self.register("wealth", ("economy.json", "bank.json"), _wealth)
+        self.register("level", ("levels.json",), _level)
+        self.register("pvp_wins", ("pvp_stats.json",), _pvp_wins)
+        self.register("pvp_winrate", ("pvp_stats.json",), _pvp_winrate)
+    
+    def register(self, metric: str, sources: Tuple[str, ...], score: ScoreFunc):
+        """Добавить метрику: из каких файлов она считается и как"""
+        ranking = _Ranking(sources, score)
+        self._rankings[metric] = ranking
+        if any(source in self._sources for source in sources):
+            self._rebuild(ranking)
+    
+    @property
+    def metrics(self) -> List[str]:
+        return list(self._rankings)
+    
+    def sync(self, source: str, data: dict, changed: Optional[Set[str]] = None):
+        """
+        Обновить рейтинги по свежему снимку файла
+        
+        Args:
+            source: Имя файла данных (economy.json, levels.json, ...)
+            data: Содержимое файла после изменения
+            changed: ID пользователей, изменившихся с прошлого снимка - пересчитываются
+                только они (None - сравнить всех)
+        """
+        full = changed is None or source not in self._sources
+        self._sources[source] = data
+        
+        for ranking in self._rankings.values():
+            if source not in ranking.sources:
+                continue
+            
+            changes = []
+            for user_id in (set(data) | set(ranking.scores)) if full else changed:
+                score = ranking.score(user_id, self._sources)
+                if score != ranking.scores.get(user_id):
+                    changes.append((user_id, score))
+            
+            if not changes:
+                continue
+            
+            # Массовое изменение (первая загрузка, сброс) - дешевле пересортировать
+            if len(changes) > len(ranking.order) // 8 + 64:
+                for user_id, score in changes:
+                    if score is None:
+                        ranking.scores.pop(user_id, None)
+                    else:
+                        ranking.scores[user_id] = score
+                ranking.order = sorted(ranking.key(uid, s) for uid, s in ranking.scores.items())
+            else:
+                for user_id, score in changes:
+                    old = ranking.scores.pop(user_id, None)
+                    if old is not None:
+                        del ranking.order[bisect_left(ranking.order, ranking.key(user_id, old))]
+                    if score is not None:
+                        ranking.scores[user_id] = score
+                        insort(ranking.order, ranking.key(user_id, score))
+            
+            ranking.generation += 1
+    
+    def top(self, metric: str, limit: int = 10, offset: int = 0) -> List[Tuple[str, Score]]:
+        """Срез рейтинга: [(user_id, оценка), ...] начиная с места offset + 1"""
+        ranking = self._rankings[metric]
+        return [(user_id, ranking.scores[user_id]) for _, user_id in ranking.order[offset:offset + limit]]
+    
+    def rank(self, metric: str, user_id) -> Optional[int]:
+        """Место пользователя в рейтинге (с 1) или None"""
+        ranking = self._rankings[metric]
+        score = ranking.scores.get(str(user_id))
+        if score is None:
+            return None
+        return bisect_left(ranking.order, ranking.key(str(user_id), score)) + 1
+    
+    def score(self, metric: str, user_id) -> Optional[Score]:
+        """Текущая оценка пользователя"""
+        return self._rankings[metric].scores.get(str(user_id))
+    
+    def size(self, metric: str) -> int:
+        """Количество пользователей в рейтинге"""
+        return len(self._rankings[metric].order)
+    
+    def generation(self, metric: str) -> int:
+        """Номер версии рейтинга (растёт при каждом изменении)"""
+        return self._rankings[metric].generation
+    
+    def top_scoped(
+        self,
+        metric: str,
+        scope: Hashable,
+        member_ids: Collection[str],
+        limit: int = 10,
+        offset: int = 0
+    ) -> List[Tuple[str, Score]]:
+        """
+        Срез рейтинга только среди участников области
+        
+        Args:
+            metric: Метрика
+            scope: Ключ области для кеша (например, ID гильдии)
+            member_ids: Множество user_id (str) участников области
+            limit: Размер среза
+            offset: Сколько мест пропустить
+        """
+        ranking = self._rankings[metric]
+        scoped = self._get_scoped(metric, scope)
+        self._scan(ranking, scoped, member_ids, lambda: len(scoped.user_ids) >= offset + limit)
+        return [(user_id, ranking.scores[user_id]) for user_id in scoped.user_ids[offset:offset + limit]]
+    
+    def rank_scoped(self, metric: str, scope: Hashable, member_ids: Collection[str], user_id) -> Optional[int]:
+        """Место пользователя среди участников области (с 1) или None"""
+        user_id = str(user_id)
+        position = self.rank(metric, user_id)
+        if position is None or user_id not in member_ids:
+            return None
+        
+        ranking = self._rankings[metric]
+        scoped = self._get_scoped(metric, scope)
+        self._scan(ranking, scoped, member_ids, lambda: scoped.scanned >= position)
+        return bisect_left(scoped.positions, position - 1) + 1
+    
+    def size_scoped(self, metric: str, scope: Hashable, member_ids: Collection[str]) -> int:
+        """Количество участников области в рейтинге"""
+        ranking = self._rankings[metric]
+        scoped = self._get_scoped(metric, scope)
+        if scoped.size is None:
+            if scoped.scanned >= len(ranking.order):
+                scoped.size = len(scoped.user_ids)
+            else:
+                scoped.size = sum(1 for user_id in member_ids if user_id in ranking.scores)
+        return scoped.size
+    
+    def invalidate_scope(self, scope: Hashable):
+        """Сбросить кеш области (состав участников изменился)"""
+        for key in [key for key in self._scoped if key[0] == scope]:
+            del self._scoped[key]
+    
+    def _get_scoped(self, metric: str, scope: Hashable) -> _ScopedOrder:
+        generation = self._rankings[metric].generation
+        scoped = self._scoped.get((scope, metric))
+        if scoped is None or scoped.generation != generation:
+            scoped = self._scoped[(scope, metric)] = _ScopedOrder(generation)
+        return scoped
+    
+    @staticmethod
+    def _scan(ranking: _Ranking, scoped: _ScopedOrder, member_ids: Collection[str], done: Callable[[], bool]):
+        """Продолжить проход по глобальному порядку, пока не выполнится done()"""
+        order = ranking.order
+        while not done() and scoped.scanned < len(order):
+            user_id = order[scoped.scanned][1]
+            if user_id in member_ids:
+                scoped.user_ids.append(user_id)
+                scoped.positions.append(scoped.scanned)
+            scoped.scanned += 1
+    
+    def _rebuild(self, ranking: _Ranking):
+        """Пересчитать метрику целиком по имеющимся снимкам"""
+        user_ids = set()
+        for source in ranking.sources:
+            user_ids.update(self._sources.get(source, {}))
+        
+        ranking.scores = {}
+        for user_id in user_ids:
+            score = ranking.score(user_id, self._sources)
+            if score is not None:
+                ranking.scores[user_id] = score
+        ranking.order = sorted(ranking.key(uid, s) for uid, s in ranking.scores.items())
+        ranking.generation += 1
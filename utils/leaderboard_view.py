@@ -0,0 +1,192 @@
+# leaderboard_view.py
+"""Постраничный просмотр рейтингов с кнопками навигации"""
+from typing import List, Optional, Tuple
+import discord
+from utils.embed_builder import EmbedBuilder, Colors
+from utils.leaderboard import LeaderboardEngine
+
+
+def _pvp_value(wins: int, losses: int) -> str:
+    total = wins + losses
+    winrate = (wins / total * 100) if total > 0 else 0
+    return f"{wins}W / {losses}L ({winrate:.1f}%)"
+
+
+# Оформление рейтингов: заголовок, описание, цвет и формат значения по оценке
+BOARDS = {
+    "balance": {
+        "title": "Топ богатых пользователей",
+        "description": "Самые богатые участники по балансу кошелька",
+        "color": Colors.PREMIUM,
+        "value": lambda score: f"{score[0]:,} 💎"
+    },
+    "wealth": {
+        "title": "💰 Топ Богачей",
+        "description": "Общий капитал: кошелёк + депозит - кредит",
+        "color": Colors.PREMIUM,
+        "value": lambda score: f"{score[0]:,}💎"
+    },
+    "level": {
+        "title": "🏆 Топ по уровню",
+        "description": "Самые опытные участники",
+        "color": Colors.LEVEL,
+        "value": lambda score: f"Уровень {score[0]} | {score[1]:,} XP"
+    },
+    "pvp_wins": {
+        "title": "🏆 Топ PvP Игроков",
+        "description": "Рейтинг по количеству побед",
+        "color": Colors.PREMIUM,
+        "value": lambda score: _pvp_value(score[0], -score[1])
+    },
+    "pvp_winrate": {
+        "title": "🏆 Топ PvP Игроков",
+        "description": f"Рейтинг по проценту побед (от {LeaderboardEngine.MIN_DUELS} дуэлей)",
+        "color": Colors.PREMIUM,
+        "value": lambda score: _pvp_value(score[1], -score[2])
+    }
+}
+
+
+class LeaderboardView(discord.ui.View):
+    """
+    Рейтинг с кнопками «назад», «вперёд» и «к моему месту».
+    
+    Страница строится по смещению прямо из упорядоченного индекса
+    LeaderboardEngine, поэтому сотая страница стоит столько же, сколько
+    первая. Готовые страницы общие для всех зрителей (bot.render_cache).
+    
+    С `guild_only=True` в рейтинг попадают только участники гильдии.
+    """
+    
+    PAGE_SIZE = 10
+    
+    def __init__(
+        self,
+        bot,
+        metric: str,
+        viewer: discord.abc.User,
+        guild: discord.Guild = None,
+        guild_only: bool = False,
+        timeout: float = 180
+    ):
+        super().__init__(timeout=timeout)
+        self.bot = bot
+        self.metric = metric
+        self.viewer = viewer
+        self.guild = guild
+        self.guild_only = guild_only and guild is not None
+        self.page = 0
+    
+    @property
+    def page_count(self) -> int:
+        return max(1, (self._size() + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+    
+    def _members_version(self) -> int:
+        return self.bot.guild_members.version(self.guild.id) if self.guild_only else 0
+    
+    def _size(self) -> int:
+        if self.guild_only:
+            members = self.bot.guild_members.get(self.guild)
+            return self.bot.leaderboards.size_scoped(self.metric, self.guild.id, members)
+        return self.bot.leaderboards.size(self.metric)
+    
+    def _top(self, offset: int) -> List[Tuple[str, tuple]]:
+        if self.guild_only:
+            members = self.bot.guild_members.get(self.guild)
+            return self.bot.leaderboards.top_scoped(self.metric, self.guild.id, members, self.PAGE_SIZE, offset)
+        return self.bot.leaderboards.top(self.metric, self.PAGE_SIZE, offset)
+    
+    def _rank(self) -> Optional[int]:
+        if self.guild_only:
+            members = self.bot.guild_members.get(self.guild)
+            return self.bot.leaderboards.rank_scoped(self.metric, self.guild.id, members, self.viewer.id)
+        return self.bot.leaderboards.rank(self.metric, self.viewer.id)
+    
+    async def render(self) -> discord.Embed:
+        """
+        Embed текущей страницы.
+        
+        Сама таблица общая для всех зрителей и берётся из bot.render_cache,
+        пока не сменилось поколение рейтинга (или состав гильдии) и не истёк
+        TTL. Для зрителя поверх копии дописывается только подвал с его местом.
+        """
+        version = (self.bot.leaderboards.generation(self.metric), self._members_version())
+        self.page = min(self.page, self.page_count - 1)
+        key = (self.guild.id if self.guild_only else None, self.metric, self.page)
+        
+        em = self.bot.render_cache.get(key, version)
+        if em is None:
+            em = await self._render_page()
+            self.bot.render_cache.put(key, version, em)
+        
+        rank = self._rank()
+        footer = f"Страница {self.page + 1}/{self.page_count}"
+        if rank:
+            footer += f" • Ваше место: #{rank}"
+        
+        personal = em.copy()
+        personal.set_footer(text=footer, icon_url=self.viewer.display_avatar.url)
+        self._update_buttons(rank)
+        return personal
+    
+    async def _render_page(self) -> discord.Embed:
+        """Отрисовать таблицу страницы (без данных конкретного зрителя)"""
+        board = BOARDS[self.metric]
+        offset = self.page * self.PAGE_SIZE
+        rows = self._top(offset)
+        # Глобальная таблица кешируется для всех серверов - без ников гильдии зрителя
+        guild = self.guild if self.guild_only else None
+        names = await self.bot.names.resolve_many([user_id for user_id, _ in rows], guild)
+        
+        medals = ["🥇", "🥈", "🥉"]
+        lines = []
+        for place, (user_id, score) in enumerate(rows, offset + 1):
+            medal = medals[place - 1] if place <= 3 else f"`{place}.`"
+            name = names.get(user_id, "Неизвестный пользователь")
+            lines.append(f"{medal} **{name}** - {board['value'](score)}")
+        
+        return EmbedBuilder.create_base(
+            title=board["title"],
+            description=board["description"] + "\n\n" + ("\n".join(lines) or "Нет данных"),
+            color=board["color"]
+        )
+    
+    def _update_buttons(self, rank: Optional[int]):
+        self.prev_button.disabled = self.page <= 0
+        self.next_button.disabled = self.page >= self.page_count - 1
+        self.me_button.disabled = rank is None
+    
+    async def _show(self, interaction: discord.Interaction):
+        em = await self.render()
+        await interaction.response.edit_message(embed=em, view=self)
+    
+    async def _check_viewer(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.viewer.id:
+            await interaction.response.send_message("❌ Откройте свой рейтинг командой!", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not await self._check_viewer(interaction):
+            return
+        self.page = max(0, self.page - 1)
+        await self._show(interaction)
+    
+    @discord.ui.button(label="Моё место", emoji="📍", style=discord.ButtonStyle.primary)
+    async def me_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not await self._check_viewer(interaction):
+            return
+        rank = self._rank()
+        if rank is None:
+            await interaction.response.send_message("❌ Вас пока нет в этом рейтинге!", ephemeral=True)
+            return
+        self.page = (rank - 1) // self.PAGE_SIZE
+        await self._show(interaction)
+    
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not await self._check_viewer(interaction):
+            return
+        self.page = min(self.page_count - 1, self.page + 1)
+        await self._show(interaction)
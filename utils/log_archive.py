@@ -0,0 +1,334 @@
+# log_archive.py
+"""Тёплое и холодное хранилище логов: сегменты на диске и их сжатие"""
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.log_index import _trigrams, entry_matches, entry_text
+
+SEGMENT_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+class Segment(NamedTuple):
+    """Файл сегмента: seg_<начало>_<конец>_<кол-во>.jsonl[.gz]"""
+    path: str
+    start: str  # ISO время первой записи
+    end: str  # ISO время последней записи
+    count: int
+    compressed: bool
+    
+    @property
+    def index_path(self) -> str:
+        """Сводка сегмента: seg_<начало>_<конец>_<кол-во>.idx.json (общая для тёплого и холодного)"""
+        return self.path[:self.path.rindex(".jsonl")] + ".idx.json"
+
+
+def _stamp(timestamp: str) -> str:
+    return datetime.fromisoformat(timestamp).strftime(SEGMENT_TIME_FORMAT)
+
+
+def _unstamp(stamp: str) -> str:
+    return datetime.strptime(stamp, SEGMENT_TIME_FORMAT).isoformat()
+
+
+def _summarize(entries: List[dict]) -> dict:
+    """Сводка сегмента для поиска: записи по типам, пользователи и триграммы текста"""
+    types: Dict[str, int] = {}
+    users = set()
+    grams = set()
+    for entry in entries:
+        event_type = entry.get("type", "unknown")
+        types[event_type] = types.get(event_type, 0) + 1
+        data = entry.get("data", {})
+        if isinstance(data, dict) and data.get("user_id"):
+            users.add(str(data["user_id"]))
+        grams |= _trigrams(entry_text(entry))
+    return {"types": types, "users": sorted(users), "trigrams": sorted(grams)}
+
+
+class LogArchive:
+    """
+    Архив логов, вытесненных из горячего кольца в памяти.
+    
+    Тёплый уровень - сегменты JSON Lines в каталоге гильдии, холодный -
+    те же сегменты, сжатые gzip. Время и количество записей сегмента
+    закодированы в имени файла, поэтому выборка по времени и подсчёт
+    записей не открывают лишние файлы. Рядом с сегментом лежит сводка
+    (типы, пользователи, триграммы) - поиск пропускает сегменты, в которых
+    совпадений быть не может, не распаковывая их.
+    """
+    
+    def __init__(self, root: str = "logs_archive"):
+        self.root = root
+        self._summaries: Dict[str, dict] = {}  # index_path -> сводка с множествами
+    
+    def guilds(self) -> List[str]:
+        """ID гильдий, у которых есть архив"""
+        if not os.path.isdir(self.root):
+            return []
+        return [name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))]
+    
+    def segments(self, guild_id) -> List[Segment]:
+        """Сегменты гильдии от старых к новым"""
+        directory = os.path.join(self.root, str(guild_id))
+        if not os.path.isdir(directory):
+            return []
+        
+        result = []
+        for name in os.listdir(directory):
+            compressed = name.endswith(".jsonl.gz")
+            if not name.startswith("seg_") or not (compressed or name.endswith(".jsonl")):
+                continue
+            try:
+                _, start, end, count = name.split(".", 1)[0].split("_")
+                result.append(Segment(
+                    path=os.path.join(directory, name),
+                    start=_unstamp(start),
+                    end=_unstamp(end),
+                    count=int(count),
+                    compressed=compressed
+                ))
+            except ValueError:
+                continue
+        
+        result.sort(key=lambda s: (s.start, s.end))
+        return result
+    
+    def count(self, guild_id) -> int:
+        """Сколько записей гильдии лежит в архиве"""
+        return sum(segment.count for segment in self.segments(guild_id))
+    
+    def write_segment(self, guild_id, entries: List[dict]):
+        """Записать вытесненные записи новым тёплым сегментом"""
+        if not entries:
+            return
+        
+        directory = os.path.join(self.root, str(guild_id))
+        os.makedirs(directory, exist_ok=True)
+        name = f"seg_{_stamp(entries[0]['timestamp'])}_{_stamp(entries[-1]['timestamp'])}_{len(entries)}.jsonl"
+        path = os.path.join(directory, name)
+        
+        # Сводка раньше сегмента: сегмента без сводки после сбоя не останется
+        self._write_summary(path[:-len(".jsonl")] + ".idx.json", entries)
+        
+        # Пишем во временный файл и переименовываем, чтобы не оставить обрывок
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write("\n")
+        os.replace(tmp_path, path)
+    
+    def iter_entries(
+        self,
+        guild_id,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Архивные записи в хронологическом порядке с фильтрами по типу и времени"""
+        for segment in self.segments(guild_id):
+            # Сегмент целиком вне диапазона - файл не открываем
+            if since and segment.end[:19] < since[:19]:
+                continue
+            if until and segment.start >= until:
+                break
+            
+            for entry in self._read(segment):
+                timestamp = entry.get("timestamp", "")
+                if since and timestamp < since:
+                    continue
+                if until and timestamp >= until:
+                    break
+                if event_type and entry.get("type") != event_type:
+                    continue
+                yield entry
+    
+    def latest(
+        self,
+        guild_id,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10,
+        query: str = "",
+        user_id: Optional[str] = None
+    ) -> Tuple[int, List[dict]]:
+        """
+        Архивные записи от новых к старым: сколько всего подходит и страница
+        
+        Сегменты читаются с конца. Сегменты, в которых по сводке нет нужного
+        типа, пользователя или триграмм запроса, не открываются. Когда страница
+        уже набрана, сегменты, целиком попадающие в диапазон, без поиска
+        считаются по имени файла и сводке.
+        
+        Args:
+            query: Поиск по тексту (как LogIndex.search)
+            user_id: Только записи этого пользователя
+        
+        Returns:
+            (всего подходящих записей, записи страницы)
+        """
+        query = query.lower().strip()
+        searching = bool(query or user_id)
+        total = 0
+        page = []
+        for segment in reversed(self.segments(guild_id)):
+            # В имени файла время с точностью до секунды
+            if until and segment.start >= until:
+                continue
+            if since and segment.end[:19] < since[:19]:
+                break
+            
+            summary = self._summary(segment)
+            if summary is not None and not self._may_match(summary, event_type, query, user_id):
+                continue
+            
+            inside = (not since or segment.start >= since) and (not until or segment.end[:19] < until[:19])
+            if inside and not searching and total >= offset + limit:
+                if not event_type:
+                    total += segment.count
+                    continue
+                if summary is not None:
+                    total += summary["types"].get(event_type, 0)
+                    continue
+            
+            for entry in reversed(list(self._read(segment))):
+                timestamp = entry.get("timestamp", "")
+                if until and timestamp >= until:
+                    continue
+                if since and timestamp < since:
+                    break
+                if event_type and entry.get("type") != event_type:
+                    continue
+                if searching and not entry_matches(entry, query, user_id):
+                    continue
+                if offset <= total < offset + limit:
+                    page.append(entry)
+                total += 1
+        
+        return total, page
+    
+    def compact(
+        self,
+        guild_id,
+        max_events: int,
+        max_age_days: int,
+        compress_after: str,
+        hot_count: int = 0
+    ) -> dict:
+        """
+        Применить политику хранения к архиву гильдии
+        
+        Args:
+            max_events: Лимит записей на гильдию (вместе с горячим кольцом)
+            max_age_days: Удалять сегменты, целиком старше этого срока
+            compress_after: Сегменты, закончившиеся раньше этого времени (ISO), сжимаются
+            hot_count: Сколько записей сейчас в горячем кольце
+        
+        Returns:
+            Статистика: удалено сегментов/записей, сжато сегментов
+        """
+        stats = {"removed_segments": 0, "removed_events": 0, "compressed": 0}
+        segments = self.segments(guild_id)
+        cutoff = datetime.now().timestamp() - max_age_days * 86400
+        total = hot_count + sum(segment.count for segment in segments)
+        
+        kept = []
+        for segment in segments:
+            expired = datetime.fromisoformat(segment.end).timestamp() < cutoff
+            # Удаляем только целыми сегментами, от самых старых
+            if expired or total > max_events:
+                os.remove(segment.path)
+                self._remove_summary(segment)
+                total -= segment.count
+                stats["removed_segments"] += 1
+                stats["removed_events"] += segment.count
+            else:
+                kept.append(segment)
+        
+        for segment in kept:
+            # Сегменты, записанные до появления сводок, получают её один раз
+            if not os.path.exists(segment.index_path):
+                self._write_summary(segment.index_path, list(self._read(segment)))
+            if not segment.compressed and segment.end < compress_after:
+                self._compress(segment)
+                stats["compressed"] += 1
+        
+        return stats
+    
+    def _summary(self, segment: Segment) -> Optional[dict]:
+        """Сводка сегмента (None - сводки нет или она повреждена)"""
+        path = segment.index_path
+        summary = self._summaries.get(path)
+        if summary is None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                summary = {
+                    "types": raw["types"],
+                    "users": set(raw["users"]),
+                    "trigrams": set(raw["trigrams"])
+                }
+            except (OSError, ValueError, KeyError, TypeError):
+                return None
+            self._summaries[path] = summary
+        return summary
+    
+    @staticmethod
+    def _may_match(summary: dict, event_type: Optional[str], query: str, user_id: Optional[str]) -> bool:
+        """Могут ли в сегменте быть подходящие записи (триграммы дают надмножество)"""
+        if event_type and not summary["types"].get(event_type):
+            return False
+        if user_id and str(user_id) not in summary["users"]:
+            return False
+        if len(query) >= 3 and not _trigrams(query) <= summary["trigrams"]:
+            return False
+        return True
+    
+    def _write_summary(self, path: str, entries: List[dict]):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_summarize(entries), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._summaries.pop(path, None)
+    
+    def _remove_summary(self, segment: Segment):
+        self._summaries.pop(segment.index_path, None)
+        try:
+            os.remove(segment.index_path)
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _read(segment: Segment) -> Iterator[dict]:
+        """Прочитать сегмент построчно (сжатый или нет)"""
+        path = segment.path
+        if not segment.compressed and not os.path.exists(path):
+            # Сегмент успели сжать, пока мы к нему шли
+            path += ".gz"
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return  # Сегмент удалён политикой хранения
+    
+    @staticmethod
+    def _compress(segment: Segment):
+        """Перевести тёплый сегмент в холодный (gzip)"""
+        target = segment.path + ".gz"
+        tmp_path = target + ".tmp"
+        with open(segment.path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.replace(tmp_path, target)
+        os.remove(segment.path)
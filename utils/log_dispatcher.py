@@ -0,0 +1,195 @@
+# log_dispatcher.py
+"""Пакетная доставка embed'ов в каналы логов с учётом rate limit"""
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional
+import discord
+from utils.embed_builder import Colors
+
+
+class LogDispatcher:
+    """
+    Очередь доставки логов по каналам.
+    
+    Команды только ставят embed в очередь канала и сразу продолжают работу.
+    Фоновая задача канала раз в `flush_interval` секунд забирает накопленное:
+    до 10 embed'ов уходят одним сообщением, а если очередь разрослась —
+    события сворачиваются в один сводный embed (дайджест).
+    """
+    
+    MAX_EMBEDS_PER_MESSAGE = 10  # Лимит Discord на одно сообщение
+    MESSAGE_CHAR_LIMIT = 6000  # Лимит Discord на суммарный текст embed'ов сообщения
+    DIGEST_THRESHOLD = 20  # С такого размера очереди шлём дайджест
+    DIGEST_MAX_EVENTS = 50  # Максимум событий в одном дайджесте
+    DESCRIPTION_LIMIT = 4096  # Лимит Discord на описание embed
+    MAX_RETRIES = 3  # Попыток на один пакет при 429
+    
+    def __init__(self, flush_interval: float = 2.0, max_queue: int = 500):
+        """
+        Args:
+            flush_interval: Окно накопления событий перед отправкой (секунды)
+            max_queue: Максимальный размер очереди канала (старые события вытесняются)
+        """
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queues: Dict[int, deque] = {}
+        self._channels: Dict[int, discord.TextChannel] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._closed = False
+    
+    def enqueue(self, channel: discord.TextChannel, embed: discord.Embed):
+        """Поставить embed в очередь канала (не ждёт отправки)"""
+        if self._closed:
+            return
+        
+        queue = self._queues.get(channel.id)
+        if queue is None:
+            queue = self._queues[channel.id] = deque(maxlen=self.max_queue)
+        queue.append(embed)
+        self._channels[channel.id] = channel
+        
+        worker = self._workers.get(channel.id)
+        if worker is None or worker.done():
+            self._workers[channel.id] = asyncio.create_task(self._run(channel.id))
+    
+    def pending(self, channel_id: int) -> int:
+        """Количество событий, ожидающих отправки в канал"""
+        queue = self._queues.get(channel_id)
+        return len(queue) if queue else 0
+    
+    async def close(self):
+        """Остановить все фоновые задачи доставки"""
+        self._closed = True
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._channels.clear()
+    
+    async def _run(self, channel_id: int):
+        """Фоновая доставка для одного канала, живёт пока есть события"""
+        queue = self._queues[channel_id]
+        try:
+            while queue:
+                # Даём событиям накопиться, чтобы отправить их пачкой
+                await asyncio.sleep(self.flush_interval)
+                
+                while queue:
+                    embeds = self._take_batch(queue)
+                    if not await self._deliver(channel_id, embeds):
+                        # Канал недоступен - дальше слать бессмысленно
+                        queue.clear()
+                        break
+        finally:
+            if self._workers.get(channel_id) is asyncio.current_task():
+                del self._workers[channel_id]
+            if not queue:
+                self._queues.pop(channel_id, None)
+                self._channels.pop(channel_id, None)
+    
+    def _take_batch(self, queue: deque) -> List[discord.Embed]:
+        """Забрать из очереди очередную порцию для одного сообщения"""
+        if len(queue) >= self.DIGEST_THRESHOLD:
+            count = min(len(queue), self.DIGEST_MAX_EVENTS)
+            events = [queue.popleft() for _ in range(count)]
+            return [self._build_digest(events)]
+        
+        # Первый embed берём всегда, остальные - пока влезают в лимит символов
+        batch = [queue.popleft()]
+        length = len(batch[0])
+        while queue and len(batch) < self.MAX_EMBEDS_PER_MESSAGE:
+            if length + len(queue[0]) > self.MESSAGE_CHAR_LIMIT:
+                break
+            length += len(queue[0])
+            batch.append(queue.popleft())
+        return batch
+    
+    def _build_digest(self, events: List[discord.Embed]) -> discord.Embed:
+        """Свернуть много событий в один сводный embed"""
+        lines = []
+        length = 0
+        shown = 0
+        
+        for em in events:
+            timestamp = em.timestamp.strftime("%H:%M:%S") if em.timestamp else "--:--:--"
+            summary = (em.description or "").split("\n", 1)[0]
+            line = f"`{timestamp}` **{em.title}** — {summary}" if summary else f"`{timestamp}` **{em.title}**"
+            line = line[:300]
+            
+            # Оставляем место под строку "и ещё N"
+            if length + len(line) + 1 > self.DESCRIPTION_LIMIT - 64:
+                break
+            lines.append(line)
+            length += len(line) + 1
+            shown += 1
+        
+        if shown < len(events):
+            lines.append(f"*...и ещё {len(events) - shown} событий*")
+        
+        digest = discord.Embed(
+            title=f"📋 Сводка событий ({len(events)})",
+            description="\n".join(lines),
+            color=Colors.PRIMARY,
+            timestamp=events[-1].timestamp
+        )
+        
+        # Подпись сервера берём из исходных событий
+        footer = events[-1].footer
+        if footer and footer.text:
+            digest.set_footer(text=footer.text, icon_url=footer.icon_url)
+        
+        return digest
+    
+    async def _deliver(self, channel_id: int, embeds: List[discord.Embed]) -> bool:
+        """
+        Отправить пакет embed'ов одним сообщением.
+        
+        Returns:
+            False если канал больше недоступен, иначе True
+        """
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            return False
+        
+        for _ in range(self.MAX_RETRIES):
+            try:
+                await channel.send(embeds=embeds)
+                return True
+            except discord.RateLimited as e:
+                await asyncio.sleep(e.retry_after)
+            except discord.Forbidden:
+                return False
+            except discord.NotFound:
+                return False
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    await asyncio.sleep(self._retry_after(e))
+                    continue
+                if len(embeds) > 1:
+                    # Пакет отклонён целиком - шлём по одному, теряется только плохой embed
+                    for em in embeds:
+                        if not await self._deliver(channel_id, [em]):
+                            return False
+                    return True
+                print(f"Ошибка отправки лога в канал {channel_id}: {e}")
+                return True
+            except Exception as e:
+                print(f"Ошибка отправки лога в канал {channel_id}: {e}")
+                return True
+        
+        return True
+    
+    @staticmethod
+    def _retry_after(error: discord.HTTPException) -> float:
+        """Достать retry_after из ответа 429"""
+        retry_after: Optional[float] = None
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers:
+            try:
+                retry_after = float(headers.get("Retry-After"))
+            except (TypeError, ValueError):
+                retry_after = None
+        return retry_after if retry_after is not None else 1.0
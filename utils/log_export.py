@@ -0,0 +1,129 @@
+# log_export.py
+"""Потоковый экспорт логов в файлы (TXT/JSON/CSV, опционально gzip)"""
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import datetime
+from typing import Iterable, List, Optional
+import discord
+
+
+class LogExporter:
+    """
+    Пишет записи логов построчно во временные файлы.
+    
+    Каждая часть - SpooledTemporaryFile: небольшие выгрузки живут в памяти,
+    большие сбрасываются на диск, так что потребление памяти не зависит
+    от объёма логов. Когда часть подходит к лимиту загрузки Discord,
+    открывается следующая.
+    """
+    
+    SPOOL_SIZE = 1024 * 1024  # До 1 МБ держим в памяти, дальше - на диск
+    SIZE_MARGIN = 256 * 1024  # Запас на буферы TextIOWrapper/gzip
+    
+    def __init__(
+        self,
+        fmt: str,
+        base_name: str,
+        compress: bool = False,
+        part_limit: int = 8 * 1024 * 1024,
+        title: Optional[str] = None
+    ):
+        """
+        Args:
+            fmt: Формат (txt/json/csv)
+            base_name: Имя файла без расширения
+            compress: Сжимать ли части gzip
+            part_limit: Максимальный размер одной части (байт)
+            title: Заголовок для TXT
+        """
+        if fmt not in ("txt", "json", "csv"):
+            raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+        
+        self.fmt = fmt
+        self.base_name = base_name
+        self.compress = compress
+        self.part_limit = max(part_limit - self.SIZE_MARGIN, self.SIZE_MARGIN)
+        self.title = title
+        self.count = 0
+        
+        self._parts: List[tempfile.SpooledTemporaryFile] = []
+        self._raw = None
+        self._stream = None
+        self._text = None
+        self._writer = None
+        self._rows_in_part = 0
+    
+    def write_all(self, entries: Iterable[dict]) -> int:
+        """Записать все записи и закрыть последнюю часть. Возвращает количество записей"""
+        self._open_part()
+        for entry in entries:
+            if self._rows_in_part and self._raw.tell() >= self.part_limit:
+                self._close_part()
+                self._open_part()
+            self._write_entry(entry)
+            self._rows_in_part += 1
+            self.count += 1
+        self._close_part()
+        return self.count
+    
+    def files(self) -> List[discord.File]:
+        """Готовые части в виде вложений Discord"""
+        extension = f".{self.fmt}.gz" if self.compress else f".{self.fmt}"
+        result = []
+        for number, part in enumerate(self._parts, 1):
+            suffix = f"_part{number}" if len(self._parts) > 1 else ""
+            part.seek(0)
+            result.append(discord.File(part, filename=f"{self.base_name}{suffix}{extension}"))
+        return result
+    
+    def close(self):
+        """Удалить временные файлы"""
+        for part in self._parts:
+            part.close()
+        self._parts.clear()
+    
+    def _open_part(self):
+        self._raw = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE, mode="w+b")
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+        self._text = io.TextIOWrapper(self._stream, encoding="utf-8", newline="")
+        self._rows_in_part = 0
+        
+        if self.fmt == "txt":
+            if self.title and not self._parts:
+                self._text.write(f"{self.title}\n\n")
+        elif self.fmt == "json":
+            self._text.write("[\n")
+        elif self.fmt == "csv":
+            self._writer = csv.writer(self._text)
+            self._writer.writerow(["Timestamp", "Type", "User", "Details"])
+    
+    def _close_part(self):
+        if self.fmt == "json":
+            self._text.write("\n]\n")
+        self._text.flush()
+        self._text.detach()
+        if self.compress:
+            self._stream.close()  # Дописывает хвост gzip, сам файл остаётся открытым
+        self._parts.append(self._raw)
+        self._raw = self._stream = self._text = self._writer = None
+    
+    def _write_entry(self, entry: dict):
+        timestamp = datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+        data = entry.get("data", {})
+        
+        if self.fmt == "txt":
+            self._text.write(f"[{timestamp}] {entry.get('type')}: {data}\n")
+        elif self.fmt == "json":
+            if self._rows_in_part:
+                self._text.write(",\n")
+            self._text.write(json.dumps(entry, ensure_ascii=False, indent=2))
+        elif self.fmt == "csv":
+            self._writer.writerow([
+                timestamp,
+                entry.get("type", ""),
+                data.get("user_name", "") if isinstance(data, dict) else "",
+                json.dumps(data, ensure_ascii=False)
+            ])
@@ -0,0 +1,303 @@
+# log_index.py
+"""Инкрементальный поисковый индекс по логам гильдии"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _flatten_values(value) -> Iterable[str]:
+    """Все значения словаря/списка в виде строк (без ключей)"""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten_values(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten_values(item)
+    elif value is not None:
+        yield str(value)
+
+
+def entry_text(entry: dict) -> str:
+    """Текст записи для поиска: тип и все значения данных в нижнем регистре"""
+    return " ".join([str(entry.get("type", ""))] + list(_flatten_values(entry.get("data", {})))).lower()
+
+
+def entry_matches(entry: dict, query: str = "", user_id: Optional[str] = None) -> bool:
+    """Подходит ли запись под поиск (те же правила, что у LogIndex.search, без индекса)"""
+    if user_id:
+        data = entry.get("data", {})
+        if not isinstance(data, dict) or str(data.get("user_id")) != str(user_id):
+            return False
+    query = query.lower().strip()
+    return not query or query in entry_text(entry)
+
+
+def _trigrams(text: str) -> set:
+    """Множество триграмм строки"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LogIndex:
+    """
+    Индекс логов одной гильдии.
+    
+    Каждой записи присваивается порядковый номер (seq), записи хранятся
+    в хронологическом порядке. Индекс держит постинг-листы (возрастающие
+    списки seq) по триграммам текста, по типу события и по user_id, поэтому
+    поиск трогает только записи-кандидаты, а не весь лог.
+    
+    Список `entries` - тот же объект, что сохраняется в logs_data.json.
+    """
+    
+    def __init__(self, entries: List[dict]):
+        self.entries = entries
+        self.base = 0  # seq первой живой записи
+        self._texts: List[str] = []
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        self._by_user: Dict[str, List[int]] = defaultdict(list)
+        self._hour_keys: List[str] = []  # "ГГГГ-ММ-ДДTЧЧ" по возрастанию
+        self._hour_starts: List[int] = []  # Первый seq каждого часа
+        self._dead = 0  # Сколько удалённых seq ещё лежит в постингах
+        
+        for seq, entry in enumerate(entries):
+            self._index(seq, entry)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    @property
+    def next_seq(self) -> int:
+        return self.base + len(self.entries)
+    
+    def append(self, entry: dict):
+        """Добавить запись в конец лога и в индекс"""
+        seq = self.next_seq
+        self.entries.append(entry)
+        self._index(seq, entry)
+    
+    def trim(self, max_entries: int) -> List[dict]:
+        """Удалить самые старые записи, оставив не больше max_entries. Возвращает удалённые"""
+        excess = len(self.entries) - max_entries
+        if excess <= 0:
+            return []
+        
+        removed = self.entries[:excess]
+        del self.entries[:excess]
+        del self._texts[:excess]
+        self.base += excess
+        
+        # Часовые корзины, целиком ушедшие в прошлое
+        drop = bisect_right(self._hour_starts, self.base) - 1
+        if drop > 0:
+            del self._hour_keys[:drop]
+            del self._hour_starts[:drop]
+        self._dead += excess
+        
+        # Постинги чистим лениво, когда мусора становится больше живых данных
+        if self._dead > len(self.entries):
+            self._compact()
+        
+        return removed
+    
+    def drop_before(self, timestamp: str) -> List[dict]:
+        """Удалить записи старше timestamp (ISO). Возвращает удалённые"""
+        return self.trim(self.next_seq - self._seq_at(timestamp))
+    
+    def get(self, seq: int) -> Optional[dict]:
+        """Запись по seq (None если она уже удалена)"""
+        pos = seq - self.base
+        if 0 <= pos < len(self.entries):
+            return self.entries[pos]
+        return None
+    
+    def iter_entries(
+        self,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Записи в хронологическом порядке с фильтрами по типу и времени"""
+        lo, hi = self._seq_range(since, until)
+        if event_type:
+            posting = self._by_type.get(event_type, [])
+            for i in range(bisect_left(posting, lo), bisect_left(posting, hi)):
+                yield self.entries[posting[i] - self.base]
+        else:
+            for seq in range(lo, hi):
+                yield self.entries[seq - self.base]
+    
+    def latest(
+        self,
+        event_type: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        before: Optional[int] = None,
+        limit: int = 10
+    ) -> Tuple[int, List[dict], Optional[int]]:
+        """
+        Последние записи (от новых к старым) с курсорной пагинацией
+        
+        Args:
+            event_type: Фильтр по типу события
+            since: Нижняя граница времени (ISO, включительно)
+            until: Верхняя граница времени (ISO, не включительно)
+            before: Курсор - seq, с которого начинать (не включительно)
+            limit: Размер страницы
+        
+        Returns:
+            (всего подходящих записей до курсора, записи страницы, курсор следующей страницы или None)
+        """
+        lo, hi = self._seq_range(since, until)
+        if before is not None:
+            hi = min(hi, before)
+        if lo >= hi:
+            return 0, [], None
+        
+        if event_type:
+            posting = self._by_type.get(event_type, [])
+            start, end = bisect_left(posting, lo), bisect_left(posting, hi)
+            seqs = posting[max(start, end - limit):end]
+            total = end - start
+        else:
+            seqs = range(max(lo, hi - limit), hi)
+            total = hi - lo
+        
+        page = [self.entries[seq - self.base] for seq in reversed(seqs)]
+        cursor = seqs[0] if total > len(seqs) else None
+        return total, page, cursor
+    
+    def search(
+        self,
+        query: str = "",
+        event_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10
+    ) -> Tuple[int, List[dict]]:
+        """
+        Поиск по логам, результаты от новых к старым
+        
+        Args:
+            query: Подстрока для поиска (без учёта регистра)
+            event_type: Фильтр по типу события
+            user_id: Фильтр по пользователю
+            since: Нижняя граница времени (ISO, включительно)
+            until: Верхняя граница времени (ISO, не включительно)
+            offset: Сколько результатов пропустить (пагинация)
+            limit: Размер страницы
+        
+        Returns:
+            (всего найдено, записи страницы)
+        """
+        query = query.lower().strip()
+        lo, hi = self._seq_range(since, until)
+        if lo >= hi:
+            return 0, []
+        
+        postings = []
+        if query and len(query) >= 3:
+            for gram in _trigrams(query):
+                posting = self._trigrams.get(gram)
+                if not posting:
+                    return 0, []
+                postings.append(posting)
+        if event_type:
+            posting = self._by_type.get(event_type)
+            if not posting:
+                return 0, []
+            postings.append(posting)
+        if user_id:
+            posting = self._by_user.get(str(user_id))
+            if not posting:
+                return 0, []
+            postings.append(posting)
+        
+        if postings:
+            # Перебираем самый короткий постинг, остальные проверяем бинпоиском
+            postings.sort(key=len)
+            driver, others = postings[0], postings[1:]
+            start, end = bisect_left(driver, lo), bisect_left(driver, hi)
+            candidates = (driver[i] for i in range(end - 1, start - 1, -1))
+        else:
+            others = []
+            candidates = iter(range(hi - 1, lo - 1, -1))
+        
+        total = 0
+        page = []
+        for seq in candidates:
+            if others and not all(self._contains(posting, seq) for posting in others):
+                continue
+            # Триграммы дают надмножество - подтверждаем подстрокой
+            if query and query not in self._texts[seq - self.base]:
+                continue
+            if offset <= total < offset + limit:
+                page.append(self.entries[seq - self.base])
+            total += 1
+        
+        return total, page
+    
+    def _index(self, seq: int, entry: dict):
+        """Добавить запись в постинг-листы"""
+        data = entry.get("data", {})
+        text = entry_text(entry)
+        self._texts.append(text)
+        
+        for gram in _trigrams(text):
+            self._trigrams[gram].append(seq)
+        
+        self._by_type[entry.get("type", "unknown")].append(seq)
+        
+        # Записи приходят по времени, поэтому новый час всегда в конце
+        hour = entry["timestamp"][:13]
+        if not self._hour_keys or hour > self._hour_keys[-1]:
+            self._hour_keys.append(hour)
+            self._hour_starts.append(seq)
+        
+        user_id = data.get("user_id") if isinstance(data, dict) else None
+        if user_id:
+            self._by_user[str(user_id)].append(seq)
+    
+    def _seq_range(self, since: Optional[str], until: Optional[str]) -> Tuple[int, int]:
+        """Диапазон seq [lo, hi) по временным границам"""
+        lo = self._seq_at(since) if since else self.base
+        hi = self._seq_at(until) if until else self.next_seq
+        return lo, hi
+    
+    def _seq_at(self, timestamp: str) -> int:
+        """Первый seq с временем >= timestamp (ищем только внутри одной часовой корзины)"""
+        i = bisect_right(self._hour_keys, timestamp[:13]) - 1
+        if i < 0:
+            return self.base
+        
+        start = max(self._hour_starts[i], self.base)
+        end = self._hour_starts[i + 1] if i + 1 < len(self._hour_starts) else self.next_seq
+        if self._hour_keys[i] < timestamp[:13]:
+            # Записей в этом часе нет - граница сразу за предыдущей корзиной
+            return end
+        
+        pos = bisect_left(
+            self.entries, timestamp,
+            lo=start - self.base, hi=end - self.base,
+            key=lambda e: e["timestamp"]
+        )
+        return self.base + pos
+    
+    @staticmethod
+    def _contains(posting: List[int], seq: int) -> bool:
+        i = bisect_left(posting, seq)
+        return i < len(posting) and posting[i] == seq
+    
+    def _compact(self):
+        """Выбросить из постингов seq удалённых записей"""
+        for index in (self._trigrams, self._by_type, self._by_user):
+            for key in list(index):
+                posting = index[key]
+                cut = bisect_right(posting, self.base - 1)
+                if cut == len(posting):
+                    del index[key]
+                elif cut:
+                    del posting[:cut]
+        self._dead = 0
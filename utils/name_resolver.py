@@ -0,0 +1,138 @@
+# name_resolver.py
+"""Кешированное получение отображаемых имён пользователей"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import discord
+
+
+class NameResolver:
+    """
+    Имена пользователей для рейтингов и списков.
+    
+    Порядок поиска: участник гильдии из кеша, пользователь из кеша бота,
+    собственный LRU-кеш с TTL. Только промахи идут в API через
+    `fetch_user` - параллельно, но не больше `max_concurrency` запросов
+    одновременно. Несуществующие пользователи тоже кешируются, чтобы
+    не запрашивать их снова при каждом показе рейтинга.
+    """
+    
+    def __init__(self, bot, max_size: int = 5000, ttl: float = 3600.0, max_concurrency: int = 5):
+        """
+        Args:
+            bot: Экземпляр бота
+            max_size: Размер LRU-кеша имён
+            ttl: Время жизни записи кеша (секунды)
+            max_concurrency: Максимум одновременных запросов fetch_user
+        """
+        self.bot = bot
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()  # user_id: (имя или None, истекает)
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def resolve(self, user_id, guild: Optional[discord.Guild] = None) -> Optional[str]:
+        """Имя одного пользователя (None если пользователь не найден)"""
+        names = await self.resolve_many([user_id], guild)
+        return names.get(str(user_id))
+    
+    async def resolve_many(self, user_ids: Iterable, guild: Optional[discord.Guild] = None) -> Dict[str, str]:
+        """
+        Имена для набора пользователей
+        
+        Args:
+            user_ids: ID пользователей (str или int)
+            guild: Гильдия, в кеше участников которой искать в первую очередь
+        
+        Returns:
+            {user_id (str): имя} - только для найденных пользователей
+        """
+        names: Dict[str, str] = {}
+        missing = []
+        
+        for user_id in dict.fromkeys(int(uid) for uid in user_ids):
+            name = self._lookup_local(user_id, guild)
+            if name is not None:
+                names[str(user_id)] = name
+                continue
+            
+            cached = self._cache_get(user_id)
+            if cached is not None:
+                name, = cached
+                if name is not None:
+                    names[str(user_id)] = name
+                continue
+            
+            missing.append(user_id)
+        
+        if missing:
+            fetched = await asyncio.gather(*(self._fetch(user_id) for user_id in missing))
+            for user_id, name in zip(missing, fetched):
+                if name is not None:
+                    names[str(user_id)] = name
+        
+        return names
+    
+    def forget(self, user_id):
+        """Убрать пользователя из кеша (например, после смены ника)"""
+        self._cache.pop(int(user_id), None)
+    
+    def _lookup_local(self, user_id: int, guild: Optional[discord.Guild]) -> Optional[str]:
+        """Поиск в кешах discord.py без обращения к API"""
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member.display_name
+        
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user.display_name
+        
+        return None
+    
+    def _cache_get(self, user_id: int) -> Optional[tuple]:
+        """Запись LRU-кеша в виде (имя,) или None при промахе"""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        
+        name, expires = entry
+        if expires < time.monotonic():
+            del self._cache[user_id]
+            return None
+        
+        self._cache.move_to_end(user_id)
+        return (name,)
+    
+    def _cache_put(self, user_id: int, name: Optional[str]):
+        self._cache[user_id] = (name, time.monotonic() + self.ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+    
+    async def _fetch(self, user_id: int) -> Optional[str]:
+        """Запросить пользователя через API (один запрос на ID, даже при параллельных вызовах)"""
+        future = self._inflight.get(user_id)
+        if future is not None:
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        name = None
+        try:
+            async with self._semaphore:
+                try:
+                    user = await self.bot.fetch_user(user_id)
+                    name = user.display_name
+                    self._cache_put(user_id, name)
+                except discord.NotFound:
+                    self._cache_put(user_id, None)
+                except discord.HTTPException:
+                    pass  # Временная ошибка - не кешируем, попробуем в следующий раз
+        finally:
+            del self._inflight[user_id]
+            future.set_result(name)
+        
+        return name
@@ -0,0 +1,157 @@
+# profile_service.py
+"""Сводный профиль пользователя из всех файлов данных"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+# Файлы, из которых собирается профиль
+SOURCES = (
+    'economy.json', 'levels.json', 'bank.json', 'business.json',
+    'stocks.json', 'pvp_stats.json', 'enhancements.json'
+)
+
+GAMES = ('slots', 'roulette', 'coinflip')
+
+
+def build_profile(user_id: str, load: Callable[[str], dict], known_only: bool = True) -> Optional[dict]:
+    """
+    Профиль пользователя: баланс, уровень, банк, бизнесы, портфель акций,
+    PvP, престиж и титулы.
+    
+    Каждый файл - словарь по user_id, поэтому профиль собирается несколькими
+    обращениями по ключу без прохода по пользователям.
+    
+    Args:
+        known_only: Вернуть None, если пользователя нет ни в одном файле
+            (иначе - профиль с нулевыми значениями)
+    """
+    economy = load('economy.json').get(user_id)
+    levels = load('levels.json').get(user_id)
+    bank = load('bank.json').get(user_id)
+    businesses = load('business.json').get(user_id)
+    pvp = load('pvp_stats.json').get(user_id)
+    
+    stocks = load('stocks.json')
+    holdings = stocks.get('portfolios', {}).get(user_id)
+    
+    enhancements = load('enhancements.json')
+    prestige = enhancements.get('prestiges', {}).get(user_id)
+    titles = enhancements.get('titles', {}).get(user_id)
+    
+    if known_only and all(part is None for part in (economy, levels, bank, businesses, pvp, holdings, prestige, titles)):
+        return None
+    
+    economy = economy or {}
+    levels = levels or {}
+    bank = bank or {}
+    pvp = pvp or {}
+    
+    game_stats = economy.get('game_stats', {})
+    balance = economy.get('balance', 0)
+    deposit = bank.get('deposit', 0)
+    loan = bank.get('loan', 0)
+    
+    companies = stocks.get('companies', {})
+    portfolio = {}
+    for ticker, shares in (holdings or {}).items():
+        price = companies.get(ticker, {}).get('price', 0)
+        portfolio[ticker] = {'shares': shares, 'price': price, 'value': shares * price}
+    portfolio_value = sum(holding['value'] for holding in portfolio.values())
+    
+    wins = pvp.get('wins', 0)
+    losses = pvp.get('losses', 0)
+    
+    return {
+        'user_id': user_id,
+        'balance': balance,
+        'wealth': balance + deposit - loan,
+        'games': {
+            'played': sum(game_stats.get(f'{game}_played', 0) for game in GAMES),
+            'won': sum(game_stats.get(f'{game}_won', 0) for game in GAMES),
+            'total_won': game_stats.get('total_won', 0),
+            'total_lost': game_stats.get('total_lost', 0)
+        },
+        'level': {
+            'level': levels.get('level', 1),
+            'xp': levels.get('xp', 0),
+            'total_xp': levels.get('total_xp', 0),
+            'messages': levels.get('messages_sent', 0)
+        },
+        'bank': {
+            'deposit': deposit,
+            'loan': loan,
+            'loan_deadline': bank.get('loan_deadline')
+        },
+        'businesses': [
+            {'id': business_id, 'name': business.get('name'), 'type': business.get('type')}
+            for business_id, business in (businesses or {}).items()
+        ],
+        'portfolio': {
+            'holdings': portfolio,
+            'shares': sum(holding['shares'] for holding in portfolio.values()),
+            'value': portfolio_value
+        },
+        'pvp': {
+            'wins': wins,
+            'losses': losses,
+            'winrate': round(wins / (wins + losses) * 100, 1) if wins + losses else 0.0
+        },
+        'prestige': prestige or 0,
+        'titles': list(titles or [])
+    }
+
+
+class ProfileService:
+    """
+    Профили пользователей с коротким кешем на каждого пользователя.
+    
+    Запись кеша живёт `ttl` секунд и действует, пока не изменилась версия
+    ни одного файла профиля, поэтому повторные запросы одного профиля
+    (дашборд, /stats) не собирают его заново, а устаревший профиль не
+    отдаётся после сохранения данных. Кеш ограничен `max_size` записями.
+    """
+    
+    def __init__(
+        self,
+        version: Callable[[str], Hashable],
+        load: Callable[[str], dict],
+        ttl: float = 30.0,
+        max_size: int = 1024
+    ):
+        """
+        Args:
+            version: Функция версии файла по имени (mtime файла, номер снимка DataStore)
+            load: Функция получения данных файла по имени
+            ttl: Время жизни профиля в кеше (секунды)
+            max_size: Сколько профилей держать в кеше
+        """
+        self._version = version
+        self._load = load
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: 'OrderedDict[str, Tuple[float, tuple, Optional[dict]]]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _versions(self) -> tuple:
+        """Версии всех файлов профиля"""
+        return tuple(self._version(name) for name in SOURCES)
+    
+    def get(self, user_id: str) -> Optional[dict]:
+        """Профиль пользователя или None, если пользователь неизвестен"""
+        now = time.monotonic()
+        versions = self._versions()
+        
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] > now and cached[1] == versions:
+                self._cache.move_to_end(user_id)
+                return cached[2]
+        
+        profile = build_profile(user_id, self._load)
+        with self._lock:
+            self._cache[user_id] = (now + self.ttl, versions, profile)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return profile
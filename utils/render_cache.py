@@ -0,0 +1,49 @@
+# render_cache.py
+"""Кеш готовых embed'ов с привязкой к версии данных и TTL"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class RenderCache:
+    """
+    LRU-кеш отрисованных объектов (embed'ов рейтингов и т.п.).
+    
+    Запись живёт не дольше `ttl` секунд и действительна, только пока
+    версия данных (например, поколение рейтинга) совпадает с той,
+    при которой она была построена.
+    """
+    
+    def __init__(self, ttl: float = 30.0, max_size: int = 512):
+        """
+        Args:
+            ttl: Время жизни записи (секунды)
+            max_size: Максимум записей в кеше
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key: (версия, значение, истекает)
+    
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """Значение из кеша или None, если его нет, оно устарело или версия сменилась"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        cached_version, value, expires = entry
+        if cached_version != version or expires < time.monotonic():
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def put(self, key: Hashable, version: Hashable, value: Any):
+        """Сохранить значение для версии данных"""
+        self._entries[key] = (version, value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,127 @@
+# shop_catalog.py
+"""Каталог магазина в памяти с индексами по id, типу и роли"""
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+
+class ShopCatalog:
+    """
+    Товары shop.json, загруженные один раз.
+    
+    Товары хранятся словарём по id, рядом - индексы по типу товара и по
+    роли, поэтому поиск товара при покупке, выводе инвентаря и изменении
+    не проходит по всему магазину. Каждое изменение сразу записывается
+    в файл.
+    """
+    
+    def __init__(self, filename: str = 'shop.json'):
+        self.filename = filename
+        self._items: Dict[int, dict] = {}
+        self._by_type: Dict[str, Set[int]] = {}
+        self._by_role: Dict[str, int] = {}
+        self.next_id = 1
+        self._load()
+    
+    def _load(self):
+        """Загрузка товаров из файла"""
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка загрузки {self.filename}: {e}")
+            return
+        
+        for item in data.get('items', []):
+            self._index(item)
+        self.next_id = data.get('next_id', max(self._items, default=0) + 1)
+    
+    def _save(self):
+        """Запись каталога в файл (формат shop.json не меняется)"""
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                'items': list(self._items.values()),
+                'next_id': self.next_id
+            }, f, ensure_ascii=False, indent=4)
+    
+    def _index(self, item: dict):
+        self._items[item['id']] = item
+        self._by_type.setdefault(item['type'], set()).add(item['id'])
+        if item.get('role_id'):
+            self._by_role[item['role_id']] = item['id']
+    
+    def _unindex(self, item: dict):
+        del self._items[item['id']]
+        self._by_type.get(item['type'], set()).discard(item['id'])
+        if item.get('role_id') and self._by_role.get(item['role_id']) == item['id']:
+            del self._by_role[item['role_id']]
+    
+    def all(self) -> List[dict]:
+        """Все товары в порядке добавления"""
+        return list(self._items.values())
+    
+    def get(self, item_id: int) -> Optional[dict]:
+        return self._items.get(item_id)
+    
+    def by_type(self, item_type: str) -> List[dict]:
+        """Товары типа item_type ('role' или 'item')"""
+        return [self._items[item_id] for item_id in sorted(self._by_type.get(item_type, ()))]
+    
+    def by_role(self, role_id: str) -> Optional[dict]:
+        """Товар, который выдаёт роль role_id"""
+        item_id = self._by_role.get(str(role_id))
+        return self._items.get(item_id) if item_id is not None else None
+    
+    def add(
+        self,
+        name: str,
+        price: int,
+        item_type: str,
+        description: Optional[str] = None,
+        role_id: Optional[str] = None
+    ) -> dict:
+        """Добавить товар и сохранить каталог"""
+        item = {
+            'id': self.next_id,
+            'name': name,
+            'price': price,
+            'type': item_type,
+            'description': description or 'Без описания'
+        }
+        if role_id:
+            item['role_id'] = str(role_id)
+        
+        self._index(item)
+        self.next_id += 1
+        self._save()
+        return item
+    
+    def update(self, item_id: int, field: str, value) -> Optional[dict]:
+        """
+        Изменить поле товара (name, price, description) и сохранить каталог
+        
+        Returns:
+            Изменённый товар или None, если товара нет
+        """
+        item = self._items.get(item_id)
+        if item is None:
+            return None
+        item[field] = value
+        self._save()
+        return item
+    
+    def remove(self, item_id: int) -> Optional[dict]:
+        """
+        Удалить товар и сохранить каталог
+        
+        Returns:
+            Удалённый товар или None, если товара нет
+        """
+        item = self._items.get(item_id)
+        if item is None:
+            return None
+        self._unindex(item)
+        self._save()
+        return item
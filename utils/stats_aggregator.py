@@ -0,0 +1,127 @@
+# stats_aggregator.py
+"""Накопительные счётчики общей статистики бота"""
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+def _economy(user: dict) -> Tuple[int, ...]:
+    """(пользователей, баланс, сыграно игр, выиграно игр)"""
+    game_stats = user.get('game_stats', {})
+    played = (
+        game_stats.get('slots_played', 0) +
+        game_stats.get('roulette_played', 0) +
+        game_stats.get('coinflip_played', 0)
+    )
+    won = (
+        game_stats.get('slots_won', 0) +
+        game_stats.get('roulette_won', 0) +
+        game_stats.get('coinflip_won', 0)
+    )
+    return (1, user.get('balance', 0), played, won)
+
+
+def _levels(user: dict) -> Tuple[int, ...]:
+    """(пользователей, сообщений)"""
+    return (1, user.get('messages_sent', 0))
+
+
+def _pvp(user: dict) -> Tuple[int, ...]:
+    """(пользователей, дуэлей)"""
+    return (1, user.get('wins', 0) + user.get('losses', 0))
+
+
+def _business(user: dict) -> Tuple[int, ...]:
+    """(бизнесов,)"""
+    return (len(user),)
+
+
+def _bank(user: dict) -> Tuple[int, ...]:
+    """(депозиты, кредиты)"""
+    return (user.get('deposit', 0), user.get('loan', 0))
+
+
+class StatsAggregator:
+    """
+    Итоги по всем пользователям (балансы, депозиты, игры, дуэли...).
+    
+    Для каждого файла хранится вклад каждого пользователя и суммы вкладов.
+    `sync` сравнивает вклады со свежим снимком и поправляет суммы только
+    на разницу, а `overview()` просто читает готовые суммы.
+    """
+    
+    SOURCES: Dict[str, Callable[[dict], Tuple[int, ...]]] = {
+        'economy.json': _economy,
+        'levels.json': _levels,
+        'pvp_stats.json': _pvp,
+        'business.json': _business,
+        'bank.json': _bank
+    }
+    
+    def __init__(self):
+        self._contributions: Dict[str, Dict[str, Tuple[int, ...]]] = {name: {} for name in self.SOURCES}
+        self._totals: Dict[str, list] = {}
+        self.generation = 0
+    
+    def sync(self, source: str, data: dict, changed: Optional[Set[str]] = None):
+        """
+        Обновить суммы по свежему снимку файла (остальные файлы игнорируются)
+        
+        Args:
+            changed: ID пользователей, изменившихся с прошлого снимка - пересчитываются
+                только их вклады (None - сравнить весь файл)
+        """
+        contribution = self.SOURCES.get(source)
+        if contribution is None:
+            return
+        
+        previous = self._contributions[source]
+        totals = self._totals.get(source)
+        if changed is None or totals is None:
+            # Полный проход: вклады собираются заново
+            users = set(data) | set(previous)
+            current = {}
+        else:
+            users = changed
+            current = previous
+        updated = False
+        
+        for user_id in users:
+            user_data = data.get(user_id)
+            value = contribution(user_data) if isinstance(user_data, dict) else None
+            old = previous.get(user_id)
+            if value is not None:
+                current[user_id] = value
+            elif current is previous:
+                # Пользователя больше нет в файле
+                current.pop(user_id, None)
+            if old == value:
+                continue
+            if totals is None:
+                totals = self._totals[source] = [0] * len(value)
+            for i in range(len(totals)):
+                totals[i] += (value[i] if value else 0) - (old[i] if old else 0)
+            updated = True
+        
+        self._contributions[source] = current
+        if updated:
+            self.generation += 1
+    
+    def total(self, source: str, index: int) -> int:
+        totals: Optional[list] = self._totals.get(source)
+        return totals[index] if totals else 0
+    
+    def overview(self) -> dict:
+        """Сводка в формате /api/stats"""
+        return {
+            'total_users': max(
+                self.total('economy.json', 0),
+                self.total('levels.json', 0),
+                self.total('pvp_stats.json', 0)
+            ),
+            'total_balance': self.total('economy.json', 1),
+            'total_bank_balance': self.total('bank.json', 0),
+            'total_loans': self.total('bank.json', 1),
+            'total_businesses': self.total('business.json', 0),
+            'total_games_played': self.total('economy.json', 2),
+            'total_games_won': self.total('economy.json', 3),
+            'total_duels': self.total('pvp_stats.json', 1)
+        }
@@ -0,0 +1,174 @@
+# timeseries.py
+"""Компактное хранилище временных рядов с прореживанием минута → час → день"""
+import re
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# (шаг в секундах, сколько точек хранить): сутки по минутам, 60 дней по часам, 2 года по дням
+TIERS: Tuple[Tuple[int, int], ...] = ((60, 1440), (3600, 1440), (86400, 730))
+
+_RANGE_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'y': 31536000}
+
+
+def parse_range(value: str) -> int:
+    """
+    Длительность в секундах: '90m', '24h', '7d', '2w', '1y' или просто число секунд
+    
+    Raises:
+        ValueError: Если формат не распознан
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*([mhdwy]?)\s*', value or '')
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Некорректный диапазон: {value}")
+    return int(match.group(1)) * _RANGE_UNITS.get(match.group(2), 1)
+
+
+class _Ring:
+    """Кольцевой буфер фиксированного размера из пар (время, значение)"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array('q', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+    
+    def _index(self, position: int) -> int:
+        return (self.start + position) % self.capacity
+    
+    def append(self, timestamp: int, value: float):
+        end = self._index(self.size)
+        self.times[end] = timestamp
+        self.values[end] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+    
+    def since(self, timestamp: int) -> List[Tuple[int, float]]:
+        """Точки с временем >= timestamp (бинарный поиск по логическим позициям)"""
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.times[self._index(middle)] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return [(self.times[self._index(i)], self.values[self._index(i)]) for i in range(low, self.size)]
+    
+    def to_dict(self) -> dict:
+        points = self.since(-2 ** 63)
+        return {'times': [t for t, _ in points], 'values': [v for _, v in points]}
+    
+    def load(self, data: dict):
+        for timestamp, value in zip(data.get('times', []), data.get('values', [])):
+            self.append(int(timestamp), float(value))
+
+
+class _Tier:
+    """Уровень детализации: буфер готовых точек и незакрытый текущий интервал"""
+    
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.ring = _Ring(capacity)
+        self.pending: Optional[List] = None  # [начало интервала, сумма, количество]
+    
+    def add(self, timestamp: int, value: float) -> Optional[Tuple[int, float]]:
+        """
+        Учесть значение; вернуть закрытую точку (начало, среднее), если
+        значение открыло новый интервал
+        """
+        bucket = timestamp - timestamp % self.step
+        closed = None
+        if self.pending is not None and self.pending[0] != bucket:
+            closed = (self.pending[0], self.pending[1] / self.pending[2])
+            self.ring.append(*closed)
+            self.pending = None
+        if self.pending is None:
+            self.pending = [bucket, 0.0, 0]
+        self.pending[1] += value
+        self.pending[2] += 1
+        return closed
+    
+    def since(self, timestamp: int) -> List[Tuple[int, float]]:
+        points = self.ring.since(timestamp)
+        if self.pending is not None and self.pending[0] >= timestamp:
+            points.append((self.pending[0], self.pending[1] / self.pending[2]))
+        return points
+
+
+class TimeSeriesStore:
+    """
+    Временные ряды метрик (денежная масса, депозиты, цены акций...).
+    
+    Каждая метрика хранится в нескольких кольцевых буферах фиксированного
+    размера: поминутно, почасово и по дням. Закрытая минута усредняется в
+    текущий час, закрытый час - в текущий день, поэтому память не растёт,
+    а запрос за любой период читает не больше пары тысяч готовых точек.
+    """
+    
+    def __init__(self, tiers: Tuple[Tuple[int, int], ...] = TIERS):
+        self.tiers = tiers
+        self._series: Dict[str, List[_Tier]] = {}
+        self.generation = 0  # Растёт при каждой записи
+    
+    @property
+    def metrics(self) -> List[str]:
+        return sorted(self._series)
+    
+    def _get_series(self, metric: str) -> List[_Tier]:
+        series = self._series.get(metric)
+        if series is None:
+            series = self._series[metric] = [_Tier(step, capacity) for step, capacity in self.tiers]
+        return series
+    
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        """Записать значения метрик на момент timestamp (по умолчанию - сейчас)"""
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        for metric, value in values.items():
+            point = (timestamp, float(value))
+            for tier in self._get_series(metric):
+                point = tier.add(*point)
+                if point is None:
+                    break
+        self.generation += 1
+    
+    def query(self, metric: str, seconds: int, now: Optional[float] = None) -> Tuple[int, List[Tuple[int, float]]]:
+        """
+        Точки метрики за последние seconds секунд
+        
+        Берётся самый подробный уровень, который покрывает весь период.
+        
+        Returns:
+            (шаг точек в секундах, [(время, значение), ...]) - пусто для неизвестной метрики
+        """
+        now = int(now if now is not None else time.time())
+        series = self._series.get(metric)
+        if series is None:
+            return self.tiers[0][0], []
+        
+        tier = next((t for t in series if t.step * t.ring.capacity >= seconds), series[-1])
+        return tier.step, tier.since(now - seconds)
+    
+    def to_dict(self) -> dict:
+        return {
+            'tiers': [list(tier) for tier in self.tiers],
+            'series': {
+                metric: [
+                    {**tier.ring.to_dict(), 'pending': tier.pending}
+                    for tier in series
+                ]
+                for metric, series in self._series.items()
+            }
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TimeSeriesStore':
+        tiers = tuple(tuple(tier) for tier in data.get('tiers', TIERS))
+        store = cls(tiers)
+        for metric, saved_tiers in data.get('series', {}).items():
+            for tier, saved in zip(store._get_series(metric), saved_tiers):
+                tier.ring.load(saved)
+                tier.pending = saved.get('pending')
+        return store
@@ -0,0 +1,119 @@
+# transaction_feed.py
+"""Общая лента последних транзакций всех пользователей"""
+import heapq
+from itertools import islice
+from operator import itemgetter
+from typing import Iterator, List, Optional, Tuple
+
+
+def _first_below(transactions: list, timestamp: str, inclusive: bool = False) -> int:
+    """
+    Индекс первой транзакции старше timestamp (список идёт от новых к старым);
+    inclusive - первой с timestamp не новее
+    """
+    low, high = 0, len(transactions)
+    while low < high:
+        middle = (low + high) // 2
+        value = transactions[middle].get('timestamp', '')
+        if value < timestamp or (inclusive and value == timestamp):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def _parse_cursor(before: str) -> Tuple[str, Optional[str], int]:
+    """
+    (timestamp, user_id, номер) из поля cursor транзакции; просто timestamp -
+    старый формат курсора: (timestamp, None, 0)
+    """
+    parts = before.split('|')
+    if len(parts) == 3 and parts[2].isdigit():
+        return parts[0], parts[1], int(parts[2])
+    return before, None, 0
+
+
+def _user_feed(
+    user_id: str,
+    transactions: list,
+    before: Optional[Tuple[str, Optional[str], int]],
+    trans_type: Optional[str]
+) -> Iterator[tuple]:
+    """
+    Лента одного пользователя с ключом (timestamp, user_id, -номер), где номер -
+    позиция транзакции среди транзакций пользователя с тем же timestamp.
+    
+    Массовые операции ставят один timestamp многим пользователям, поэтому
+    курсор - тройка (timestamp, user_id, номер): по одному timestamp
+    транзакции с общим временем терялись бы на границе страниц.
+    """
+    start = 0
+    if before:
+        timestamp, cursor_user, seq = before
+        if cursor_user is None or user_id > cursor_user:
+            # Транзакции с timestamp курсора уже были на прошлых страницах
+            start = _first_below(transactions, timestamp)
+        else:
+            start = _first_below(transactions, timestamp, inclusive=True)
+            if user_id == cursor_user:
+                start = min(_first_below(transactions, timestamp), start + seq + 1)
+    if start >= len(transactions):
+        return
+    
+    # Номер первой транзакции среди транзакций с тем же timestamp
+    previous = transactions[start].get('timestamp', '')
+    seq = start - _first_below(transactions, previous, inclusive=True)
+    for trans in islice(transactions, start, None):
+        timestamp = trans.get('timestamp', '')
+        if timestamp != previous:
+            previous = timestamp
+            seq = 0
+        if not trans_type or trans.get('type') == trans_type:
+            yield (timestamp, user_id, -seq), seq, trans
+        seq += 1
+
+
+def recent_transactions(
+    economy: dict,
+    limit: int = 50,
+    before: Optional[str] = None,
+    trans_type: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> List[dict]:
+    """
+    Последние транзакции из economy.json, от новых к старым.
+    
+    История каждого пользователя уже упорядочена (новые в начале), поэтому
+    ленты сливаются через heapq.merge и читаются только первые `limit`
+    записей - без копирования и сортировки всех транзакций.
+    
+    Args:
+        economy: Содержимое economy.json
+        limit: Сколько транзакций вернуть
+        before: Курсор (поле cursor последней полученной транзакции) - только
+            транзакции после неё; просто timestamp - транзакции строго старше
+        trans_type: Только транзакции этого типа
+        user_id: Только транзакции этого пользователя
+    
+    Returns:
+        Копии транзакций с добавленными полями user_id и cursor
+    """
+    if user_id is not None:
+        users = [(user_id, economy[user_id])] if user_id in economy else []
+    else:
+        users = economy.items()
+    
+    cursor = _parse_cursor(before) if before else None
+    feeds = [
+        _user_feed(uid, user_data.get('transactions', []), cursor, trans_type)
+        for uid, user_data in users
+        if user_data.get('transactions')
+    ]
+    
+    result = []
+    for (timestamp, uid, _), seq, trans in islice(heapq.merge(*feeds, key=itemgetter(0), reverse=True), limit):
+        trans_copy = trans.copy()
+        trans_copy['user_id'] = uid
+        trans_copy['cursor'] = f"{timestamp}|{uid}|{seq}"
+        result.append(trans_copy)
+    return result
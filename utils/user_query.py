@@ -0,0 +1,135 @@
+# user_query.py
+"""Выборка, сортировка и потоковая выдача пользовательских JSON данных"""
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _number(value) -> float:
+    """Числовое значение поля (нечисловые считаются нулём)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return 0
+    return value
+
+
+def field_value(user_data, field: str) -> float:
+    if not isinstance(user_data, dict):
+        return 0
+    return _number(user_data.get(field))
+
+
+def sort_order(data: dict, field: str) -> List[str]:
+    """ID пользователей по убыванию поля (для возрастания - перевернуть)"""
+    return sorted(data, key=lambda user_id: field_value(data[user_id], field), reverse=True)
+
+
+class UserQuery:
+    """
+    Параметры выборки: смещение, лимит, набор полей, сортировка и фильтры
+    вида min_<поле>/max_<поле> (например, min_balance=1000).
+    """
+    
+    def __init__(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        sort: Optional[str] = None,
+        filters: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+    ):
+        self.offset = max(offset, 0)
+        self.limit = limit if limit is None else max(limit, 0)
+        self.fields = fields
+        self.descending = (sort or '').startswith('-')
+        self.sort = (sort or '').lstrip('-') or None
+        self.filters = filters or {}
+    
+    @classmethod
+    def from_args(cls, args) -> 'UserQuery':
+        """
+        Разобрать параметры запроса (dict-подобный объект со строками).
+        
+        sort=balance - по возрастанию, sort=-balance - по убыванию.
+        
+        Raises:
+            ValueError: Если числовой параметр не число
+        """
+        filters: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        for key, value in args.items():
+            if key.startswith(('min_', 'max_')):
+                field = key[4:]
+                low, high = filters.get(field, (None, None))
+                if key.startswith('min_'):
+                    low = float(value)
+                else:
+                    high = float(value)
+                filters[field] = (low, high)
+        
+        limit = args.get('limit')
+        fields = args.get('fields')
+        return cls(
+            offset=int(args.get('offset', 0)),
+            limit=int(limit) if limit is not None else None,
+            fields=[field for field in fields.split(',') if field] if fields else None,
+            sort=args.get('sort') or None,
+            filters=filters
+        )
+    
+    def _matches(self, user_data) -> bool:
+        for field, (low, high) in self.filters.items():
+            value = field_value(user_data, field)
+            if low is not None and value < low:
+                return False
+            if high is not None and value > high:
+                return False
+        return True
+    
+    def _project(self, user_data):
+        if self.fields is None or not isinstance(user_data, dict):
+            return user_data
+        return {field: user_data[field] for field in self.fields if field in user_data}
+    
+    def run(self, data: dict, order: Optional[List[str]] = None) -> Tuple[int, Iterator[tuple]]:
+        """
+        Выполнить запрос
+        
+        Args:
+            data: Содержимое файла {user_id: данные}
+            order: Готовый порядок ID по убыванию поля sort (иначе считается здесь)
+        
+        Returns:
+            (всего подходящих пользователей, итератор пар (user_id, данные) страницы)
+        """
+        if self.sort is not None:
+            if order is None:
+                order = sort_order(data, self.sort)
+            user_ids: Iterable[str] = order if self.descending else reversed(order)
+        else:
+            user_ids = data
+        
+        if self.filters:
+            matched = [user_id for user_id in user_ids if self._matches(data[user_id])]
+            total = len(matched)
+            user_ids = matched
+        else:
+            total = len(data)
+        
+        stop = None if self.limit is None else self.offset + self.limit
+        page = islice(user_ids, self.offset, stop)
+        return total, ((user_id, self._project(data[user_id])) for user_id in page)
+
+
+def iter_json_object(pairs: Iterable[tuple], chunk_size: int = 200) -> Iterator[str]:
+    """JSON объект {ключ: значение} по частям - для потоковой отдачи"""
+    yield '{'
+    chunk = []
+    first = True
+    for key, value in pairs:
+        chunk.append(('' if first else ',') + json.dumps(key) + ':' + json.dumps(value))
+        first = False
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+    yield '}'
@@ -0,0 +1,355 @@
+# web_api.py
+"""Встроенный в бота веб-API дашборда (aiohttp)"""
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+from aiohttp import web
+
+from utils.analytics import SOURCES as ANALYTICS_SOURCES
+from utils.profile_service import SOURCES as PROFILE_SOURCES
+from utils.dashboard_data import build_stats, build_timeseries, capture_state, diff_state, stats_generation
+from utils.event_stream import EventBroadcaster, format_sse
+from utils.transaction_feed import recent_transactions
+from utils.user_query import UserQuery, iter_json_object, sort_order
+
+DASHBOARD_DIR = Path(__file__).parent.parent / 'dashboard'
+
+
+class WebAPI:
+    """
+    Те же маршруты /api/*, что у dashboard/dashboard_api.py, но внутри
+    процесса бота.
+    
+    Данные берутся из bot.datastore, счётчики и топы - из bot.stats и
+    bot.leaderboards, которые обновляются при каждом сохранении. Поэтому
+    нет ни повторного чтения файлов, ни отдельного процесса. ETag строится
+    по версиям снимков в DataStore, /api/stream получает изменения сразу
+    после сохранения (с небольшой задержкой, чтобы склеить серию записей).
+    """
+    
+    # Файлы пользователей: поддерживают offset/limit/fields/sort/min_*/max_*
+    USER_FILES = {
+        'economy': 'economy.json',
+        'levels': 'levels.json',
+        'pvp': 'pvp_stats.json',
+        'business': 'business.json',
+        'bank': 'bank.json'
+    }
+    # Файлы, которые отдаются целиком
+    RAW_FILES = {
+        'stocks': 'stocks.json',
+        'tournaments': 'tournaments.json',
+        'enhancements': 'enhancements.json'
+    }
+    STATS_FILES = ('economy.json', 'levels.json', 'pvp_stats.json', 'business.json', 'bank.json')
+    
+    GZIP_MIN_SIZE = 1024  # Ответы меньше этого размера не сжимаются
+    HEARTBEAT = 15.0  # Пинг в /api/stream при отсутствии событий (секунды)
+    DEBOUNCE = 0.5  # Задержка перед рассылкой изменений (секунды)
+    
+    def __init__(self, bot, host: str = '0.0.0.0', port: int = 5001):
+        self.bot = bot
+        self.store = bot.datastore
+        self.host = host
+        self.port = port
+        self.events = EventBroadcaster()
+        
+        # Теги прошлого запуска не должны совпадать с новыми
+        self._instance = str(time.time_ns())
+        self._stats_cache: Optional[Tuple[tuple, dict]] = None
+        self._order_cache = {}  # (файл, поле) -> (версия, [user_id])
+        
+        # Состояние для /api/stream (считается только пока есть зрители)
+        self._state: Optional[dict] = None
+        self._viewers = 0
+        self._changed = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        
+        self.app = web.Application(middlewares=[self._preflight])
+        self.app.on_response_prepare.append(self._add_cors_headers)
+        self.app.router.add_get('/', self._static('index.html'))
+        self.app.router.add_get('/script.js', self._static('script.js'))
+        self.app.router.add_get('/style.css', self._static('style.css'))
+        for route, filename in self.USER_FILES.items():
+            self.app.router.add_get(f'/api/{route}', self._user_file(filename))
+        for route, filename in self.RAW_FILES.items():
+            self.app.router.add_get(f'/api/{route}', self._raw_file(filename))
+        self.app.router.add_get('/api/stats', self.get_stats)
+        self.app.router.add_get('/api/transactions', self.get_transactions)
+        self.app.router.add_get('/api/timeseries', self.get_timeseries)
+        self.app.router.add_get('/api/analytics', self.get_analytics)
+        self.app.router.add_get('/api/users/{user_id}', self.get_user_profile)
+        self.app.router.add_get('/api/stream', self.stream_events)
+    
+    async def start(self):
+        """Запустить сервер в цикле событий бота"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.store.subscribe(self._on_publish)
+        
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f'🌐 Веб-API запущен на http://{self.host}:{self.port}')
+    
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    # --- Общие части ответов ---
+    
+    @web.middleware
+    async def _preflight(self, request: web.Request, handler):
+        if request.method == 'OPTIONS':
+            return web.Response(headers={
+                'Access-Control-Allow-Methods': 'GET, OPTIONS',
+                'Access-Control-Allow-Headers': request.headers.get('Access-Control-Request-Headers', '*')
+            })
+        return await handler(request)
+    
+    async def _add_cors_headers(self, request: web.Request, response: web.StreamResponse):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Expose-Headers'] = 'X-Total-Count, ETag'
+    
+    def _etag(self, request: web.Request, filenames: Iterable[str], *extra) -> str:
+        versions = tuple(self.store.version(name) for name in filenames)
+        key = repr((self._instance, request.path_qs, versions, extra))
+        return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+    
+    @staticmethod
+    def _not_modified(request: web.Request, etag: str) -> Optional[web.Response]:
+        """Ответ 304, если у клиента уже есть эта версия"""
+        tags = {tag.strip().removeprefix('W/') for tag in request.headers.get('If-None-Match', '').split(',')}
+        if etag in tags:
+            return web.Response(status=304, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+        return None
+    
+    def _json(self, data, etag: str) -> web.Response:
+        body = json.dumps(data).encode()
+        response = web.Response(
+            body=body,
+            content_type='application/json',
+            headers={'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        )
+        if len(body) >= self.GZIP_MIN_SIZE:
+            response.enable_compression()
+        return response
+    
+    def _static(self, filename: str):
+        async def handler(request: web.Request):
+            return web.FileResponse(DASHBOARD_DIR / filename)
+        return handler
+    
+    # --- Маршруты ---
+    
+    def _raw_file(self, filename: str):
+        async def handler(request: web.Request):
+            etag = self._etag(request, [filename])
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            return self._json(self.store.get(filename), etag)
+        return handler
+    
+    def _user_file(self, filename: str):
+        async def handler(request: web.Request):
+            """
+            Параметры: offset, limit, fields, sort (sort=-поле - по убыванию),
+            min_<поле>/max_<поле>. Общее число подходящих - в X-Total-Count.
+            """
+            etag = self._etag(request, [filename])
+            not_modified = self._not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+            
+            try:
+                query = UserQuery.from_args(request.query)
+            except ValueError:
+                return web.json_response({'error': 'Некорректные параметры запроса'}, status=400)
+            
+            data = self.store.get(filename)
+            order = self._sorted_user_ids(filename, data, query.sort) if query.sort else None
+            total, page = query.run(data, order)
+            
+            response = web.StreamResponse(headers={
+                'ETag': etag,
+                'Cache-Control': 'no-cache',
+                'Vary': 'Accept-Encoding',
+                'X-Total-Count': str(total)
+            })
+            response.content_type = 'application/json'
+            response.enable_compression()
+            await response.prepare(request)
+            for chunk in iter_json_object(page):
+                await response.write(chunk.encode())
+            await response.write_eof()
+            return response
+        return handler
+    
+    def _sorted_user_ids(self, filename: str, data: dict, field: str):
+        """ID пользователей по убыванию поля (кешируется до нового снимка)"""
+        version = self.store.version(filename)
+        cached = self._order_cache.get((filename, field))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        order = sort_order(data, field)
+        self._order_cache[(filename, field)] = (version, order)
+        return order
+    
+    def _stats(self) -> dict:
+        generation = stats_generation(self.bot.leaderboards, self.bot.stats)
+        if self._stats_cache is None or self._stats_cache[0] != generation:
+            stats = build_stats(self.store.get, self.bot.leaderboards, self.bot.stats)
+            self._stats_cache = (generation, stats)
+        return self._stats_cache[1]
+    
+    async def get_stats(self, request: web.Request):
+        """Агрегированная статистика"""
+        etag = self._etag(request, self.STATS_FILES)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        stats = self._stats()
+        return self._json({
+            'overview': {**stats['overview'], 'timestamp': datetime.now().isoformat()},
+            'leaderboards': stats['leaderboards']
+        }, etag)
+    
+    async def get_transactions(self, request: web.Request):
+        """Последние транзакции: limit (1-200), before (cursor последней транзакции), type, user_id"""
+        etag = self._etag(request, ['economy.json'])
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        try:
+            limit = min(max(int(request.query.get('limit', 50)), 1), 200)
+        except ValueError:
+            limit = 50
+        return self._json(recent_transactions(
+            self.store.get('economy.json'),
+            limit=limit,
+            before=request.query.get('before') or None,
+            trans_type=request.query.get('type') or None,
+            user_id=request.query.get('user_id') or None
+        ), etag)
+    
+    async def get_timeseries(self, request: web.Request):
+        """История метрики: metric, range (например, 24h, 7d, 1y)"""
+        etag = self._etag(request, [], self.bot.timeseries.generation)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        try:
+            data = build_timeseries(self.bot.timeseries, request.query.get('metric'), request.query.get('range'))
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        except KeyError:
+            return web.json_response({'error': 'Неизвестная метрика'}, status=404)
+        return self._json(data, etag)
+    
+    async def get_analytics(self, request: web.Request):
+        """Распределения богатства и уровней (bot.analytics)"""
+        etag = self._etag(request, ANALYTICS_SOURCES)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return self._json(self.bot.analytics.get(self.store.version, self.store.get), etag)
+    
+    async def get_user_profile(self, request: web.Request):
+        """Профиль пользователя (bot.profiles)"""
+        etag = self._etag(request, PROFILE_SOURCES)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        profile = self.bot.profiles.get(request.match_info['user_id'])
+        if profile is None:
+            return web.json_response({'error': 'Пользователь не найден'}, status=404)
+        return self._json(profile, etag)
+    
+    async def stream_events(self, request: web.Request):
+        """Server-Sent Events с изменениями (те же события, что у Flask-сервера)"""
+        response = web.StreamResponse(headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        response.content_type = 'text/event-stream'
+        await response.prepare(request)
+        
+        if self._state is None:
+            self._state = self._capture_state()
+        self._viewers += 1
+        
+        try:
+            after = self.events.last_id
+            await response.write(b'retry: 3000\n\n')
+            
+            last_event_id = request.headers.get('Last-Event-ID')
+            if last_event_id is not None and last_event_id.isdigit():
+                if self.events.can_resume(int(last_event_id)):
+                    after = int(last_event_id)
+                else:
+                    await response.write(format_sse(after, 'reset', {}).encode())
+            
+            while True:
+                batch = self.events.wait(after, 0)
+                if not batch:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        await response.write(b': ping\n\n')
+                    continue
+                for event_id, event, data in batch:
+                    await response.write(format_sse(event_id, event, data).encode())
+                    after = event_id
+        except ConnectionResetError:
+            pass
+        finally:
+            self._viewers -= 1
+            if self._viewers == 0:
+                self._state = None
+        return response
+    
+    # --- Рассылка изменений ---
+    
+    def _capture_state(self) -> dict:
+        return capture_state(self._stats(), self.store.get('economy.json'))
+    
+    def _on_publish(self, name: str, data: dict, changed: Optional[Set[str]] = None):
+        """Подписчик bot.datastore (может быть вызван и из другого потока)"""
+        self._loop.call_soon_threadsafe(self._schedule_flush, name)
+    
+    def _schedule_flush(self, name: str):
+        self._changed.add(name)
+        if self._flush_task is None:
+            self._flush_task = self._loop.create_task(self._flush())
+    
+    async def _flush(self):
+        """Разослать изменения, накопившиеся за DEBOUNCE секунд"""
+        await asyncio.sleep(self.DEBOUNCE)
+        changed, self._changed = self._changed, set()
+        self._flush_task = None
+        
+        if self._state is None:
+            return  # Никто не подключён - считать нечего
+        
+        try:
+            new_state = self._capture_state()
+            for event, data in diff_state(self._state, new_state, changed):
+                self.events.publish(event, data)
+            self._state = new_state
+        except Exception as e:
+            print(f"Ошибка рассылки изменений: {e}")
+        
+        # Разбудить все ожидающие подключения
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()